@@ -176,12 +176,10 @@ class GameToolCaller:
         return await self.client.get(f"/api/v1/users/{credentials.user_id}/ships", credentials)
     
     async def _list_opponents(self, credentials: AICredentials) -> ToolResult:
-        """List available opponents"""
-        result = await self.client.get("/api/v1/users/", credentials, params={"limit": 100})
+        """List available opponents, closest by Elo and level first (self excluded server-side)"""
+        result = await self.client.get("/api/v1/matchmaking/opponents", credentials, params={"k": 20})
         if result.success and result.data:
-            # Filter out self from opponents list
-            opponents = [user for user in result.data if user.get('user_id') != credentials.user_id]
-            result.data = opponents
+            result.data = result.data.get('opponents', [])
         return result
     
     async def _get_work_status(self, credentials: AICredentials) -> ToolResult:
@@ -237,7 +235,9 @@ class GameToolCaller:
             "user_ship_numbers": kwargs['user_ship_numbers'],
             "opponent_ship_numbers": kwargs['opponent_ship_numbers'],
             "user_formation": kwargs.get('user_formation', 'AGGRESSIVE'),
-            "opponent_formation": kwargs.get('opponent_formation', 'AGGRESSIVE')
+            "opponent_formation": kwargs.get('opponent_formation', 'AGGRESSIVE'),
+            # Agents only use the outcome, not the shot-by-shot log
+            "log_level": kwargs.get('log_level', 'summary')
         }
         
         return await self.client.post("/api/v1/battle/battle", credentials, json_data=battle_data)
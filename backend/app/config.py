@@ -22,8 +22,52 @@ if not DATABASE_URL:
 # Database settings
 DB_ECHO = os.getenv("DB_ECHO", "False").lower() == "true"
 
+# Battle engine configuration ("python" or "numpy")
+BATTLE_ENGINE = os.getenv("BATTLE_ENGINE", "python").lower()
+# Fraction of battles routed to the numpy engine for A/B testing (0.0 - 1.0)
+BATTLE_ENGINE_NUMPY_RATIO = float(os.getenv("BATTLE_ENGINE_NUMPY_RATIO", "0"))
+# Battle log storage: "events" stores the compact combat event stream and renders
+# the log on demand, "seed" stores only seed + fleet snapshot and replays the
+# battle, "full" stores the complete rendered log
+BATTLE_LOG_STORAGE = os.getenv("BATTLE_LOG_STORAGE", "events").lower()
+# Worker processes for battle simulation (0 disables the pool and simulates in the request thread)
+BATTLE_PROCESS_POOL_SIZE = int(os.getenv("BATTLE_PROCESS_POOL_SIZE", "0"))
+# Minimum total ships in a battle for it to be sent to the process pool
+BATTLE_PROCESS_POOL_MIN_SHIPS = int(os.getenv("BATTLE_PROCESS_POOL_MIN_SHIPS", "10"))
+
+# Background worker threads for asynchronous battle jobs (jobs of a user always run on the same worker; 0 disables them)
+BATTLE_JOB_WORKERS = int(os.getenv("BATTLE_JOB_WORKERS", "2"))
+# Maximum queued battle jobs per worker; submissions are rejected while the queue is full
+BATTLE_JOB_QUEUE_SIZE = int(os.getenv("BATTLE_JOB_QUEUE_SIZE", "100"))
+# Number of most recent finished battle jobs kept for polling; older finished jobs are discarded
+BATTLE_JOB_RETENTION = int(os.getenv("BATTLE_JOB_RETENTION", "1000"))
+
+# Seconds the in-process RankBonus registry is reused before it is reloaded
+RANK_BONUS_CACHE_TTL_SECONDS = int(os.getenv("RANK_BONUS_CACHE_TTL_SECONDS", "300"))
+
+# Seconds an in-process leaderboard is updated incrementally before it is fully reloaded
+LEADERBOARD_REFRESH_SECONDS = int(os.getenv("LEADERBOARD_REFRESH_SECONDS", "300"))
+
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# SystemLogs records buffered in memory before being bulk-inserted (0 writes every record synchronously)
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", "10000"))
+# Maximum records inserted per batch
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "500"))
+# Maximum seconds a buffered record waits before its batch is written
+LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("LOG_FLUSH_INTERVAL_SECONDS", "1.0"))
+# What logging does when the buffer is full: "drop" the record or "block" until there is room
+LOG_BUFFER_POLICY = os.getenv("LOG_BUFFER_POLICY", "drop").lower()
+# Maximum seconds the "block" policy waits for room before dropping the record
+LOG_BUFFER_BLOCK_SECONDS = float(os.getenv("LOG_BUFFER_BLOCK_SECONDS", "1.0"))
+# Days SystemLogs stay in the database before their month partition is archived
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "90"))
+# Directory of the compressed (gzip NDJSON) archives of dropped log partitions
+LOG_ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "log_archive")
+# Log rows streamed per chunk when archiving a partition
+LOG_ARCHIVE_CHUNK_SIZE = int(os.getenv("LOG_ARCHIVE_CHUNK_SIZE", "10000"))
+# Rows counted at most for an estimated log count where the database has no planner estimate (SQLite)
+LOG_COUNT_ESTIMATE_LIMIT = int(os.getenv("LOG_COUNT_ESTIMATE_LIMIT", "10000"))
 
 # JWT Configuration - Environment-based
 JWT_SECRET_KEY = os.getenv(f"JWT_SECRET_KEY_{ENVIRONMENT.upper()}")
@@ -1,45 +1,41 @@
+from sqlalchemy import select, update, tuple_, func
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
 from database.models import User, OwnedShips, BattleHistory
 from datetime import datetime, UTC
-from backend.app.utils.progression_utils import apply_rank_bonus_to_ship_stats, update_user_progression
+from backend.app.utils.progression_utils import apply_rank_bonus_to_ship_stats, update_user_progression, get_rank_bonuses
 import random
+import time
 from typing import Union, List
 from backend.app.utils.constants import BASE_XP_WIN, BASE_XP_LOSS, DIFFICULTY_MULTIPLIERS
-from backend.app.utils.constants import FORMATION_MODIFIERS, SHIELD_DAMAGE_REDUCTION, DAMAGE_VARIATION_RANGE, CREDITS_AWARDED_MULTIPLIER
+from backend.app.utils.constants import CREDITS_AWARDED_MULTIPLIER, ARMADA_MAX_SHIPS_PER_SIDE
 from backend.app.utils.constants import ELO_BASE_CHANGE, ELO_EXPECTED_SCORE_DIVISOR
+from backend.app.utils.constants import BATTLE_CONFLICT_RETRIES, BATTLE_CONFLICT_BACKOFF_SECONDS
 from backend.app.utils.progression_utils import get_max_active_ships_for_user, count_active_ships_for_user
+from backend.app.utils.rank_bonus_registry import get_rank_bonus_async
+from backend.app.utils.battle_engine import CombatShip, select_battle_engine
+from backend.app.utils.battle_pool import run_battle_simulation
+from backend.app.utils.battle_engine import BATTLE_LOG_LEVELS, BATTLE_LOG_NONE, BATTLE_LOG_SUMMARY
+from backend.app.utils.battle_engine import new_battle_seed, get_engine_version, replay_battle, iter_battle_rounds
+from backend.app.utils.matchup_utils import new_matchups, collect_battle_matchups
+from backend.app.crud.matchup_crud import record_matchup_stats
+from backend.app.config import BATTLE_LOG_STORAGE
 
+# OwnedShips base stat columns, degraded into the actual_* columns after battle
+BASE_STAT_COLUMNS = ('base_hp', 'base_attack', 'base_shield', 'base_evasion', 'base_fire_rate', 'base_value')
 
-# --- Formation System Helper Functions ---
-def get_formation_evasion_modifier(formation: str) -> float:
-    """
-    Get evasion modifier based on formation type.
-    DEFENSIVE: +20% evasion (impacts enemy's hit chance)
-    AGGRESSIVE: Normal evasion (no modifier)
-    TACTICAL: -10% evasion (penalty for focusing on high-attack targets)
-    """
-    return FORMATION_MODIFIERS.get(formation, 1.0)
-
-
-def select_target_by_formation(formation: str, enemy_ships: List[dict]) -> dict:
-    """
-    Select target ship based on formation strategy.
-    DEFENSIVE: Target ship with lowest HP (finish weak enemies first)
-    AGGRESSIVE: Random target (spread damage)
-    TACTICAL: Target ship with highest attack (eliminate threats first)
-    """
-    if not enemy_ships:
-        return None
-    
-    if formation == "DEFENSIVE":
-        # Target ship with lowest current HP
-        return min(enemy_ships, key=lambda s: s['current_hp'])
-    elif formation == "TACTICAL":
-        # Target ship with highest attack value
-        return max(enemy_ships, key=lambda s: s['attack'])
-    else:  # AGGRESSIVE or default
-        # Random target
-        return random.choice(enemy_ships)
+# OwnedShips column values of a ship destroyed in battle
+DESTROYED_SHIP_VALUES = {
+    'status': "destroyed",
+    'actual_hp': 0,
+    'actual_attack': 0,
+    'actual_shield': 0,
+    'actual_evasion': 0,
+    'actual_fire_rate': 0,
+    'actual_value': 0
+}
 
 
 def get_ships_by_numbers(db: Session, user_id: int, ship_numbers: Union[int, List[int]]) -> List[OwnedShips]:
@@ -83,16 +79,18 @@ def prepare_ship_stats_base(ship: OwnedShips, user: User, db: Session) -> dict:
     return base_stats
 
 
-def apply_battle_bonuses(fleet_stats: List[dict], db: Session) -> List[dict]:
+def apply_battle_bonuses(fleet_stats: List[dict], db: Session, rank_bonuses: dict = None) -> List[dict]:
     """
     Apply rank bonuses to fleet stats for battle calculations.
     This creates temporary enhanced stats for battle without modifying the original ship objects.
+    rank_bonuses: optional preloaded RankBonus rows by rank (see get_rank_bonuses).
     """
     enhanced_fleet = []
     for ship_stats in fleet_stats:
         user = ship_stats['user']
         # Apply rank bonuses to create battle-ready stats
-        enhanced_stats = apply_rank_bonus_to_ship_stats(user, ship_stats.copy(), db)
+        # apply_rank_bonus_to_ship_stats returns a copy, the base stats are left untouched
+        enhanced_stats = apply_rank_bonus_to_ship_stats(user, ship_stats, db, rank_bonuses)
         enhanced_stats['current_hp'] = enhanced_stats['hp']  # Set initial current HP with bonuses
         enhanced_stats['ship_obj'] = ship_stats['ship_obj']  # Preserve ship object reference
         enhanced_stats['user'] = user  # Preserve user reference
@@ -101,6 +99,54 @@ def apply_battle_bonuses(fleet_stats: List[dict], db: Session) -> List[dict]:
     return enhanced_fleet
 
 
+def to_combat_ship(ship_stats: dict) -> CombatShip:
+    """
+    Convert battle-ready fleet stats (rank bonuses applied) into a CombatShip snapshot
+    for the battle simulator.
+    """
+    return CombatShip(
+        ship_number=ship_stats['ship_number'],
+        ship_name=ship_stats['ship_name'],
+        attack=ship_stats['attack'],
+        shield=ship_stats['shield'],
+        hp=ship_stats['hp'],
+        evasion=ship_stats['evasion'],
+        fire_rate=ship_stats['fire_rate'],
+        value=ship_stats['value']
+    )
+
+
+def calculate_post_battle_stats(base_stats: dict, enhanced_start_hp: float, current_hp: float, is_npc: bool) -> dict:
+    """
+    Compute a ship's stats after battle from its base stats, removing battle bonuses.
+    base_stats: dict with 'base_hp', 'base_attack', 'base_shield', 'base_evasion', 'base_fire_rate', 'base_value'.
+    Returns a dict of OwnedShips column values ('actual_*', plus 'status' for destroyed ships).
+    """
+    if current_hp <= 0:
+        # Ship destroyed - set all stats to 0
+        return dict(DESTROYED_SHIP_VALUES)
+    
+    if is_npc:
+        # NPC ships: restore to full condition (base stats)
+        damage_percent = 1
+    elif enhanced_start_hp > 0:
+        # Human ships: apply damage degradation based on HP damage taken.
+        # enhanced_start_hp is the HP with bonuses used at battle start, so the
+        # percentage of HP remaining is applied to the BASE stats (removing all bonuses)
+        damage_percent = max(0, current_hp / enhanced_start_hp)
+    else:
+        damage_percent = 0
+    
+    return {
+        'actual_hp': max(0, base_stats['base_hp'] * damage_percent),
+        'actual_attack': base_stats['base_attack'] * damage_percent,
+        'actual_shield': base_stats['base_shield'] * damage_percent,
+        'actual_evasion': base_stats['base_evasion'] * damage_percent,
+        'actual_fire_rate': base_stats['base_fire_rate'] * damage_percent,
+        'actual_value': int(base_stats['base_value'] * damage_percent)
+    }
+
+
 def remove_battle_bonuses_and_apply_degradation(fleet_stats: List[dict], user_nickname: str) -> None:
     """
     Remove battle bonuses and apply damage degradation based on remaining HP.
@@ -110,49 +156,10 @@ def remove_battle_bonuses_and_apply_degradation(fleet_stats: List[dict], user_ni
     
     for ship_stats in fleet_stats:
         ship_obj = ship_stats['ship_obj']
-        
-        if ship_stats['current_hp'] <= 0:
-            # Ship destroyed - set all stats to 0
-            ship_obj.status = "destroyed"
-            ship_obj.actual_hp = 0
-            ship_obj.actual_attack = 0
-            ship_obj.actual_shield = 0
-            ship_obj.actual_evasion = 0
-            ship_obj.actual_fire_rate = 0
-            ship_obj.actual_value = 0
-        else:
-            # Ship survived - apply degradation or restore based on user type
-            if not is_npc:
-                # Human ships: apply damage degradation based on HP damage taken
-                # ship_stats contains the enhanced HP values used during battle
-                # We need to calculate what percentage of the enhanced HP remains
-                # Then apply that same damage percentage to the base stats
-                
-                # Get the enhanced HP that was used at battle start (from ship_stats dict)
-                enhanced_start_hp = ship_stats['hp']  # This is the enhanced HP from battle start
-                current_hp_remaining = ship_stats['current_hp']  # HP after battle damage
-                
-                # Calculate the percentage of HP remaining (damage taken)
-                if enhanced_start_hp > 0:
-                    damage_percent = max(0, current_hp_remaining / enhanced_start_hp)
-                else:
-                    damage_percent = 0
-                
-                # Apply the same damage percentage to BASE stats (removing all bonuses)
-                ship_obj.actual_hp = max(0, ship_obj.base_hp * damage_percent)
-                ship_obj.actual_attack = ship_obj.base_attack * damage_percent
-                ship_obj.actual_shield = ship_obj.base_shield * damage_percent
-                ship_obj.actual_evasion = ship_obj.base_evasion * damage_percent
-                ship_obj.actual_fire_rate = ship_obj.base_fire_rate * damage_percent
-                ship_obj.actual_value = int(ship_obj.base_value * damage_percent)
-            else:
-                # NPC ships: restore to full condition (base stats)
-                ship_obj.actual_hp = ship_obj.base_hp
-                ship_obj.actual_attack = ship_obj.base_attack
-                ship_obj.actual_shield = ship_obj.base_shield
-                ship_obj.actual_evasion = ship_obj.base_evasion
-                ship_obj.actual_fire_rate = ship_obj.base_fire_rate
-                ship_obj.actual_value = ship_obj.base_value
+        base_stats = {column: getattr(ship_obj, column) for column in BASE_STAT_COLUMNS}
+        post_battle_stats = calculate_post_battle_stats(base_stats, ship_stats['hp'], ship_stats['current_hp'], is_npc)
+        for column, value in post_battle_stats.items():
+            setattr(ship_obj, column, value)
 
 
 def calculate_elo_change(winner_elo: float, loser_elo: float) -> tuple[float, float]:
@@ -197,6 +204,88 @@ def calculate_xp_gain(winner_level, loser_level, base_xp_winner=BASE_XP_WIN, bas
     return winner_xp, loser_xp
 
 
+def _apply_battle_rewards(
+    user1: User,
+    user2: User,
+    winner: User,
+    loser: User,
+    total_damage1: float,
+    total_damage2: float,
+    ships_lost_by_user1: int,
+    ships_lost_by_user2: int,
+    loser_value: float,
+    battle_log: List[str]
+) -> None:
+    """
+    Apply the outcome of a battle to both users: statistics, credits, Elo and XP.
+    loser_value is the battle value of the losing fleet, used for the credit reward.
+    Appends the reward lines to battle_log.
+    """
+    # Update user statistics
+    winner.victories += 1
+    loser.defeats += 1
+    
+    user1.damage_dealt += total_damage1
+    user1.damage_taken += total_damage2
+    user2.damage_dealt += total_damage2
+    user2.damage_taken += total_damage1
+    
+    user1.ships_destroyed_by_user += ships_lost_by_user2
+    user1.ships_lost_by_user += ships_lost_by_user1
+    user2.ships_destroyed_by_user += ships_lost_by_user1
+    user2.ships_lost_by_user += ships_lost_by_user2
+    
+    # Award credits for victories
+    if winner.nickname.startswith("NPC_"):
+        # NPC winner doesn't get credits
+        pass
+    else:
+        credits_awarded = int(loser_value * CREDITS_AWARDED_MULTIPLIER)
+        winner.currency_value += credits_awarded
+        battle_log.append(f"{winner.nickname} awarded {credits_awarded:.0f} credits!")
+    
+    # Calculate and update Elo ratings
+    winner.elo_rank, loser.elo_rank = calculate_elo_change(winner.elo_rank, loser.elo_rank)
+    
+    # Calculate XP gain for winner and loser
+    if not winner.nickname.startswith("NPC_"):
+        winner_xp, _ = calculate_xp_gain(winner.level, loser.level)
+        winner.experience += winner_xp
+        battle_log.append(f"{winner.nickname} gains {winner_xp} XP!")
+        
+        # Update winner's level and rank based on new experience
+        level_changed = update_user_progression(winner, winner_xp)
+        if level_changed:
+            battle_log.append(f"{winner.nickname} leveled up to level {winner.level}!")
+
+    if not loser.nickname.startswith("NPC_"):
+        _, loser_xp = calculate_xp_gain(winner.level, loser.level)
+        loser.experience += loser_xp
+        battle_log.append(f"{loser.nickname} gains {loser_xp} XP!")
+        
+        # Update loser's level and rank based on new experience
+        level_changed = update_user_progression(loser, loser_xp)
+        if level_changed:
+            battle_log.append(f"{loser.nickname} leveled up to level {loser.level}!")
+
+
+def retry_on_conflict(db: Session, attempt, *args):
+    """
+    Run attempt(db, *args), retrying up to BATTLE_CONFLICT_RETRIES times when its commit
+    loses an optimistic version check against a concurrent battle (StaleDataError).
+    Each retry starts from a rolled back session, so users and ships are reloaded.
+    """
+    for retry in range(BATTLE_CONFLICT_RETRIES + 1):
+        try:
+            return attempt(db, *args)
+        except StaleDataError:
+            db.rollback()
+            if retry == BATTLE_CONFLICT_RETRIES:
+                raise
+            # Randomized backoff so the conflicting battles do not collide again
+            time.sleep(random.uniform(0, BATTLE_CONFLICT_BACKOFF_SECONDS * (retry + 1)))
+
+
 # --- Battle CRUD Operations ---
 def battle_between_users(
     db: Session,
@@ -205,26 +294,59 @@ def battle_between_users(
     user1_ship_numbers: Union[int, List[int]], 
     user2_ship_numbers: Union[int, List[int]],
     user1_formation: str = None,
-    user2_formation: str = None
+    user2_formation: str = None,
+    engine: str = None,
+    log_level: str = "full"
 ):
     """
     Unified battle system supporting 1v1 to 20v20 battles with tactical formations.
     
+    Loads both fleets, runs the pure battle simulator (battle_engine.simulate_battle)
+    and persists the outcome: ship degradation, user statistics, rewards and BattleHistory.
+    
     Args:
         db: Database session
         user1_id, user2_id: User IDs of the combatants
         user1_ship_numbers, user2_ship_numbers: Ship number(s) - int for single ship, List[int] for fleet
         user1_formation, user2_formation: Formation strategy ("DEFENSIVE", "AGGRESSIVE", "TACTICAL")
                                          If None, uses user's default_formation
+        engine: Combat engine ("python" or "numpy"). If None, uses the configured BATTLE_ENGINE
+        log_level: Battle log verbosity - "full" (every shot), "summary" (per-round damage totals
+                   and destroyed ships) or "none" (outcome only, no post-battle lines)
     
     Formations:
         - DEFENSIVE: +20% evasion, targets lowest HP ships (finish weak enemies)
         - AGGRESSIVE: Normal evasion, random targeting (spread damage)
         - TACTICAL: -10% evasion, targets highest attack ships (eliminate threats)
     
+    Concurrency:
+        User and ship rows are versioned (optimistic locking), so battles between disjoint
+        users never block each other. If another battle updated one of the same users or
+        ships first, the battle is rolled back and retried from fresh data.
+    
     Returns:
         Tuple of (BattleHistory, message) or (None, error_message)
     """
+    return retry_on_conflict(
+        db, _battle_between_users, user1_id, user2_id, user1_ship_numbers, user2_ship_numbers,
+        user1_formation, user2_formation, engine, log_level
+    )
+
+
+def _battle_between_users(
+    db: Session,
+    user1_id: int,
+    user2_id: int,
+    user1_ship_numbers: Union[int, List[int]],
+    user2_ship_numbers: Union[int, List[int]],
+    user1_formation: str,
+    user2_formation: str,
+    engine: str,
+    log_level: str
+):
+    """
+    One attempt of battle_between_users.
+    """
     # Get users
     user1 = db.query(User).filter(User.user_id == user1_id).first()
     user2 = db.query(User).filter(User.user_id == user2_id).first()
@@ -232,6 +354,406 @@ def battle_between_users(
     if not user1 or not user2:
         return None, "User not found"
     
+    # Get ships - only active ships are retrieved
+    user1_ships = get_ships_by_numbers(db, user1_id, user1_ship_numbers)
+    user2_ships = get_ships_by_numbers(db, user2_id, user2_ship_numbers)
+    
+    matchups = new_matchups()
+    battle_history, battle_log, message = _execute_battle(
+        db, user1, user2, user1_ships, user2_ships,
+        user1_formation, user2_formation, engine, log_level, matchups=matchups
+    )
+    if not battle_history:
+        return None, message
+    
+    db.add(battle_history)
+    record_matchup_stats(db, matchups)
+    db.commit()
+    
+    # Hand the complete log to the caller without marking it for storage
+    set_committed_value(battle_history, "battle_log", battle_log)
+    
+    return battle_history, message
+
+
+def battle_batch(db: Session, user_id: int, battle_requests: List[dict], engine: str = None):
+    """
+    Execute several battles of the same user in one transaction.
+    
+    All users, active ships and rank bonuses involved are preloaded with a few bulk
+    queries, the battles run in request order against the same in-memory objects
+    (so a ship destroyed in one battle is unavailable to the next) and every
+    BattleHistory row is inserted in a single flush and commit.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user starting every battle
+        battle_requests: Battle requests with the BattleRequest fields
+        engine: Combat engine ("python" or "numpy"). If None, uses the configured BATTLE_ENGINE
+    
+    Returns:
+        List of (BattleHistory, message) or (None, error_message) tuples, one per request
+    """
+    # A conflict with a concurrent battle retries the whole batch (see battle_between_users)
+    return retry_on_conflict(db, _battle_batch, user_id, battle_requests, engine)
+
+
+def _battle_batch(db: Session, user_id: int, battle_requests: List[dict], engine: str):
+    """
+    One attempt of battle_batch.
+    """
+    user_ids = {user_id} | {request['opponent_user_id'] for request in battle_requests}
+    users = {user.user_id: user for user in db.query(User).filter(User.user_id.in_(user_ids)).all()}
+    
+    ships_by_user = {}
+    for ship in db.query(OwnedShips).filter(
+        OwnedShips.user_id.in_(user_ids),
+        OwnedShips.status == 'active'
+    ).all():
+        ships_by_user.setdefault(ship.user_id, []).append(ship)
+    
+    rank_bonuses = get_rank_bonuses(db)
+    
+    def active_ships(owner_id, ship_numbers):
+        if isinstance(ship_numbers, int):
+            ship_numbers = [ship_numbers]
+        return [
+            ship for ship in ships_by_user.get(owner_id, [])
+            if ship.ship_number in ship_numbers and ship.status == 'active'
+        ]
+    
+    results = []
+    executed = []
+    matchups = new_matchups()
+    for request in battle_requests:
+        user1 = users.get(user_id)
+        user2 = users.get(request['opponent_user_id'])
+        if not user1 or not user2:
+            results.append((None, "User not found"))
+            continue
+        
+        battle_history, battle_log, message = _execute_battle(
+            db, user1, user2,
+            active_ships(user1.user_id, request['user_ship_numbers']),
+            active_ships(user2.user_id, request['opponent_ship_numbers']),
+            request.get('user_formation'),
+            request.get('opponent_formation'),
+            engine,
+            request.get('log_level', "full"),
+            rank_bonuses=rank_bonuses,
+            matchups=matchups
+        )
+        results.append((battle_history, message) if battle_history else (None, message))
+        if battle_history:
+            executed.append((battle_history, battle_log))
+    
+    if executed:
+        db.add_all([battle_history for battle_history, _ in executed])
+        record_matchup_stats(db, matchups)
+        db.commit()
+        for battle_history, battle_log in executed:
+            set_committed_value(battle_history, "battle_log", battle_log)
+    
+    return results
+
+
+def armada_battle(
+    db: Session,
+    user1_id: int,
+    user2_id: int,
+    user1_ship_numbers: List[int] = None,
+    user2_ship_numbers: List[int] = None,
+    user1_formation: str = None,
+    user2_formation: str = None,
+    engine: str = None
+):
+    """
+    Execute a mass-fleet (armada) battle between two users.
+    
+    Unlike battle_between_users, each fleet is the user's whole hangar (ships with status
+    'owned' or 'active', optionally restricted to ship_numbers), up to ARMADA_MAX_SHIPS_PER_SIDE
+    ships per side and not limited by the active ship slots of the rank.
+    Built for throughput: ships are loaded as plain rows with one query per fleet, the
+    battle log is always recorded at the "summary" level and the post-battle stats are
+    written back with a few set-based UPDATEs instead of one ORM object per ship.
+    Target: a 200v200 armada battle (simulation and write-back) in under 200 ms.
+    
+    Args:
+        db: Database session
+        user1_id: ID of the user starting the battle
+        user2_id: ID of the opponent user
+        user1_ship_numbers: Ship numbers of user1's armada. If None, the whole hangar
+        user2_ship_numbers: Ship numbers of user2's armada. If None, the whole hangar
+        user1_formation: Formation for user1. If None, uses user1's default_formation
+        user2_formation: Formation for user2. If None, uses user2's default_formation
+        engine: Combat engine ("python" or "numpy"). If None, uses the configured BATTLE_ENGINE
+    
+    Returns:
+        Tuple of (BattleHistory, message) or (None, error_message)
+    """
+    # A conflict with a concurrent battle retries the armada battle (see battle_between_users)
+    return retry_on_conflict(
+        db, _armada_battle, user1_id, user2_id, user1_ship_numbers, user2_ship_numbers,
+        user1_formation, user2_formation, engine
+    )
+
+
+def _armada_battle(
+    db: Session,
+    user1_id: int,
+    user2_id: int,
+    user1_ship_numbers: List[int],
+    user2_ship_numbers: List[int],
+    user1_formation: str,
+    user2_formation: str,
+    engine: str
+):
+    """
+    One attempt of armada_battle.
+    """
+    if user1_id == user2_id:
+        return None, "Same user battle not allowed"
+    
+    user1 = db.query(User).filter(User.user_id == user1_id).first()
+    user2 = db.query(User).filter(User.user_id == user2_id).first()
+    if not user1 or not user2:
+        return None, "User not found"
+    
+    if user1_formation is None:
+        user1_formation = user1.default_formation
+    if user2_formation is None:
+        user2_formation = user2.default_formation
+    
+    engine = select_battle_engine(engine)
+    
+    user1_rows = _load_armada_rows(db, user1.user_id, user1_ship_numbers)
+    user2_rows = _load_armada_rows(db, user2.user_id, user2_ship_numbers)
+    if not user1_rows or not user2_rows:
+        return None, "No ships found for battle"
+    if len(user1_rows) > ARMADA_MAX_SHIPS_PER_SIDE or len(user2_rows) > ARMADA_MAX_SHIPS_PER_SIDE:
+        return None, f"Armada too large. Maximum ships per side: {ARMADA_MAX_SHIPS_PER_SIDE}"
+    
+    # Apply rank bonuses to the battle stats (rows are never modified)
+    rank_bonuses = get_rank_bonuses(db)
+    user1_fleet = [apply_rank_bonus_to_ship_stats(user1, _armada_ship_stats(row), db, rank_bonuses) for row in user1_rows]
+    user2_fleet = [apply_rank_bonus_to_ship_stats(user2, _armada_ship_stats(row), db, rank_bonuses) for row in user2_rows]
+    
+    seed = new_battle_seed()
+    result = run_battle_simulation(
+        [to_combat_ship(ship_stats) for ship_stats in user1_fleet],
+        [to_combat_ship(ship_stats) for ship_stats in user2_fleet],
+        user1_formation,
+        user2_formation,
+        rng=random.Random(seed),
+        engine=engine,
+        names=(user1.nickname, user2.nickname),
+        log_level=BATTLE_LOG_SUMMARY
+    )
+    total_damage1, total_damage2 = result.total_damage
+    ships_lost_by_user1, ships_lost_by_user2 = result.ships_lost
+    winner, loser = (user1, user2) if result.winner == 0 else (user2, user1)
+    
+    # Claim every ship row of both fleets before writing back
+    _claim_armada_rows(db, list(user1_rows) + list(user2_rows))
+    
+    battle_log = []
+    participants = []
+    for user, rows, fleet, final_hp in zip(
+        (user1, user2), (user1_rows, user2_rows), (user1_fleet, user2_fleet), result.final_hp
+    ):
+        participants.extend(_write_back_armada(db, user, rows, fleet, final_hp, battle_log))
+    
+    loser_value = sum(ship_stats['value'] for ship_stats in (user2_fleet if winner == user1 else user1_fleet))
+    _apply_battle_rewards(
+        user1, user2, winner, loser, total_damage1, total_damage2,
+        ships_lost_by_user1, ships_lost_by_user2, loser_value, battle_log
+    )
+    
+    battle_history = BattleHistory(
+        participants=participants,
+        battle_log=battle_log,
+        battle_events=result.events,
+        winner_user_id=winner.user_id,
+        seed=seed,
+        engine_version=get_engine_version(engine),
+        fleet_snapshot={**result.snapshot, "user_ids": [user1.user_id, user2.user_id]},
+        extra={
+            "formations": {"user1": user1_formation, "user2": user2_formation},
+            "final_hp": {
+                user1.nickname: sum(max(0, hp) for hp in result.final_hp[0]),
+                user2.nickname: sum(max(0, hp) for hp in result.final_hp[1])
+            },
+            "total_damage": {user1.nickname: total_damage1, user2.nickname: total_damage2},
+            "winner": winner.nickname,
+            "battle_type": f"Armada {result.fleet_info}",
+            "engine": engine,
+            "rounds": result.rounds,
+            "log_storage": "events",
+            "log_level": BATTLE_LOG_SUMMARY,
+            "ships_destroyed": {"user1": ships_lost_by_user1, "user2": ships_lost_by_user2}
+        }
+    )
+    matchups = new_matchups()
+    collect_battle_matchups(
+        matchups, (user1_formation, user2_formation),
+        ([row['ship_id'] for row in user1_rows], [row['ship_id'] for row in user2_rows]),
+        result.final_hp, result.total_damage, result.winner
+    )
+    db.add(battle_history)
+    record_matchup_stats(db, matchups)
+    db.commit()
+    set_committed_value(battle_history, "battle_log", result.battle_log + battle_log)
+    
+    return battle_history, f"{winner.nickname} wins the armada battle {result.fleet_info}!"
+
+
+def _load_armada_rows(db: Session, user_id: int, ship_numbers: List[int] = None):
+    """
+    Load the columns needed for an armada battle as plain rows (no ORM objects).
+    Loads at most one ship over ARMADA_MAX_SHIPS_PER_SIDE so oversized fleets can be rejected.
+    """
+    query = select(
+        OwnedShips.ship_number,
+        OwnedShips.ship_id,
+        OwnedShips.ship_name,
+        OwnedShips.actual_attack,
+        OwnedShips.actual_shield,
+        OwnedShips.actual_hp,
+        OwnedShips.actual_evasion,
+        OwnedShips.actual_fire_rate,
+        OwnedShips.actual_value,
+        OwnedShips.version_id,
+        *(getattr(OwnedShips, column) for column in BASE_STAT_COLUMNS)
+    ).where(
+        OwnedShips.user_id == user_id,
+        OwnedShips.status.in_(('owned', 'active')),
+        OwnedShips.actual_hp > 0
+    )
+    if ship_numbers is not None:
+        query = query.where(OwnedShips.ship_number.in_(ship_numbers))
+    query = query.order_by(OwnedShips.ship_number).limit(ARMADA_MAX_SHIPS_PER_SIDE + 1)
+    return db.execute(query).mappings().all()
+
+
+def _claim_armada_rows(db: Session, rows) -> None:
+    """
+    Increment the version of all armada ship rows in one UPDATE, checking the versions
+    they were loaded with. Raises StaleDataError if a concurrent battle changed any of them.
+    """
+    claimed = db.execute(
+        update(OwnedShips)
+        .where(tuple_(OwnedShips.ship_number, OwnedShips.version_id).in_(
+            [(row['ship_number'], row['version_id']) for row in rows]
+        ))
+        .values(version_id=OwnedShips.version_id + 1)
+    ).rowcount
+    if claimed != len(rows):
+        raise StaleDataError(f"Armada battle expected to claim {len(rows)} ship(s); {claimed} were unchanged")
+
+
+def _armada_ship_stats(row) -> dict:
+    """
+    Prepare ship stats dictionary from an armada row (base stats only, as prepare_ship_stats_base).
+    """
+    return {
+        'ship_number': row['ship_number'],
+        'ship_name': row['ship_name'],
+        'attack': row['actual_attack'],
+        'shield': row['actual_shield'],
+        'hp': row['actual_hp'],
+        'evasion': row['actual_evasion'],
+        'fire_rate': row['actual_fire_rate'],
+        'value': row['actual_value']
+    }
+
+
+def _write_back_armada(db: Session, user: User, rows, fleet: List[dict], final_hp, battle_log: List[str]) -> List[dict]:
+    """
+    Write the post-battle stats of one armada fleet back with set-based UPDATEs.
+    
+    NPC fleets are restored to their base stats with one UPDATE that keeps every
+    ship's status (an armada fights with the whole hangar, 'owned' ships included,
+    and must not activate ships beyond the NPC's active slots). Destroyed ships of
+    players are zeroed with one UPDATE and the degraded stats of surviving ships
+    are written with one bulk UPDATE by primary key. Appends the aggregated log lines to battle_log and
+    returns the participant entries of the fleet for the battle history.
+    """
+    is_npc = user.nickname.startswith("NPC_")
+    participants = []
+    destroyed_numbers = []
+    survivors = []
+    for row, ship_stats, current_hp in zip(rows, fleet, final_hp):
+        if current_hp <= 0:
+            destroyed_numbers.append(row['ship_number'])
+        # NPC ships (destroyed ones included) are restored below
+        remaining_hp = ship_stats['hp'] if is_npc else current_hp
+        post_battle_stats = calculate_post_battle_stats(row, ship_stats['hp'], remaining_hp, is_npc)
+        if not is_npc and current_hp > 0:
+            # The version was incremented when the fleets were claimed
+            survivors.append({'ship_number': row['ship_number'], 'version_id': row['version_id'] + 1, **post_battle_stats})
+        participants.append({
+            "user_id": user.user_id,
+            "nickname": user.nickname,
+            "ship_number": row['ship_number'],
+            "ship_name": row['ship_name'],
+            # Final values (after battle damage/degradation)
+            "attack": post_battle_stats['actual_attack'],
+            "shield": post_battle_stats['actual_shield'],
+            "evasion": post_battle_stats['actual_evasion'],
+            "fire_rate": post_battle_stats['actual_fire_rate'],
+            "hp": post_battle_stats['actual_hp'],
+            "value": post_battle_stats['actual_value'],
+            # Base values (original ship stats for progress bars)
+            **{column: row[column] for column in BASE_STAT_COLUMNS}
+        })
+    
+    if destroyed_numbers:
+        battle_log.append(f"{user.nickname} lost {len(destroyed_numbers)} of {len(rows)} ships.")
+    
+    if is_npc:
+        db.execute(
+            update(OwnedShips)
+            .where(OwnedShips.ship_number.in_([row['ship_number'] for row in rows]))
+            .values(**{f"actual_{column[5:]}": getattr(OwnedShips, column) for column in BASE_STAT_COLUMNS})
+        )
+        if destroyed_numbers:
+            battle_log.append(f"NPC {user.nickname}: {len(destroyed_numbers)} ships restored")
+    else:
+        if destroyed_numbers:
+            db.execute(
+                update(OwnedShips)
+                .where(OwnedShips.ship_number.in_(destroyed_numbers))
+                .values(DESTROYED_SHIP_VALUES)
+            )
+        if survivors:
+            db.execute(update(OwnedShips), survivors)
+    
+    return participants
+
+
+def _execute_battle(
+    db: Session,
+    user1: User,
+    user2: User,
+    user1_ships: List[OwnedShips],
+    user2_ships: List[OwnedShips],
+    user1_formation: str = None,
+    user2_formation: str = None,
+    engine: str = None,
+    log_level: str = "full",
+    rank_bonuses: dict = None,
+    matchups: dict = None
+):
+    """
+    Run one battle between loaded users and fleets and apply its outcome in the session.
+    
+    Updates ships and user statistics in place and builds the BattleHistory row without
+    adding it to the session, so callers decide how battles are flushed and committed.
+    The outcome is added to matchups when given (see record_matchup_stats).
+    
+    Returns:
+        Tuple of (BattleHistory, full battle log, message) or (None, None, error_message)
+    """
     # Use user's default formation if not specified
     if user1_formation is None:
         user1_formation = user1.default_formation
@@ -239,195 +761,62 @@ def battle_between_users(
         user2_formation = user2.default_formation
     
     if user1 == user2:
-        return None, "Same user battle not allowed"
+        return None, None, "Same user battle not allowed"
     
-    # Get ships - only active ships are retrieved
-    user1_ships = get_ships_by_numbers(db, user1_id, user1_ship_numbers)
-    user2_ships = get_ships_by_numbers(db, user2_id, user2_ship_numbers)
+    if log_level not in BATTLE_LOG_LEVELS:
+        return None, None, f"Invalid log level. Valid levels: {', '.join(BATTLE_LOG_LEVELS)}"
+    
+    engine = select_battle_engine(engine)
     
     if not user1_ships or not user2_ships:
-        return None, "No active ships found for battle"
+        return None, None, "No active ships found for battle"
     
     # Prepare base fleet stats (without bonuses)
     user1_fleet_base = [prepare_ship_stats_base(ship, user1, db) for ship in user1_ships]
     user2_fleet_base = [prepare_ship_stats_base(ship, user2, db) for ship in user2_ships]
     
     # Apply battle bonuses temporarily for combat calculations
-    user1_fleet = apply_battle_bonuses(user1_fleet_base, db)
-    user2_fleet = apply_battle_bonuses(user2_fleet_base, db)
-    
-    # Battle initialization
-    total_damage1 = 0
-    total_damage2 = 0
-    
-    # Determine battle type for logging
-    battle_type = "1v1" if len(user1_fleet) == 1 and len(user2_fleet) == 1 else "Fleet"
-    fleet_info = f"({len(user1_fleet)}v{len(user2_fleet)})"
-    
-    battle_log = [
-        f"{battle_type} Battle {fleet_info} started: {user1.nickname} vs {user2.nickname}",
-        f"{user1.nickname} formation: {user1_formation} ({len(user1_fleet)} ships)",
-        f"{user2.nickname} formation: {user2_formation} ({len(user2_fleet)} ships)"
-    ]
-    
-    # Battle loop - maximum 20 rounds to prevent infinite battles
-    for round_num in range(1, 21):
-        # Check if any fleet is completely destroyed
-        user1_active = [ship for ship in user1_fleet if ship['current_hp'] > 0]
-        user2_active = [ship for ship in user2_fleet if ship['current_hp'] > 0]
-        
-        if not user1_active or not user2_active:
-            break
-        
-        battle_log.append(f"--- Round {round_num} ---")
-        battle_log.append(f"{user1.nickname}: {len(user1_active)} ships active, {user2.nickname}: {len(user2_active)} ships active")
-        
-        # User1 fleet attacks User2 fleet
-        for attacking_ship in user1_active:
-            if not user2_active:  # Check if enemy fleet still exists
-                break
-            
-            # Select target based on formation strategy
-            target_ship = select_target_by_formation(user1_formation, user2_active)
-            if not target_ship:
-                continue
-            
-            # Calculate evasion with formation modifier (DEFENSIVE impacts enemy evasion)
-            target_evasion = target_ship['evasion'] * get_formation_evasion_modifier(user2_formation)
-            
-            # Each ship attacks based on its fire rate
-            for _ in range(int(attacking_ship['fire_rate'])):
-                if target_ship['current_hp'] <= 0:
-                    break
-                
-                # Evasion check
-                if random.random() < target_evasion:
-                    # Get owner names for the log
-                    attacking_owner = user1.nickname if attacking_ship in user1_active else user2.nickname
-                    target_owner = user1.nickname if target_ship in user1_active else user2.nickname
-                    
-                    battle_log.append(f"{target_ship['ship_name']} ({target_owner}) evaded attack from {attacking_ship['ship_name']} ({attacking_owner})!")
-                    continue
-                
-                # Calculate damage
-                base_damage = attacking_ship['attack'] - (target_ship['shield'] * SHIELD_DAMAGE_REDUCTION)
-                damage = base_damage * random.uniform(*DAMAGE_VARIATION_RANGE)
-                damage = max(1, damage)
-                
-                # Apply damage
-                target_ship['current_hp'] -= damage
-                total_damage1 += damage
-                
-                # Get owner names for the log
-                attacking_owner = user1.nickname if attacking_ship in user1_active else user2.nickname
-                target_owner = user1.nickname if target_ship in user1_active else user2.nickname
-                
-                battle_log.append(
-                    f"{attacking_ship['ship_name']} ({attacking_owner}) hits {target_ship['ship_name']} ({target_owner}) for {damage:.1f} damage! "
-                    f"HP: {max(0, target_ship['current_hp']):.1f}"
-                )
-                
-                # Remove destroyed ship from active list
-                if target_ship['current_hp'] <= 0:
-                    battle_log.append(f"{target_ship['ship_name']} destroyed!")
-                    user2_active.remove(target_ship)
-                    break
-        
-        # Check if User2 fleet is destroyed
-        if not user2_active:
-            break
-        
-        # User2 fleet attacks User1 fleet
-        for attacking_ship in user2_active:
-            if not user1_active:  # Check if enemy fleet still exists
-                break
-            
-            # Select target based on formation strategy
-            target_ship = select_target_by_formation(user2_formation, user1_active)
-            if not target_ship:
-                continue
-            
-            # Calculate evasion with formation modifier (DEFENSIVE impacts enemy evasion)
-            target_evasion = target_ship['evasion'] * get_formation_evasion_modifier(user1_formation)
-            
-            # Each ship attacks based on its fire rate
-            for _ in range(int(attacking_ship['fire_rate'])):
-                if target_ship['current_hp'] <= 0:
-                    break
-                
-                # Evasion check
-                if random.random() < target_evasion:
-                    # Get owner names for the log
-                    attacking_owner = user1.nickname if attacking_ship in user1_active else user2.nickname
-                    target_owner = user1.nickname if target_ship in user1_active else user2.nickname
-                    
-                    battle_log.append(f"{target_ship['ship_name']} ({target_owner}) evaded attack from {attacking_ship['ship_name']} ({attacking_owner})!")
-                    continue
-                
-                # Calculate damage
-                base_damage = attacking_ship['attack'] - (target_ship['shield'] * SHIELD_DAMAGE_REDUCTION)
-                damage = base_damage * random.uniform(*DAMAGE_VARIATION_RANGE)
-                damage = max(1, damage)
-
-                # Apply damage
-                target_ship['current_hp'] -= damage
-                total_damage2 += damage
-
-                # Get owner names for the log
-                attacking_owner = user1.nickname if attacking_ship in user1_active else user2.nickname
-                target_owner = user1.nickname if target_ship in user1_active else user2.nickname
-                
-                battle_log.append(
-                    f"{attacking_ship['ship_name']} ({attacking_owner}) hits {target_ship['ship_name']} ({target_owner}) for {damage:.1f} damage! "
-                    f"HP: {max(0, target_ship['current_hp']):.1f}"
-                )
-
-                # Remove destroyed ship from active list
-                if target_ship['current_hp'] <= 0:
-                    battle_log.append(f"{target_ship['ship_name']} destroyed!")
-                    user1_active.remove(target_ship)
-                    break
-    
-    # Determine winner based on remaining ships or total damage
-    user1_survivors = [ship for ship in user1_fleet if ship['current_hp'] > 0]
-    user2_survivors = [ship for ship in user2_fleet if ship['current_hp'] > 0]
-    
-    if user1_survivors and not user2_survivors:
-        winner = user1
-        loser = user2
-        battle_log.append(f"{user1.nickname} wins! All enemy ships destroyed.")
-    elif user2_survivors and not user1_survivors:
-        winner = user2
-        loser = user1
-        battle_log.append(f"{user2.nickname} wins! All enemy ships destroyed.")
-    elif total_damage1 > total_damage2:
-        winner = user1
-        loser = user2
-        battle_log.append(f"{user1.nickname} wins by total damage! ({total_damage1:.1f} vs {total_damage2:.1f})")
-    elif total_damage2 > total_damage1:
-        winner = user2
-        loser = user1
-        battle_log.append(f"{user2.nickname} wins by total damage! ({total_damage2:.1f} vs {total_damage1:.1f})")
-    else:
-        # Tie-breaker: user with more surviving ships wins
-        if len(user1_survivors) > len(user2_survivors):
-            winner = user1
-            loser = user2
-            battle_log.append(f"{user1.nickname} wins by more surviving ships!")
-        elif len(user2_survivors) > len(user1_survivors):
-            winner = user2
-            loser = user1
-            battle_log.append(f"{user2.nickname} wins by more surviving ships!")
-        else:
-            # Final tie-breaker: random
-            winner = random.choice([user1, user2])
-            loser = user2 if winner == user1 else user1
-            battle_log.append(f"{winner.nickname} wins by chance in a perfect tie!")
+    user1_fleet = apply_battle_bonuses(user1_fleet_base, db, rank_bonuses)
+    user2_fleet = apply_battle_bonuses(user2_fleet_base, db, rank_bonuses)
+    
+    # Simulate the battle on plain snapshots of both fleets with its own seeded RNG
+    # (in a worker process when the battle process pool is enabled)
+    fleet_a = [to_combat_ship(ship_stats) for ship_stats in user1_fleet]
+    fleet_b = [to_combat_ship(ship_stats) for ship_stats in user2_fleet]
+    seed = new_battle_seed()
+    result = run_battle_simulation(
+        fleet_a,
+        fleet_b,
+        user1_formation,
+        user2_formation,
+        rng=random.Random(seed),
+        engine=engine,
+        names=(user1.nickname, user2.nickname),
+        log_level=log_level
+    )
+    
+    if matchups is not None:
+        collect_battle_matchups(
+            matchups, (user1_formation, user2_formation),
+            ([ship.ship_id for ship in user1_ships], [ship.ship_id for ship in user2_ships]),
+            result.final_hp, result.total_damage, result.winner
+        )
+    
+    # Carry the battle outcome back to the fleet stats
+    for fleet, final_hp in zip((user1_fleet, user2_fleet), result.final_hp):
+        for ship_stats, current_hp in zip(fleet, final_hp):
+            ship_stats['current_hp'] = current_hp
+    
+    # Post-battle lines (restorations, destroyed ships, rewards, XP); the combat
+    # part of the log is rendered from the battle event stream
+    battle_log = []
+    battle_type = result.battle_type
+    fleet_info = result.fleet_info
+    total_damage1, total_damage2 = result.total_damage
+    winner, loser = (user1, user2) if result.winner == 0 else (user2, user1)
     
     # Remove battle bonuses and apply damage degradation to ships
     destroyed_ships = []
-    ships_destroyed_by_user1 = 0
-    ships_destroyed_by_user2 = 0
     ships_lost_by_user1 = 0
     ships_lost_by_user2 = 0
     
@@ -438,7 +827,6 @@ def battle_between_users(
         if ship_stats['current_hp'] <= 0:
             destroyed_ships.append(f"{user1.nickname}'s {ship_obj.ship_name} was destroyed.")
             ships_lost_by_user1 += 1
-            ships_destroyed_by_user2 += 1
     
     # Process User2's ships - remove bonuses and apply degradation
     remove_battle_bonuses_and_apply_degradation(user2_fleet, user2.nickname)
@@ -447,7 +835,6 @@ def battle_between_users(
         if ship_stats['current_hp'] <= 0:
             destroyed_ships.append(f"{user2.nickname}'s {ship_obj.ship_name} was destroyed.")
             ships_lost_by_user2 += 1
-            ships_destroyed_by_user1 += 1
     
     # Special NPC restoration for destroyed ships
     is_user1_npc = user1.nickname.startswith("NPC_")
@@ -483,54 +870,11 @@ def battle_between_users(
     for msg in destroyed_ships:
         battle_log.append(msg)
     
-    # Update user statistics
-    winner.victories += 1
-    loser.defeats += 1
-    
-    user1.damage_dealt += total_damage1
-    user1.damage_taken += total_damage2
-    user2.damage_dealt += total_damage2
-    user2.damage_taken += total_damage1
-    
-    user1.ships_destroyed_by_user += ships_destroyed_by_user1
-    user1.ships_lost_by_user += ships_lost_by_user1
-    user2.ships_destroyed_by_user += ships_destroyed_by_user2
-    user2.ships_lost_by_user += ships_lost_by_user2
-    
-    # Award credits for victories
-    if winner.nickname.startswith("NPC_"):
-        # NPC winner doesn't get credits
-        pass
-    else:
-        loser_value = sum(ship_stats['value'] for ship_stats in 
-                         (user2_fleet if winner == user1 else user1_fleet))
-        credits_awarded = int(loser_value * CREDITS_AWARDED_MULTIPLIER)
-        winner.currency_value += credits_awarded
-        battle_log.append(f"{winner.nickname} awarded {credits_awarded:.0f} credits!")
-    
-    # Calculate and update Elo ratings
-    winner.elo_rank, loser.elo_rank = calculate_elo_change(winner.elo_rank, loser.elo_rank)
-    
-    # Calculate XP gain for winner and loser
-    if not winner.nickname.startswith("NPC_"):
-        winner_xp, _ = calculate_xp_gain(winner.level, loser.level)
-        winner.experience += winner_xp
-        battle_log.append(f"{winner.nickname} gains {winner_xp} XP!")
-        
-        # Update winner's level and rank based on new experience
-        level_changed = update_user_progression(winner, winner_xp)
-        if level_changed:
-            battle_log.append(f"{winner.nickname} leveled up to level {winner.level}!")
-
-    if not loser.nickname.startswith("NPC_"):
-        _, loser_xp = calculate_xp_gain(winner.level, loser.level)
-        loser.experience += loser_xp
-        battle_log.append(f"{loser.nickname} gains {loser_xp} XP!")
-        
-        # Update loser's level and rank based on new experience
-        level_changed = update_user_progression(loser, loser_xp)
-        if level_changed:
-            battle_log.append(f"{loser.nickname} leveled up to level {loser.level}!")
+    loser_value = sum(ship_stats['value'] for ship_stats in (user2_fleet if winner == user1 else user1_fleet))
+    _apply_battle_rewards(
+        user1, user2, winner, loser, total_damage1, total_damage2,
+        ships_lost_by_user1, ships_lost_by_user2, loser_value, battle_log
+    )
     
     # Create and save battle history
     final_user1_hp = sum(max(0, ship['current_hp']) for ship in user1_fleet)
@@ -586,24 +930,184 @@ def battle_between_users(
             "base_value": ship_obj.base_value
         })
     
+    # The combat part of the log is stored as the compact event stream ("events"),
+    # as rendered text ("full") or not at all and regenerated from the seed ("seed")
+    log_storage = BATTLE_LOG_STORAGE if BATTLE_LOG_STORAGE in ("full", "seed") else "events"
+    if log_level == BATTLE_LOG_NONE:
+        # Outcome only: rewards and XP are still recorded in the user statistics
+        battle_log = []
+    
     battle_history = BattleHistory(
         participants=user1_ship_data + user2_ship_data,
-        battle_log=battle_log,
+        battle_log=result.battle_log + battle_log if log_storage == "full" else battle_log,
+        battle_events=result.events if log_storage == "events" else None,
         winner_user_id=winner.user_id,
+        seed=seed,
+        engine_version=get_engine_version(engine),
+        fleet_snapshot={**result.snapshot, "user_ids": [user1.user_id, user2.user_id]},
         extra={
             "formations": {"user1": user1_formation, "user2": user2_formation},
             "final_hp": {user1.nickname: final_user1_hp, user2.nickname: final_user2_hp},
             "total_damage": {user1.nickname: total_damage1, user2.nickname: total_damage2},
             "winner": winner.nickname,
             "battle_type": f"{battle_type} {fleet_info}",
+            "engine": engine,
+            "rounds": result.rounds,
+            "log_storage": log_storage,
+            "log_level": log_level,
             "ships_destroyed": {"user1": ships_lost_by_user1, "user2": ships_lost_by_user2}
         }
     )
     
-    db.add(battle_history)
-    db.commit()
+    message = f"{winner.nickname} wins the {battle_type.lower()} battle {fleet_info}!"
+    return battle_history, result.battle_log + battle_log, message
+
+
+def replay_battle_history(db: Session, battle_id: int):
+    """
+    Regenerate the full battle log of a stored battle from its seed and fleet snapshot.
+    
+    Args:
+        db: Database session
+        battle_id: ID of the battle to replay
+    
+    Returns:
+        Tuple of (battle data dict, message) or (None, error_message)
+    """
+    battle = db.query(BattleHistory).filter(BattleHistory.battle_id == battle_id).first()
+    if not battle:
+        return None, "Battle not found"
+    
+    stored_log = battle.battle_log or []
+    battle_data = {
+        "battle_id": battle.battle_id,
+        "timestamp": battle.timestamp,
+        "participants": battle.participants,
+        "winner_user_id": battle.winner_user_id,
+        "battle_log": stored_log,
+        "extra": battle.extra,
+        "seed": battle.seed,
+        "engine_version": battle.engine_version
+    }
+    
+    if battle.seed is None or not battle.fleet_snapshot:
+        # Battles recorded before seeded replay always stored the full log
+        return battle_data, "Battle recorded without seed, returning stored log"
+    
+    try:
+        result = replay_battle(battle.seed, battle.engine_version, battle.fleet_snapshot)
+    except ValueError as e:
+        return None, str(e)
+    
+    winner_user_id = battle.fleet_snapshot["user_ids"][result.winner]
+    if winner_user_id is not None and winner_user_id != battle.winner_user_id:
+        return None, "Replay diverged from the recorded battle outcome"
+    
+    # Stored lines after the combat part are the persistence lines (rewards, XP)
+    if (battle.extra or {}).get("log_storage") == "full":
+        stored_log = stored_log[len(result.battle_log):]
+    battle_data["battle_log"] = result.battle_log + stored_log
+    
+    return battle_data, "Battle replayed successfully"
+
+
+def get_battle_events(db: Session, battle_id: int):
+    """
+    Get the compact event stream of a stored battle for analysis or client-side rendering.
+    
+    Battles stored without events are replayed from their seed.
+    
+    Args:
+        db: Database session
+        battle_id: ID of the battle
+    
+    Returns:
+        Tuple of (battle events dict, message) or (None, error_message)
+    """
+    battle = db.query(BattleHistory).filter(BattleHistory.battle_id == battle_id).first()
+    if not battle:
+        return None, "Battle not found"
+    
+    battle_events, message = _load_battle_events(battle)
+    if battle_events is None:
+        return None, message
     
-    return battle_history, f"{winner.nickname} wins the {battle_type.lower()} battle {fleet_info}!"
+    return {
+        "battle_id": battle.battle_id,
+        "fleet_snapshot": battle.fleet_snapshot,
+        "battle_events": battle_events
+    }, "Battle events retrieved successfully"
+
+
+def get_battle_stream(db: Session, battle_id: int):
+    """
+    Get the plain data needed to stream a stored battle round by round (see build_battle_stream).
+    
+    Args:
+        db: Database session
+        battle_id: ID of the battle
+    
+    Returns:
+        Tuple of (stream data dict, message) or (None, error_message)
+    """
+    battle = db.query(BattleHistory).filter(BattleHistory.battle_id == battle_id).first()
+    if not battle:
+        return None, "Battle not found"
+    return build_battle_stream(battle)
+
+
+def build_battle_stream(battle: BattleHistory):
+    """
+    Get the plain data needed to stream a battle round by round (see battle_engine.iter_battle_rounds),
+    so the stream can be produced after the database session is gone.
+    
+    Args:
+        battle: Stored battle, e.g. as returned by battle_between_users
+    
+    Returns:
+        Tuple of (stream data dict, message) or (None, error_message)
+    """
+    if not battle.fleet_snapshot:
+        return None, "Battle recorded without fleet snapshot"
+    
+    battle_events, message = _load_battle_events(battle)
+    if battle_events is None:
+        return None, message
+    
+    # The persistence lines (rewards, XP) follow the combat lines when the full log is
+    # stored or the battle was just returned by battle_between_users
+    post_battle_log = battle.battle_log or []
+    combat_chunks = iter_battle_rounds(battle.fleet_snapshot, battle_events)
+    first_chunk = next(combat_chunks)
+    if post_battle_log[:1] == first_chunk["lines"][:1]:
+        combat_lines = len(first_chunk["lines"]) + sum(len(chunk["lines"]) for chunk in combat_chunks)
+        post_battle_log = post_battle_log[combat_lines:]
+    
+    return {
+        "battle_id": battle.battle_id,
+        "winner_user_id": battle.winner_user_id,
+        "fleet_snapshot": battle.fleet_snapshot,
+        "battle_events": battle_events,
+        "post_battle_log": post_battle_log,
+        "extra": battle.extra
+    }, "Battle stream ready"
+
+
+def _load_battle_events(battle: BattleHistory):
+    """
+    Get the stored event stream of a battle, replaying it from its seed if it was stored without events.
+    
+    Returns:
+        Tuple of (battle events dict, message) or (None, error_message)
+    """
+    if battle.battle_events is not None:
+        return battle.battle_events, "Battle events stored"
+    if battle.seed is None or not battle.fleet_snapshot:
+        return None, "Battle recorded without event stream"
+    try:
+        return replay_battle(battle.seed, battle.engine_version, battle.fleet_snapshot).events, "Battle events replayed"
+    except ValueError as e:
+        return None, str(e)
 
 
 def activate_owned_ship(db: Session, user_id: int, ship_number: int):
@@ -611,6 +1115,11 @@ def activate_owned_ship(db: Session, user_id: int, ship_number: int):
     Set the status of a user's owned ship to 'active'.
     Now includes validation of maximum active ships based on user rank.
     """
+    return retry_on_conflict(db, _activate_owned_ship, user_id, ship_number)
+
+
+def _activate_owned_ship(db: Session, user_id: int, ship_number: int):
+    """One attempt of activate_owned_ship; raises StaleDataError if a battle updated the ship first."""
     from backend.app.utils.progression_utils import can_activate_ship
     
     # Get the user to check rank limits
@@ -646,6 +1155,11 @@ def deactivate_owned_ship(db: Session, user_id: int, ship_number: int):
     Set the status of a user's owned ship from 'active' to 'owned'.
     Allows users to free up active ship slots.
     """
+    return retry_on_conflict(db, _deactivate_owned_ship, user_id, ship_number)
+
+
+def _deactivate_owned_ship(db: Session, user_id: int, ship_number: int):
+    """One attempt of deactivate_owned_ship; raises StaleDataError if a battle updated the ship first."""
     owned_ship = db.query(OwnedShips).filter(
         OwnedShips.user_id == user_id,
         OwnedShips.ship_number == ship_number,
@@ -676,6 +1190,31 @@ def get_user_ship_limits_info(db: Session, user_id: int):
     max_allowed = get_max_active_ships_for_user(user, db)
     current_active = count_active_ships_for_user(user_id, db)
     
+    return _ship_limits_info(user, max_allowed, current_active)
+
+
+async def get_user_ship_limits_info_async(db: AsyncSession, user_id: int):
+    """
+    Async variant of get_user_ship_limits_info.
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        return None
+    
+    rank_bonus = await get_rank_bonus_async(user.rank, db)
+    # Default fallback if rank bonus not found (see get_max_active_ships_for_user)
+    max_allowed = rank_bonus.max_active_ships if rank_bonus else 1
+    current_active = await db.scalar(
+        select(func.count()).select_from(OwnedShips).where(OwnedShips.user_id == user_id, OwnedShips.status == 'active')
+    )
+    
+    return _ship_limits_info(user, max_allowed, current_active)
+
+
+def _ship_limits_info(user: User, max_allowed: int, current_active: int) -> dict:
+    """
+    Build the ship limits information of a user.
+    """
     return {
         "user_rank": user.rank.value,
         "user_level": user.level,
@@ -0,0 +1,146 @@
+from sqlalchemy import select, update, bindparam, case
+from sqlalchemy.orm import Session
+from database.models import User, BattleHistory
+from database.base_data import get_users_data
+import time
+import numpy as np
+from backend.app.utils.constants import ELO_BASE_CHANGE, ELO_EXPECTED_SCORE_DIVISOR
+from backend.app.utils.constants import ELO_INITIAL_RATING, ELO_RECOMPUTE_CHUNK_SIZE
+from backend.app.utils.elo_utils import apply_elo_chunk
+from backend.app.utils.leaderboard_registry import invalidate_leaderboards
+
+# Ratings closer than this are considered unchanged
+ELO_TOLERANCE = 1e-6
+
+
+def recompute_elo_ladder(
+    db: Session,
+    base_change: float = ELO_BASE_CHANGE,
+    divisor: float = ELO_EXPECTED_SCORE_DIVISOR,
+    chunk_size: int = ELO_RECOMPUTE_CHUNK_SIZE,
+    apply: bool = False,
+    top: int = 10
+) -> dict:
+    """
+    Rebuild every user's Elo rating by replaying all battles in timestamp order.
+
+    Every user starts from their initial rating (ELO_INITIAL_RATING, or the base data
+    rating for seeded users) and each BattleHistory row applies the calculate_elo_change
+    update to its winner and loser. Battles are streamed in chunks of chunk_size rows
+    (only the winner and the two user ids are loaded) and applied with array-based
+    bookkeeping (see elo_utils), so memory is bounded by the number of users and the
+    chunk size, not by the number of battles.
+
+    With other base_change or divisor values than the configured constants this is a
+    what-if run: compare the report with the live ladder before applying anything.
+
+    Args:
+        db: Database session
+        base_change: Maximum rating change per battle (K factor)
+        divisor: Rating difference for 10x expected odds
+        chunk_size: Battles loaded per chunk
+        apply: Write the recomputed ratings. Only users whose rating changed are updated,
+               and only if they were not modified since they were read (version check);
+               users updated concurrently by a battle are reported as conflicts
+        top: Number of largest rating changes to include in the report
+
+    Returns:
+        Report dict with the parameters, battles replayed and skipped, users, users changed,
+        written and in conflict, the largest changes and the duration
+    """
+    started = time.perf_counter()
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+
+    users = db.execute(
+        select(User.user_id, User.nickname, User.elo_rank, User.version_id).order_by(User.user_id)
+    ).all()
+    index = {user.user_id: position for position, user in enumerate(users)}
+    seeded_ratings = {user["nickname"]: user["elo_rank"] for user in get_users_data()}
+    ratings = np.array([seeded_ratings.get(user.nickname, ELO_INITIAL_RATING) for user in users], dtype=np.float64)
+
+    battles = 0
+    skipped = 0
+    # The user ids are read from the fleet snapshot in SQL; the participants JSON is only
+    # loaded (and decoded) for battles recorded before fleet snapshots
+    user1_id = BattleHistory.fleet_snapshot[("user_ids", 0)].as_integer()
+    user2_id = BattleHistory.fleet_snapshot[("user_ids", 1)].as_integer()
+    query = select(
+        BattleHistory.winner_user_id,
+        user1_id,
+        user2_id,
+        case((user1_id.is_(None), BattleHistory.participants))
+    ).order_by(BattleHistory.timestamp, BattleHistory.battle_id).execution_options(yield_per=chunk_size)
+    for rows in db.execute(query).partitions():
+        winners, losers = [], []
+        for winner_user_id, first_user_id, second_user_id, participants in rows:
+            if first_user_id is not None:
+                loser_user_id = second_user_id if winner_user_id == first_user_id else first_user_id
+            else:
+                loser_user_id = next(
+                    (participant["user_id"] for participant in participants or [] if participant["user_id"] != winner_user_id),
+                    None
+                )
+            if winner_user_id is None or loser_user_id is None:
+                # Battles without a result or a second player have no Elo update
+                skipped += 1
+                continue
+            for user_id in (winner_user_id, loser_user_id):
+                if user_id not in index:
+                    # Deleted users still count for the ratings of their opponents
+                    index[user_id] = len(index)
+            winners.append(index[winner_user_id])
+            losers.append(index[loser_user_id])
+
+        if len(index) > len(ratings):
+            ratings = np.concatenate([ratings, np.full(len(index) - len(ratings), ELO_INITIAL_RATING, dtype=np.float64)])
+        apply_elo_chunk(ratings, np.array(winners, dtype=np.int64), np.array(losers, dtype=np.int64), base_change, divisor)
+        battles += len(winners)
+
+    current = np.array([user.elo_rank for user in users], dtype=np.float64)
+    recomputed = ratings[:len(users)]
+    deltas = recomputed - current
+    changed = np.flatnonzero(np.abs(deltas) > ELO_TOLERANCE)
+
+    written = 0
+    if apply and len(changed):
+        statement = update(User.__table__).where(
+            User.__table__.c.user_id == bindparam("b_user_id"),
+            User.__table__.c.version_id == bindparam("b_version_id")
+        ).values(elo_rank=bindparam("b_elo_rank"), version_id=User.__table__.c.version_id + 1)
+        for start in range(0, len(changed), chunk_size):
+            result = db.execute(statement, [
+                {
+                    "b_user_id": users[position].user_id,
+                    "b_version_id": users[position].version_id,
+                    "b_elo_rank": float(recomputed[position])
+                }
+                for position in changed[start:start + chunk_size]
+            ])
+            written += result.rowcount
+        db.commit()
+        # Bulk UPDATEs bypass the incremental leaderboard updates
+        invalidate_leaderboards()
+
+    largest = changed[np.argsort(-np.abs(deltas[changed]), kind="stable")[:top]]
+    return {
+        "base_change": base_change,
+        "divisor": divisor,
+        "battles": battles,
+        "skipped_battles": skipped,
+        "users": len(users),
+        "changed": len(changed),
+        "written": written,
+        "conflicts": len(changed) - written if apply else 0,
+        "applied": apply,
+        "largest_changes": [
+            {
+                "user_id": users[position].user_id,
+                "nickname": users[position].nickname,
+                "elo_before": float(current[position]),
+                "elo_after": float(recomputed[position])
+            }
+            for position in largest
+        ],
+        "duration_ms": int((time.perf_counter() - started) * 1000)
+    }
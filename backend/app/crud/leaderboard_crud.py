@@ -0,0 +1,57 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database.models import User
+from backend.app.utils.leaderboard_registry import LEADERBOARD_CATEGORIES, get_leaderboard
+
+
+def get_leaderboard_page(db: Session, category: str, offset: int = 0, limit: int = 50):
+    """
+    Get a page of a leaderboard from the in-memory ranking.
+    
+    Only the nicknames of the users on the page are read from the database
+    (one primary key lookup), never the whole users table.
+    
+    Args:
+        db: Database session
+        category: Leaderboard category ("elo", "victories", "level", "damage")
+        offset: Number of entries to skip (rank offset + 1 is the first rank returned)
+        limit: Maximum entries to return
+    
+    Returns:
+        Tuple of (page dict, message) or (None, error_message)
+    """
+    if category not in LEADERBOARD_CATEGORIES:
+        return None, f"Invalid leaderboard category. Valid categories: {', '.join(LEADERBOARD_CATEGORIES)}"
+    
+    entries, total = get_leaderboard(category, db).page(offset, limit)
+    nicknames = dict(db.execute(
+        select(User.user_id, User.nickname).where(User.user_id.in_([user_id for _, user_id, _ in entries]))
+    ).all()) if entries else {}
+    
+    return {
+        "category": category,
+        "total": total,
+        "offset": offset,
+        "entries": [
+            {"rank": rank, "user_id": user_id, "nickname": nicknames.get(user_id), "score": score}
+            for rank, user_id, score in entries
+        ]
+    }, "Leaderboard retrieved successfully"
+
+
+def get_user_rank(db: Session, category: str, user_id: int):
+    """
+    Get the rank of a user in a leaderboard (O(log n) in the in-memory ranking).
+    
+    Returns:
+        Tuple of (rank dict, message) or (None, error_message)
+    """
+    if category not in LEADERBOARD_CATEGORIES:
+        return None, f"Invalid leaderboard category. Valid categories: {', '.join(LEADERBOARD_CATEGORIES)}"
+    
+    ranked = get_leaderboard(category, db).rank_of(user_id)
+    if ranked is None:
+        return None, "User not found"
+    
+    rank, score, total = ranked
+    return {"category": category, "user_id": user_id, "rank": rank, "score": score, "total": total}, "Rank retrieved successfully"
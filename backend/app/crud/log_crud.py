@@ -1,7 +1,17 @@
+from sqlalchemy import select, func, delete, union_all, tuple_
 from sqlalchemy.orm import Session
-from database import SystemLogs
+from database import SystemLogs, utc_now
+from database.log_partitions import partitions_for_range, list_log_partitions, partition_table, next_month, naive_utc
+from database.log_partitions import ensure_log_partitions, roll_log_partitions, drop_log_partition, is_partitioned_natively
 from backend.app.schemas.log_schemas import SystemLogCreate, LogQueryRequest
+from backend.app.config import LOG_RETENTION_DAYS, LOG_ARCHIVE_DIR, LOG_ARCHIVE_CHUNK_SIZE, LOG_COUNT_ESTIMATE_LIMIT
+from datetime import date, datetime, timedelta
 from typing import List, Optional, Tuple
+import base64
+import gzip
+import json
+import os
+import time
 
 def create_log(db: Session, log: SystemLogCreate) -> SystemLogs:
     db_log = SystemLogs(**log.model_dump())
@@ -10,43 +20,118 @@ def create_log(db: Session, log: SystemLogCreate) -> SystemLogs:
     db.refresh(db_log)
     return db_log
 
+def _month_tables(db: Session) -> list:
+    """Month tables of rolled logs (SQLite; PostgreSQL partitions are read through system_logs)."""
+    return partitions_for_range(db.connection())[1:]
+
 def get_log(db: Session, log_id: int) -> Optional[SystemLogs]:
-    return db.query(SystemLogs).filter(SystemLogs.log_id == log_id).first()
+    log = db.query(SystemLogs).filter(SystemLogs.log_id == log_id).first()
+    if log is None:
+        for table in _month_tables(db):
+            log = db.execute(
+                select(SystemLogs).from_statement(select(table).where(table.c.log_id == log_id))
+            ).scalar_one_or_none()
+            if log is not None:
+                break
+    return log
 
-def get_logs(db: Session, query_params: LogQueryRequest) -> Tuple[List[SystemLogs], int]:
-    """
-    Get logs with filtering and pagination
-    Returns tuple of (logs_list, total_count)
-    """
-    # Build base query
-    query = db.query(SystemLogs)
-    
-    # Apply filters
+def _log_filters(columns, query_params: LogQueryRequest) -> list:
+    """Filter conditions of a log query on the columns of system_logs or of a month table."""
+    filters = []
     if query_params.user_id is not None:
-        query = query.filter(SystemLogs.user_id == query_params.user_id)
-    
+        filters.append(columns.user_id == query_params.user_id)
     if query_params.log_level:
-        query = query.filter(SystemLogs.log_level == query_params.log_level)
-    
+        filters.append(columns.log_level == query_params.log_level)
     if query_params.log_category:
-        query = query.filter(SystemLogs.log_category == query_params.log_category)
-    
+        filters.append(columns.log_category == query_params.log_category)
     if query_params.action:
-        query = query.filter(SystemLogs.action.ilike(f"%{query_params.action}%"))
-    
+        filters.append(columns.action.ilike(f"%{query_params.action}%"))
     if query_params.start_date:
-        query = query.filter(SystemLogs.timestamp >= query_params.start_date)
-    
+        filters.append(columns.timestamp >= query_params.start_date)
     if query_params.end_date:
-        query = query.filter(SystemLogs.timestamp <= query_params.end_date)
-    
-    # Get total count before applying pagination
-    total_count = query.count()
-    
-    # Apply pagination and ordering (most recent first)
-    logs = query.order_by(SystemLogs.timestamp.desc()).offset(query_params.offset).limit(query_params.limit).all()
-    
-    return logs, total_count
+        filters.append(columns.timestamp <= query_params.end_date)
+    return filters
+
+def encode_log_cursor(log: SystemLogs) -> str:
+    """Opaque cursor of the page starting after a log: its (timestamp, log_id) key."""
+    key = json.dumps([log.timestamp.isoformat(), log.log_id])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+def decode_log_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(timestamp, log_id) key of a cursor; raises ValueError if it is not a valid cursor."""
+    try:
+        timestamp, log_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except (ValueError, TypeError) as error:
+        raise ValueError("Invalid cursor") from error
+
+def _count_logs(db: Session, tables: list, query_params: LogQueryRequest) -> Optional[int]:
+    """Total count of a log query in the requested count mode (exact, estimate or none)."""
+    if query_params.count == "none":
+        return None
+    if query_params.count == "estimate":
+        if is_partitioned_natively(db.connection()):
+            # Row estimate of the planner, from the table statistics: no rows are read
+            query = select(SystemLogs.log_id).where(*_log_filters(SystemLogs.__table__.c, query_params))
+            compiled = query.compile(dialect=db.get_bind().dialect)
+            plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return int(plan[0]["Plan"]["Plan Rows"])
+        # No planner estimate: count, but stop after LOG_COUNT_ESTIMATE_LIMIT rows
+        total = 0
+        for table in tables:
+            matching = select(table.c.log_id).where(*_log_filters(table.c, query_params)).limit(LOG_COUNT_ESTIMATE_LIMIT - total)
+            total += db.execute(select(func.count()).select_from(matching.subquery())).scalar()
+            if total >= LOG_COUNT_ESTIMATE_LIMIT:
+                break
+        return total
+    return sum(
+        db.execute(select(func.count()).select_from(table).where(*_log_filters(table.c, query_params))).scalar()
+        for table in tables
+    )
+
+def get_logs(db: Session, query_params: LogQueryRequest) -> Tuple[List[SystemLogs], Optional[int], Optional[str]]:
+    """
+    Get logs with filtering and pagination, most recent first
+    Returns tuple of (logs_list, total_count, next_cursor)
+
+    Logs are ordered by (timestamp, log_id), which the timestamp indexes end
+    with. With a cursor the page starts right after the cursor's key (keyset
+    pagination), so every page is one ordered index range scan, as cheap as
+    the first; offset pagination is kept for compatibility. next_cursor is
+    None on the last page. The total count is exact, estimated or skipped
+    (query_params.count), as counting reads every matching log.
+
+    Only the partitions overlapping start_date..end_date are read: PostgreSQL
+    prunes the others itself, on SQLite the hot table and the overlapping
+    month tables are queried together.
+    """
+    after = decode_log_cursor(query_params.cursor) if query_params.cursor else None
+    offset = 0 if after else query_params.offset
+    tables = partitions_for_range(db.connection(), query_params.start_date, query_params.end_date)
+
+    pages = []
+    for table in tables:
+        query = select(table).where(*_log_filters(table.c, query_params))
+        if after:
+            query = query.where(tuple_(table.c.timestamp, table.c.log_id) < after)
+        # One extra log tells whether there is a next page
+        pages.append(query.order_by(table.c.timestamp.desc(), table.c.log_id.desc()).limit(offset + query_params.limit + 1))
+    if len(pages) == 1:
+        page = pages[0].offset(offset)
+    else:
+        # No month table can contribute more logs than the end of the page
+        page = union_all(*(select(query.subquery()) for query in pages))
+        page = page.order_by(
+            page.selected_columns.timestamp.desc(), page.selected_columns.log_id.desc()
+        ).offset(offset).limit(query_params.limit + 1)
+    logs = db.execute(select(SystemLogs).from_statement(page)).scalars().all()
+
+    next_cursor = None
+    if len(logs) > query_params.limit:
+        logs = logs[:query_params.limit]
+        next_cursor = encode_log_cursor(logs[-1]) if logs else None
+    return logs, _count_logs(db, tables, query_params), next_cursor
 
 def delete_log(db: Session, log_id: int) -> bool:
     db_log = db.query(SystemLogs).filter(SystemLogs.log_id == log_id).first()
@@ -54,4 +139,85 @@ def delete_log(db: Session, log_id: int) -> bool:
         db.delete(db_log)
         db.commit()
         return True
+    for table in _month_tables(db):
+        if db.execute(delete(table).where(table.c.log_id == log_id)).rowcount:
+            db.commit()
+            return True
     return False
+
+def _json_value(value):
+    """JSON encoding of the column values json does not handle (timestamps)."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def _write_archive(db: Session, name: str, path: str) -> int:
+    """Stream every row of a month partition into a gzip NDJSON file; returns the number of rows."""
+    table = partition_table(name)
+    query = select(table).order_by(table.c.timestamp, table.c.log_id).execution_options(yield_per=LOG_ARCHIVE_CHUNK_SIZE)
+    rows = 0
+    # Written under a temporary name so an interrupted run never leaves a truncated archive
+    with gzip.open(f"{path}.tmp", "wt", encoding="utf-8") as archive:
+        for row in db.execute(query).mappings():
+            archive.write(json.dumps(dict(row), default=_json_value) + "\n")
+            rows += 1
+    os.replace(f"{path}.tmp", path)
+    return rows
+
+def archive_logs(
+    db: Session,
+    retention_days: int = LOG_RETENTION_DAYS,
+    archive_dir: str = LOG_ARCHIVE_DIR,
+    now: datetime = None
+) -> dict:
+    """
+    Log retention job: archive and drop the month partitions older than retention_days.
+
+    Prepares the partitions first (PostgreSQL: current and next month exist and
+    rows stranded in the DEFAULT partition are moved into their month
+    partitions; SQLite: the logs of closed months are rolled out of the hot
+    table), so every old log is in a month partition. Then every month
+    partition that ended more than retention_days ago is written to
+    archive_dir/<partition>.ndjson.gz (one JSON object per log, oldest first)
+    and dropped. A partition is only dropped once its archive is
+    complete, so an interrupted run is simply repeated.
+
+    Args:
+        db: Database session
+        retention_days: Days logs are kept in the database
+        archive_dir: Directory of the archive files (created if needed)
+        now: Reference time (defaults to now)
+
+    Returns:
+        Report dict with the cutoff, the rows rolled per month table, the archived
+        partitions (name, rows, file) and the duration
+    """
+    started = time.perf_counter()
+    if retention_days < 0:
+        raise ValueError("retention_days must not be negative")
+    now = now or utc_now()
+    cutoff = now - timedelta(days=retention_days)
+
+    connection = db.connection()
+    ensure_log_partitions(connection, now)
+    rolled = roll_log_partitions(connection, now)
+    db.commit()
+
+    archived = []
+    for month, name in list_log_partitions(db.connection()):
+        if next_month(month) > naive_utc(cutoff):
+            continue
+        os.makedirs(archive_dir, exist_ok=True)
+        path = os.path.join(archive_dir, f"{name}.ndjson.gz")
+        rows = _write_archive(db, name, path)
+        drop_log_partition(db.connection(), name)
+        db.commit()
+        archived.append({"partition": name, "rows": rows, "file": path})
+
+    return {
+        "retention_days": retention_days,
+        "cutoff": cutoff.isoformat(),
+        "rolled": rolled,
+        "archived": archived,
+        "duration_ms": int((time.perf_counter() - started) * 1000)
+    }
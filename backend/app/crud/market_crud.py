@@ -1,9 +1,14 @@
 from sqlalchemy.orm import Session
 from database.models import User, Ship, OwnedShips
 from backend.app.utils.constants import SELL_VALUE_MULTIPLIER
+from backend.app.crud.battle_crud import retry_on_conflict
 
 # --- Market CRUD Operations ---
+# Currency updates race battles rewarding the same user: retried on a lost version check
 def buy_ship(db: Session, user_id: int, ship_id: int):
+    return retry_on_conflict(db, _buy_ship, user_id, ship_id)
+
+def _buy_ship(db: Session, user_id: int, ship_id: int):
     user = db.query(User).filter(User.user_id == user_id).first()
     ship = db.query(Ship).filter(Ship.ship_id == ship_id).first()
     if not user or not ship:
@@ -39,6 +44,9 @@ def buy_ship(db: Session, user_id: int, ship_id: int):
     return True, "Ship bought successfully", owned_ship.ship_number
 
 def sell_ship(db: Session, user_id: int, owned_ship_id: int):
+    return retry_on_conflict(db, _sell_ship, user_id, owned_ship_id)
+
+def _sell_ship(db: Session, user_id: int, owned_ship_id: int):
     owned_ship = db.query(OwnedShips).filter(
         OwnedShips.ship_number == owned_ship_id,
         OwnedShips.user_id == user_id,
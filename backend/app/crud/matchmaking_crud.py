@@ -0,0 +1,77 @@
+from sqlalchemy import select, func, exists
+from sqlalchemy.orm import Session
+from database.models import User, OwnedShips
+from backend.app.utils.constants import MATCHMAKING_CANDIDATE_FACTOR, MATCHMAKING_LEVEL_WEIGHT
+
+# Columns returned for every opponent
+OPPONENT_COLUMNS = (
+    User.user_id,
+    User.nickname,
+    User.elo_rank,
+    User.level,
+    User.rank,
+    User.default_formation,
+    User.victories,
+    User.defeats
+)
+
+
+def find_opponents(db: Session, user_id: int, k: int = 10, active_only: bool = True):
+    """
+    Find the k opponents closest to a user by Elo rating and level.
+    
+    Candidates are read with two queries walking the Elo index (idx_user_elo_rank)
+    outwards from the user's rating, k * MATCHMAKING_CANDIDATE_FACTOR above and as many
+    below, so the cost depends on k and not on the number of users. The candidates are
+    then ranked by Elo distance plus MATCHMAKING_LEVEL_WEIGHT Elo points per level of
+    difference.
+    
+    Args:
+        db: Database session
+        user_id: ID of the user looking for opponents (never returned)
+        k: Number of opponents to return
+        active_only: Only return opponents with at least one active ship
+    
+    Returns:
+        Tuple of (list of opponent dicts, message) or (None, error_message)
+    """
+    user = db.execute(select(User.user_id, User.elo_rank, User.level).where(User.user_id == user_id)).first()
+    if not user:
+        return None, "User not found"
+    
+    query = select(*OPPONENT_COLUMNS).where(User.user_id != user.user_id)
+    if active_only:
+        query = query.where(exists().where(OwnedShips.user_id == User.user_id, OwnedShips.status == 'active'))
+    limit = k * MATCHMAKING_CANDIDATE_FACTOR
+    above = db.execute(
+        query.where(User.elo_rank >= user.elo_rank).order_by(User.elo_rank.asc()).limit(limit)
+    ).mappings().all()
+    below = db.execute(
+        query.where(User.elo_rank < user.elo_rank).order_by(User.elo_rank.desc()).limit(limit)
+    ).mappings().all()
+    
+    def distance(candidate):
+        return (
+            abs(candidate['elo_rank'] - user.elo_rank)
+            + MATCHMAKING_LEVEL_WEIGHT * abs(candidate['level'] - user.level)
+        )
+    
+    closest = sorted([*above, *below], key=lambda candidate: (distance(candidate), candidate['user_id']))[:k]
+    
+    active_ships = dict(db.execute(
+        select(OwnedShips.user_id, func.count()).where(
+            OwnedShips.user_id.in_([candidate['user_id'] for candidate in closest]),
+            OwnedShips.status == 'active'
+        ).group_by(OwnedShips.user_id)
+    ).all()) if closest else {}
+    
+    opponents = [
+        {
+            **candidate,
+            'active_ships': active_ships.get(candidate['user_id'], 0),
+            'elo_difference': candidate['elo_rank'] - user.elo_rank,
+            'level_difference': candidate['level'] - user.level
+        }
+        for candidate in closest
+    ]
+    return opponents, f"Found {len(opponents)} opponents"
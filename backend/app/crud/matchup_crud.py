@@ -0,0 +1,146 @@
+from sqlalchemy import select, insert, update, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+from database.models import FormationMatchupStats, ShipMatchupStats, Ship, utc_now
+from backend.app.utils.constants import FORMATION_MODIFIERS
+from backend.app.utils.matchup_utils import MATCHUP_COUNTERS, MATCHUP_FORMATION, MATCHUP_SHIP
+
+# Table and key columns of each matchup kind
+MATCHUP_TABLES = {
+    MATCHUP_FORMATION: (FormationMatchupStats.__table__, ("formation", "opponent_formation")),
+    MATCHUP_SHIP: (ShipMatchupStats.__table__, ("ship_id", "opponent_ship_id"))
+}
+
+# Dialects with an INSERT ... ON CONFLICT DO UPDATE construct
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Upsert statements by (dialect, table name), see _upsert_statement
+_upsert_statements = {}
+
+
+def record_matchup_stats(db: Session, matchups: dict) -> None:
+    """
+    Add collected matchups (see matchup_utils.collect_battle_matchups) to the stats tables.
+    
+    Each table is written with one single-row INSERT ... ON CONFLICT DO UPDATE, executed
+    for all its rows at once (executemany), that adds the new counters to the stored
+    ones, so concurrent battles never lose an update. The statement has the same shape
+    whatever the number of rows, so it is compiled once and then served from the cache.
+    Rows are written in key order, so concurrent transactions lock them in the same order.
+    Does not commit: the counters are committed with the battles they come from.
+    
+    Args:
+        db: Database session
+        matchups: Matchups dict from new_matchups
+    """
+    now = utc_now()
+    dialect = db.get_bind().dialect.name
+    for kind, (table, key_columns) in MATCHUP_TABLES.items():
+        counters = matchups.get(kind)
+        if not counters:
+            continue
+        rows = [
+            {**dict(zip(key_columns, key)), **dict(zip(MATCHUP_COUNTERS, values)), "updated_at": now}
+            for key, values in sorted(counters.items())
+        ]
+        if dialect in UPSERT_DIALECTS:
+            db.execute(_upsert_statement(dialect, table, key_columns), rows)
+        else:
+            _increment_matchup_rows(db, table, key_columns, rows)
+
+
+def _upsert_statement(dialect: str, table, key_columns):
+    """Single-row upsert adding the counters of a row to the stored ones (built once per dialect and table)."""
+    key = (dialect, table.name)
+    statement = _upsert_statements.get(key)
+    if statement is None:
+        statement = UPSERT_DIALECTS[dialect](table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={
+                **{counter: table.c[counter] + statement.excluded[counter] for counter in MATCHUP_COUNTERS},
+                "updated_at": statement.excluded.updated_at
+            }
+        )
+        _upsert_statements[key] = statement
+    return statement
+
+
+def _increment_matchup_rows(db: Session, table, key_columns, rows) -> None:
+    """
+    Portable fallback of the upsert: increment the existing rows, then insert the missing ones.
+    """
+    keys = tuple_(*(table.c[column] for column in key_columns))
+    existing = set(db.execute(
+        select(*(table.c[column] for column in key_columns)).where(keys.in_([tuple(row[column] for column in key_columns) for row in rows]))
+    ).all())
+    for row in rows:
+        key = tuple(row[column] for column in key_columns)
+        if key in existing:
+            db.execute(
+                update(table)
+                .where(*(table.c[column] == row[column] for column in key_columns))
+                .values(**{counter: table.c[counter] + row[counter] for counter in MATCHUP_COUNTERS}, updated_at=row["updated_at"])
+            )
+    missing = [row for row in rows if tuple(row[column] for column in key_columns) not in existing]
+    if missing:
+        db.execute(insert(table), missing)
+
+
+def _matchup_rates(counters: dict) -> dict:
+    """Add the win rate, survival rate and average damage per battle to a stats row."""
+    battles = counters["battles"]
+    return {
+        **counters,
+        "win_rate": counters["wins"] / battles if battles else 0.0,
+        "survival_rate": counters["ships_survived"] / counters["ships"] if counters["ships"] else 0.0,
+        "average_damage_dealt": counters["damage_dealt"] / battles if battles else 0.0,
+        "average_damage_taken": counters["damage_taken"] / battles if battles else 0.0
+    }
+
+
+def get_formation_matchup_stats(db: Session, formation: str = None):
+    """
+    Get the stats of every formation pair, or of the pairs of one formation.
+    
+    Reads only the formation_matchup_stats table (never the battle history).
+    
+    Returns:
+        Tuple of (list of stats dicts, message) or (None, error_message)
+    """
+    if formation is not None and formation not in FORMATION_MODIFIERS:
+        return None, f"Invalid formation. Valid formations: {', '.join(FORMATION_MODIFIERS)}"
+    
+    query = select(FormationMatchupStats.__table__).order_by(
+        FormationMatchupStats.formation, FormationMatchupStats.opponent_formation
+    )
+    if formation is not None:
+        query = query.where(FormationMatchupStats.formation == formation)
+    stats = [_matchup_rates(dict(row)) for row in db.execute(query).mappings()]
+    return stats, "Formation matchup stats retrieved successfully"
+
+
+def get_ship_matchup_stats(db: Session, ship_id: int = None):
+    """
+    Get the stats of every ship template pair, or of the pairs of one ship template.
+    
+    Reads only the ship_matchup_stats and ships tables (never the battle history).
+    
+    Returns:
+        Tuple of (list of stats dicts, message) or (None, error_message)
+    """
+    if ship_id is not None and db.get(Ship, ship_id) is None:
+        return None, "Ship not found"
+    
+    opponent = aliased(Ship)
+    query = select(
+        ShipMatchupStats.__table__,
+        Ship.ship_name,
+        opponent.ship_name.label("opponent_ship_name")
+    ).join(Ship, Ship.ship_id == ShipMatchupStats.ship_id).join(
+        opponent, opponent.ship_id == ShipMatchupStats.opponent_ship_id
+    ).order_by(ShipMatchupStats.ship_id, ShipMatchupStats.opponent_ship_id)
+    if ship_id is not None:
+        query = query.where(ShipMatchupStats.ship_id == ship_id)
+    stats = [_matchup_rates(dict(row)) for row in db.execute(query).mappings()]
+    return stats, "Ship matchup stats retrieved successfully"
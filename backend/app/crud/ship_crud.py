@@ -1,4 +1,6 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import Ship
 from database.models import OwnedShips
 from typing import List
@@ -33,6 +35,20 @@ def get_user_owned_ships(db: Session, user_id: int, status_filter: List[str] = N
     
     return ships
 
+async def get_user_owned_ships_async(db: AsyncSession, user_id: int, status_filter: List[str] = None) -> List[OwnedShips]:
+    """
+    Async variant of get_user_owned_ships.
+    """
+    if status_filter is None:
+        status_filter = ['active', 'owned']  # Default: exclude destroyed ships
+    
+    result = await db.scalars(select(OwnedShips).where(
+        OwnedShips.user_id == user_id,
+        OwnedShips.status.in_(status_filter)
+    ))
+    
+    return result.all()
+
 def get_owned_ship_by_number(db: Session, ship_number: int) -> OwnedShips:
     """
     Get owned ship data by ship_number regardless of owner.
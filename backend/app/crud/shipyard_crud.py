@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from database.models import OwnedShips, ShipyardLog
 from datetime import datetime, timezone
 from backend.app.utils.constants import SHIPYARD_REPAIR_COOLDOWN_SECONDS
+from backend.app.crud.battle_crud import retry_on_conflict
 
 # Get the last shipyard log for a user and ship
 def get_last_shipyard_log(db: Session, user_id: int, ship_number: int):
@@ -20,8 +21,11 @@ def update_shipyard_log(db: Session, user_id: int, ship_number: int, ship_id: in
     db.refresh(log)
     return log
 
-# Repair the ship: set all actual_* fields to base_*
+# Repair the ship: set all actual_* fields to base_*, retried if a battle updated the ship first
 def repair_owned_ship(db: Session, ship: OwnedShips):
+    return retry_on_conflict(db, _repair_owned_ship, ship)
+
+def _repair_owned_ship(db: Session, ship: OwnedShips):
     ship.actual_attack = ship.base_attack
     ship.actual_shield = ship.base_shield
     ship.actual_evasion = ship.base_evasion
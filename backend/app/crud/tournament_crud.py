@@ -0,0 +1,406 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from database.models import User, OwnedShips, BattleHistory, Tournament
+from datetime import datetime, UTC
+from typing import List
+import random
+import time
+from backend.app.crud.battle_crud import prepare_ship_stats_base, apply_battle_bonuses, to_combat_ship
+from backend.app.crud.battle_crud import calculate_elo_change, retry_on_conflict
+from backend.app.crud.matchup_crud import record_matchup_stats
+from backend.app.utils.matchup_utils import new_matchups, collect_battle_matchups
+from backend.app.utils.progression_utils import get_rank_bonuses
+from backend.app.utils.battle_engine import CombatShip, BATTLE_LOG_SUMMARY
+from backend.app.utils.battle_engine import select_battle_engine, new_battle_seed, get_engine_version
+from backend.app.utils.battle_pool import run_battle_simulations
+from backend.app.utils.constants import TOURNAMENT_MAX_PLAYERS, TOURNAMENT_COOLDOWN_SECONDS
+from backend.app.utils.tournament_utils import (
+    FORMAT_ROUND_ROBIN,
+    FORMAT_SINGLE_ELIMINATION,
+    FORMAT_SWISS,
+    TOURNAMENT_FORMATS,
+    Pairing,
+    round_robin_rounds,
+    single_elimination_first_round,
+    next_elimination_round,
+    swiss_round_count,
+    swiss_pairings,
+    rank_standings
+)
+
+
+def run_tournament(
+    db: Session,
+    creator_user_id: int,
+    user_ids: List[int],
+    tournament_format: str = FORMAT_ROUND_ROBIN,
+    name: str = None,
+    swiss_rounds: int = None,
+    engine: str = None
+):
+    """
+    Play a complete tournament between users in one request.
+
+    Every player fights with the active ships they have when the tournament starts
+    (rank bonuses applied, fleet snapshots reused for every match). Tournament battles
+    do not damage ships and award no credits or XP: they only count as victories and
+    defeats, damage statistics and Elo.
+
+    Each round's battles are independent (a player plays at most once per round), so
+    they are simulated together, in parallel in the battle process pool when it is
+    enabled. Results are then applied in a fixed order: round by round, and within a
+    round in pairing order, so the Elo of a player after the tournament does not
+    depend on which battle finished first. Battle logs are recorded at the "summary"
+    level and every battle is stored in BattleHistory with the tournament id and round.
+
+    Formats:
+        - round_robin: every player meets every other player once
+        - single_elimination: bracket seeded by Elo, byes for the top seeds
+        - swiss: swiss_rounds rounds (default log2 of the players) pairing players
+                 with equal scores who have not met yet
+
+    A win or a bye scores one point. Standings are ordered by points, then Buchholz
+    score (sum of the opponents' points), then wins; single elimination by the round
+    reached.
+
+    A tournament writes the Elo and records of every player, so the creator must be
+    one of the players and every other player must have opted in (tournament_opt_in).
+
+    Args:
+        db: Database session
+        creator_user_id: ID of the user starting the tournament, one of the players
+        user_ids: IDs of the players, at least 2 and at most TOURNAMENT_MAX_PLAYERS
+        tournament_format: One of "round_robin", "single_elimination", "swiss"
+        name: Tournament name. If None, named after the format and date
+        swiss_rounds: Number of Swiss rounds. If None, log2 of the number of players
+        engine: Combat engine ("python" or "numpy"). If None, uses the configured BATTLE_ENGINE
+
+    Returns:
+        Tuple of (Tournament, message) or (None, error_message)
+    """
+    # A conflict with a concurrent battle replays the whole tournament (see battle_between_users)
+    return retry_on_conflict(
+        db, _run_tournament, creator_user_id, user_ids, tournament_format, name, swiss_rounds, engine
+    )
+
+
+def _run_tournament(
+    db: Session,
+    creator_user_id: int,
+    user_ids: List[int],
+    tournament_format: str,
+    name: str,
+    swiss_rounds: int,
+    engine: str
+):
+    """
+    One attempt of run_tournament.
+    """
+    if tournament_format not in TOURNAMENT_FORMATS:
+        return None, f"Invalid tournament format. Valid formats: {', '.join(TOURNAMENT_FORMATS)}"
+    if len(user_ids) < 2:
+        return None, "A tournament needs at least 2 players"
+    if len(user_ids) > TOURNAMENT_MAX_PLAYERS:
+        return None, f"Too many players. Maximum players per tournament: {TOURNAMENT_MAX_PLAYERS}"
+    if len(set(user_ids)) != len(user_ids):
+        return None, "Duplicate players in tournament"
+    if creator_user_id not in user_ids:
+        return None, "The tournament creator must be one of the players"
+    if swiss_rounds is not None and swiss_rounds < 1:
+        return None, "Swiss tournaments need at least 1 round"
+
+    started = time.perf_counter()
+    users = {user.user_id: user for user in db.query(User).filter(User.user_id.in_(user_ids)).all()}
+    if len(users) != len(user_ids):
+        return None, "User not found"
+    not_opted_in = [users[user_id].nickname for user_id in user_ids if user_id != creator_user_id and not users[user_id].tournament_opt_in]
+    if not_opted_in:
+        return None, f"Players not accepting tournaments: {', '.join(not_opted_in)}"
+
+    ships_by_user = {}
+    for ship in db.query(OwnedShips).filter(
+        OwnedShips.user_id.in_(user_ids),
+        OwnedShips.status == 'active'
+    ).order_by(OwnedShips.ship_number).all():
+        ships_by_user.setdefault(ship.user_id, []).append(ship)
+
+    for user_id in user_ids:
+        if not ships_by_user.get(user_id):
+            return None, f"{users[user_id].nickname} has no active ships"
+
+    # Battle-ready fleet snapshots, reused for every match of the tournament
+    rank_bonuses = get_rank_bonuses(db)
+    fleets = {
+        user_id: [
+            to_combat_ship(ship_stats) for ship_stats in apply_battle_bonuses(
+                [prepare_ship_stats_base(ship, users[user_id], db) for ship in ships_by_user[user_id]],
+                db, rank_bonuses
+            )
+        ]
+        for user_id in user_ids
+    }
+
+    engine = select_battle_engine(engine)
+
+    # Seeding order: best Elo first
+    seeded = sorted(user_ids, key=lambda user_id: (-users[user_id].elo_rank, user_id))
+    standings = {
+        user_id: {
+            "user_id": user_id,
+            "nickname": users[user_id].nickname,
+            "played": 0,
+            "wins": 0,
+            "losses": 0,
+            "byes": 0,
+            "points": 0,
+            "opponents": [],
+            "elo_before": users[user_id].elo_rank
+        }
+        for user_id in seeded
+    }
+
+    rounds = []
+    battles = []
+    matchups = new_matchups()
+
+    def play_round(pairings: List[Pairing]) -> List[int]:
+        """Play one round, apply its results in pairing order and return the winner of each pairing."""
+        round_number = len(rounds) + 1
+        matches = [(user1_id, user2_id) for user1_id, user2_id in pairings if user2_id is not None]
+        seeds = [new_battle_seed() for _ in matches]
+        results = iter(run_battle_simulations([
+            (
+                fleets[user1_id],
+                fleets[user2_id],
+                {
+                    "formation_a": users[user1_id].default_formation,
+                    "formation_b": users[user2_id].default_formation,
+                    "rng": random.Random(seed),
+                    "engine": engine,
+                    "names": (users[user1_id].nickname, users[user2_id].nickname),
+                    "log_level": BATTLE_LOG_SUMMARY
+                }
+            )
+            for (user1_id, user2_id), seed in zip(matches, seeds)
+        ]))
+        seeds = iter(seeds)
+
+        round_pairings = []
+        winners = []
+        for user1_id, user2_id in pairings:
+            if user2_id is None:
+                standings[user1_id]["byes"] += 1
+                standings[user1_id]["points"] += 1
+                round_pairings.append({"user1_id": user1_id, "user2_id": None, "winner_user_id": user1_id, "battle_id": None})
+                winners.append(user1_id)
+                continue
+
+            user1, user2 = users[user1_id], users[user2_id]
+            result = next(results)
+            winner, loser = (user1, user2) if result.winner == 0 else (user2, user1)
+            _apply_tournament_result(user1, user2, winner, loser, result.total_damage)
+            collect_battle_matchups(
+                matchups, (user1.default_formation, user2.default_formation),
+                ([ship.ship_id for ship in ships_by_user[user1_id]], [ship.ship_id for ship in ships_by_user[user2_id]]),
+                result.final_hp, result.total_damage, result.winner
+            )
+            for player, opponent in ((user1, user2), (user2, user1)):
+                standing = standings[player.user_id]
+                standing["played"] += 1
+                standing["opponents"].append(opponent.user_id)
+                standing["wins" if player is winner else "losses"] += 1
+            standings[winner.user_id]["points"] += 1
+
+            battles.append((round_number, len(round_pairings), _build_tournament_battle(
+                user1, user2, winner, fleets[user1_id], fleets[user2_id], result, next(seeds), engine, round_number
+            )))
+            round_pairings.append({"user1_id": user1_id, "user2_id": user2_id, "winner_user_id": winner.user_id, "battle_id": None})
+            winners.append(winner.user_id)
+
+        rounds.append(round_pairings)
+        return winners
+
+    if tournament_format == FORMAT_ROUND_ROBIN:
+        for pairings in round_robin_rounds(seeded):
+            play_round(pairings)
+    elif tournament_format == FORMAT_SINGLE_ELIMINATION:
+        winners = play_round(single_elimination_first_round(seeded))
+        while len(winners) > 1:
+            winners = play_round(next_elimination_round(winners))
+    elif tournament_format == FORMAT_SWISS:
+        played = set()
+        byes = set()
+        for _ in range(min(swiss_rounds or swiss_round_count(len(seeded)), len(seeded) - 1)):
+            ranking = sorted(seeded, key=lambda user_id: (-standings[user_id]["points"], seeded.index(user_id)))
+            pairings = swiss_pairings(ranking, played, byes)
+            for user1_id, user2_id in pairings:
+                if user2_id is None:
+                    byes.add(user1_id)
+                else:
+                    played.add((min(user1_id, user2_id), max(user1_id, user2_id)))
+            play_round(pairings)
+
+    ranked = rank_standings(standings, tournament_format)
+    for standing in ranked:
+        standing["elo_after"] = users[standing["user_id"]].elo_rank
+        del standing["opponents"]
+    champion = ranked[0]
+
+    tournament = Tournament(
+        name=name or f"{tournament_format.replace('_', ' ').title()} {datetime.now(UTC):%Y-%m-%d %H:%M}",
+        format=tournament_format,
+        status="completed",
+        created_by_user_id=creator_user_id,
+        participants=seeded,
+        rounds=rounds,
+        standings=ranked,
+        finished_at=datetime.now(UTC),
+        extra={
+            "engine": engine,
+            "players": len(seeded),
+            "battles": len(battles),
+            "champion": champion["nickname"],
+            "duration_ms": None
+        }
+    )
+    db.add(tournament)
+    db.flush()
+
+    for _, _, battle_history in battles:
+        battle_history.extra["tournament_id"] = tournament.tournament_id
+    db.add_all([battle_history for _, _, battle_history in battles])
+    db.flush()
+
+    # Reassign the JSON columns so the battle ids and duration are written
+    rounds = [[dict(pairing) for pairing in round_pairings] for round_pairings in rounds]
+    for round_number, index, battle_history in battles:
+        rounds[round_number - 1][index]["battle_id"] = battle_history.battle_id
+    tournament.rounds = rounds
+    tournament.extra = {**tournament.extra, "duration_ms": int((time.perf_counter() - started) * 1000)}
+    record_matchup_stats(db, matchups)
+    db.commit()
+
+    return tournament, f"{champion['nickname']} wins the tournament!"
+
+
+def _apply_tournament_result(user1: User, user2: User, winner: User, loser: User, total_damage) -> None:
+    """
+    Apply the outcome of a tournament battle to both users: victories and defeats,
+    damage statistics and Elo (no credits, XP or ship losses).
+    """
+    total_damage1, total_damage2 = total_damage
+    winner.victories += 1
+    loser.defeats += 1
+
+    user1.damage_dealt += total_damage1
+    user1.damage_taken += total_damage2
+    user2.damage_dealt += total_damage2
+    user2.damage_taken += total_damage1
+
+    winner.elo_rank, loser.elo_rank = calculate_elo_change(winner.elo_rank, loser.elo_rank)
+
+
+def _build_tournament_battle(
+    user1: User,
+    user2: User,
+    winner: User,
+    fleet1: List[CombatShip],
+    fleet2: List[CombatShip],
+    result,
+    seed: int,
+    engine: str,
+    round_number: int
+) -> BattleHistory:
+    """
+    Build the BattleHistory row of a tournament battle (not added to the session).
+    Participants record the battle-ready stats each ship started with and the HP it ended with.
+    """
+    participants = []
+    for user, fleet, final_hp in zip((user1, user2), (fleet1, fleet2), result.final_hp):
+        for ship, hp in zip(fleet, final_hp):
+            participants.append({
+                "user_id": user.user_id,
+                "nickname": user.nickname,
+                "ship_number": ship.ship_number,
+                "ship_name": ship.ship_name,
+                "attack": ship.attack,
+                "shield": ship.shield,
+                "evasion": ship.evasion,
+                "fire_rate": ship.fire_rate,
+                "hp": max(0, hp),
+                "value": ship.value
+            })
+
+    total_damage1, total_damage2 = result.total_damage
+    ships_lost_by_user1, ships_lost_by_user2 = result.ships_lost
+    return BattleHistory(
+        participants=participants,
+        battle_log=[],
+        battle_events=result.events,
+        winner_user_id=winner.user_id,
+        seed=seed,
+        engine_version=get_engine_version(engine),
+        fleet_snapshot={**result.snapshot, "user_ids": [user1.user_id, user2.user_id]},
+        extra={
+            "formations": {"user1": user1.default_formation, "user2": user2.default_formation},
+            "final_hp": {
+                user1.nickname: sum(max(0, hp) for hp in result.final_hp[0]),
+                user2.nickname: sum(max(0, hp) for hp in result.final_hp[1])
+            },
+            "total_damage": {user1.nickname: total_damage1, user2.nickname: total_damage2},
+            "winner": winner.nickname,
+            "battle_type": f"Tournament {result.fleet_info}",
+            "engine": engine,
+            "rounds": result.rounds,
+            "log_storage": "events",
+            "log_level": BATTLE_LOG_SUMMARY,
+            "ships_destroyed": {"user1": ships_lost_by_user1, "user2": ships_lost_by_user2},
+            "tournament_round": round_number
+        }
+    )
+
+
+def get_tournament(db: Session, tournament_id: int):
+    """
+    Get a tournament with its rounds and standings.
+
+    Returns:
+        Tuple of (Tournament, message) or (None, error_message)
+    """
+    tournament = db.query(Tournament).filter(Tournament.tournament_id == tournament_id).first()
+    if not tournament:
+        return None, "Tournament not found"
+    return tournament, "Tournament retrieved successfully"
+
+
+def get_tournament_cooldown(db: Session, user_id: int, cooldown_seconds: int = TOURNAMENT_COOLDOWN_SECONDS) -> int:
+    """
+    Get the seconds left before a user may start another tournament.
+
+    Returns:
+        Remaining cooldown in seconds, 0 if the user can start a tournament
+    """
+    last_started = db.query(func.max(Tournament.created_at)).filter(Tournament.created_by_user_id == user_id).scalar()
+    if last_started is None:
+        return 0
+    elapsed = (datetime.now(UTC) - last_started.replace(tzinfo=UTC)).total_seconds()
+    return max(0, int(cooldown_seconds - elapsed + 0.999))
+
+
+def set_tournament_opt_in(db: Session, user_id: int, opt_in: bool):
+    """
+    Set whether other users may enter a user in their tournaments.
+
+    Returns:
+        Tuple of (User, message) or (None, error_message)
+    """
+    return retry_on_conflict(db, _set_tournament_opt_in, user_id, opt_in)
+
+
+def _set_tournament_opt_in(db: Session, user_id: int, opt_in: bool):
+    user = db.query(User).filter(User.user_id == user_id).first()
+    if not user:
+        return None, "User not found"
+    user.tournament_opt_in = opt_in
+    db.commit()
+    return user, "Tournament participation updated"
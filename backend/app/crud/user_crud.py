@@ -1,12 +1,17 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.app.schemas.user_schemas import UserCreate
 from database.models import User
 from backend.app.utils import get_password_hash, verify_password
+from backend.app.crud.battle_crud import retry_on_conflict
 
 # --- User CRUD Operations ---
 def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.user_id == user_id).first()
 
+async def get_user_async(db: AsyncSession, user_id: int):
+    return await db.get(User, user_id)
+
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(User).offset(skip).limit(limit).all()
 
@@ -30,6 +35,19 @@ def create_user(db: Session, user: UserCreate):
     db.refresh(db_user)
     return db_user
 
+# Retried if a battle updated the user first (optimistic version check)
+def update_user_formation(db: Session, user_id: int, default_formation: str):
+    return retry_on_conflict(db, _update_user_formation, user_id, default_formation)
+
+def _update_user_formation(db: Session, user_id: int, default_formation: str):
+    db_user = get_user(db, user_id)
+    if db_user is None:
+        return None
+    db_user.default_formation = default_formation
+    db.commit()
+    db.refresh(db_user)
+    return db_user
+
 def authenticate_user(db: Session, email: str, password: str):
     user = db.query(User).filter(User.email == email).first()
     if not user:
@@ -6,8 +6,11 @@ cooldown management, and work history tracking.
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database.models import User, WorkLog, RankBonus, UserRank
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from database.models import User, WorkLog, UserRank
+from backend.app.utils.rank_bonus_registry import get_rank_bonus, get_rank_bonus_async
+from backend.app.crud.battle_crud import retry_on_conflict
 from backend.app.utils.work_utils import (
     get_work_type_for_rank,
     calculate_work_income_with_variance,
@@ -34,7 +37,7 @@ def get_user_work_status(db: Session, user_id: int) -> Optional[Dict]:
         return None
     
     # Get rank bonus information
-    rank_bonus = db.query(RankBonus).filter(RankBonus.rank == user.rank).first()
+    rank_bonus = get_rank_bonus(user.rank, db)
     if not rank_bonus:
         return None
     
@@ -43,6 +46,32 @@ def get_user_work_status(db: Session, user_id: int) -> Optional[Dict]:
         WorkLog.user_id == user_id
     ).order_by(WorkLog.performed_at.desc()).first()
     
+    return _build_work_status(user, rank_bonus, last_work)
+
+
+async def get_user_work_status_async(db: AsyncSession, user_id: int) -> Optional[Dict]:
+    """
+    Async variant of get_user_work_status.
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        return None
+    
+    rank_bonus = await get_rank_bonus_async(user.rank, db)
+    if not rank_bonus:
+        return None
+    
+    last_work = await db.scalar(
+        select(WorkLog).where(WorkLog.user_id == user_id).order_by(WorkLog.performed_at.desc()).limit(1)
+    )
+    
+    return _build_work_status(user, rank_bonus, last_work)
+
+
+def _build_work_status(user: User, rank_bonus, last_work: Optional[WorkLog]) -> Dict:
+    """
+    Build the work status of a user from their rank bonus and last work log entry.
+    """
     now = datetime.now(UTC)
     can_work = True
     time_until_available = 0.0
@@ -110,6 +139,12 @@ def perform_work(db: Session, user_id: int) -> Tuple[Optional[Dict], str]:
     Returns:
         Tuple of (work_result: Dict or None, message: str)
     """
+    # The currency update races battles rewarding the same user (optimistic version check)
+    return retry_on_conflict(db, _perform_work, user_id)
+
+
+def _perform_work(db: Session, user_id: int) -> Tuple[Optional[Dict], str]:
+    """One attempt of perform_work; raises StaleDataError if a battle updated the user first."""
     # Check if user can work
     can_work, message = can_user_work(db, user_id)
     if not can_work:
@@ -120,7 +155,7 @@ def perform_work(db: Session, user_id: int) -> Tuple[Optional[Dict], str]:
         return None, "User not found"
     
     # Get rank bonus
-    rank_bonus = db.query(RankBonus).filter(RankBonus.rank == user.rank).first()
+    rank_bonus = get_rank_bonus(user.rank, db)
     if not rank_bonus:
         return None, "Rank bonus configuration not found"
     
@@ -226,7 +261,7 @@ def get_available_work_types_for_user(db: Session, user_id: int) -> Optional[Dic
     if not user:
         return None
     
-    rank_bonus = db.query(RankBonus).filter(RankBonus.rank == user.rank).first()
+    rank_bonus = get_rank_bonus(user.rank, db)
     if not rank_bonus:
         return None
     
@@ -2,20 +2,24 @@
 Backend database configuration and session management.
 
 This module creates database connections using backend-specific
-configuration and provides session management for the backend.
+configuration and provides session management for the backend:
+blocking Sessions (get_db) for regular routes and AsyncSessions
+(get_async_db) on an async driver for async routes.
 """
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from backend.app.config import DATABASE_URL, DB_ECHO
+from database.engine import get_engine, get_async_engine, get_pool_stats
 from database.models import Base
-from typing import Generator
+from database.log_partitions import ensure_log_partitions
+from typing import AsyncGenerator, Generator
 
-# Create database engine with backend configuration
-engine = create_engine(
-    DATABASE_URL,
-    echo=DB_ECHO
-)
+# Database engine shared with the database package (one connection pool per URL)
+engine = get_engine(DATABASE_URL, echo=DB_ECHO)
+
+# Asyncio engine on the async driver of the same database (aiosqlite, asyncpg)
+async_engine = get_async_engine(DATABASE_URL, echo=DB_ECHO)
 
 # Session factory
 SessionLocal = sessionmaker(
@@ -24,6 +28,13 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async session factory (objects stay usable after commit: no lazy reloads outside the event loop)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 def get_db() -> Generator[Session, None, None]:
     """
     Database session dependency for FastAPI.
@@ -40,6 +51,19 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async database session dependency for FastAPI async routes.
+    
+    Queries are awaited on the async driver, so a request waiting for the
+    database does not hold one of the threadpool threads used by sync routes.
+    
+    Yields:
+        AsyncSession: A SQLAlchemy async session object.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def create_session() -> Session:
     """
     Create a new database session.
@@ -51,13 +75,19 @@ def create_session() -> Session:
 
 # Initialize database tables if needed
 def init_database():
-    """Initialize database tables."""
+    """Initialize database tables (and the system_logs partitions on PostgreSQL)."""
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        ensure_log_partitions(connection)
 
 def shutdown_database():
     """Shutdown database connections."""
     engine.dispose()
 
+async def shutdown_async_database():
+    """Shutdown async database connections."""
+    await async_engine.dispose()
+
 def check_database_health() -> dict:
     """
     Check database connection health.
@@ -72,7 +102,9 @@ def check_database_health() -> dict:
         return {
             "status": "healthy",
             "database_url": DATABASE_URL.split("@")[-1] if "@" in DATABASE_URL else "local",
-            "engine_echo": DB_ECHO
+            "engine_echo": DB_ECHO,
+            "pool": get_pool_stats(engine),
+            "async_pool": get_pool_stats(async_engine)
         }
     except Exception as e:
         return {
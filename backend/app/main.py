@@ -1,9 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 from contextlib import asynccontextmanager
-from backend.app.routes import ships, users, market, battle, logs, shipyard, work
-from backend.app.database import shutdown_database, check_database_health, init_database
+from backend.app.routes import ships, users, market, battle, logs, shipyard, work, tournament, matchmaking, leaderboard, matchup
+from backend.app.database import shutdown_database, shutdown_async_database, check_database_health, init_database, create_session
 from backend.app.version import get_cached_version, get_project_info
+from backend.app.utils.battle_pool import get_battle_pool_stats, shutdown_battle_pool
+from backend.app.utils.battle_jobs import get_battle_job_stats, shutdown_battle_jobs
+from backend.app.utils.log_writer import get_log_writer_stats, shutdown_log_writer
+from backend.app.utils.rank_bonus_registry import rank_bonus_registry
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -13,9 +19,20 @@ async def lifespan(app: FastAPI):
     """
     # Startup - initialize database tables
     init_database()
+    # Load the rank bonus registry once instead of on the first requests
+    db = create_session()
+    try:
+        rank_bonus_registry.load(db)
+    finally:
+        db.close()
     yield
     # Shutdown
+    shutdown_battle_jobs()
+    shutdown_battle_pool()
+    # Write the buffered logs (battle jobs log too) before closing the connections
+    shutdown_log_writer()
     shutdown_database()
+    await shutdown_async_database()
 
 # Get dynamic project information
 project_info = get_project_info()
@@ -35,6 +52,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    """A write still losing its optimistic version check after its retries: the client may retry."""
+    return JSONResponse(status_code=409, content={"detail": "Concurrent update conflict, please retry"})
+
 app.include_router(ships.router, prefix="/api/v1") # Using ships.router as defined in ships.py
 app.include_router(users.router, prefix="/api/v1") # Using users.router as defined in users.py
 app.include_router(market.router, prefix="/api/v1") # Using market.router as defined in market.py
@@ -42,6 +64,10 @@ app.include_router(battle.router, prefix="/api/v1")  # Using battle.router as de
 app.include_router(shipyard.router, prefix="/api/v1")  # Using shipyard.router as defined in shipyard.py
 app.include_router(logs.router, prefix="/api/v1")  # Using logs.router as defined in logs.py
 app.include_router(work.router, prefix="/api/v1")  # Using work.router as defined in work.py
+app.include_router(tournament.router, prefix="/api/v1")  # Using tournament.router as defined in tournament.py
+app.include_router(matchmaking.router, prefix="/api/v1")  # Using matchmaking.router as defined in matchmaking.py
+app.include_router(leaderboard.router, prefix="/api/v1")  # Using leaderboard.router as defined in leaderboard.py
+app.include_router(matchup.router, prefix="/api/v1")  # Using matchup.router as defined in matchup.py
 
 
 @app.get("/")
@@ -65,5 +91,8 @@ async def health_check():
         "status": "healthy" if db_health["status"] == "healthy" else "unhealthy",
         "api": "running",
         "version": project_info["version"],
-        "database": db_health
+        "database": db_health,
+        "battle_pool": get_battle_pool_stats(),
+        "battle_jobs": get_battle_job_stats(),
+        "log_writer": get_log_writer_stats()
     }
\ No newline at end of file
@@ -1,12 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from backend.app.utils.auth_utils import get_current_user
+from fastapi.responses import StreamingResponse
+from backend.app.utils.auth_utils import get_current_user, get_current_user_async
 from sqlalchemy.orm import Session
-from backend.app.database import get_db
-from backend.app.crud.battle_crud import battle_between_users, activate_owned_ship, deactivate_owned_ship, get_user_ship_limits_info
-from backend.app.schemas.battle_schemas import BattleHistoryResponse, BattleRequest
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import get_db, get_async_db
+from backend.app.crud.battle_crud import battle_between_users, activate_owned_ship, deactivate_owned_ship, get_user_ship_limits_info_async, replay_battle_history, get_battle_events, battle_batch, armada_battle
+from backend.app.crud.battle_crud import get_battle_stream, build_battle_stream
+from backend.app.schemas.battle_schemas import BattleHistoryResponse, BattleRequest, BattleEventsResponse
+from backend.app.schemas.battle_schemas import BattleBatchRequest, BattleBatchResponse, BattleBatchItem, ArmadaBattleRequest
+from backend.app.schemas.battle_schemas import BattleJobResponse
+from backend.app.utils.battle_jobs import submit_battle_job, get_battle_job, BattleJob, BattleJobsDisabled
+from backend.app.utils.battle_engine import iter_battle_rounds
+from backend.app.utils.constants import MAX_BATCH_BATTLES
 from backend.app.schemas.ship_schemas import ActivateShipResponse
 from backend.app.schemas.user_schemas import UserShipLimitsResponse
 from backend.app.utils import log_user_action, log_game_event, log_error, GameAction
+from backend.app.utils.logging_utils import log_from_async
+import json
+import queue
 import time
 
 router = APIRouter(prefix="/battle", tags=["Battle"])
@@ -56,7 +68,8 @@ def activate_ship_route(
         
         return ship
         
-    except HTTPException:
+    except (HTTPException, StaleDataError):
+        # Conflicts are answered with 409 by the application handler
         raise
     except Exception as e:
         execution_time = int((time.time() - start_time) * 1000)
@@ -89,6 +102,7 @@ def battle_route(
     - Multi-ship battles (up to 20v20): user_ship_numbers: [1,2,3], opponent_ship_numbers: [1,2]
     - Formation strategies: DEFENSIVE, AGGRESSIVE, TACTICAL
     - Only active ships can participate in battles
+    - Log levels: full (every shot), summary (per-round totals), none (outcome only)
     """
     start_time = time.time()
     
@@ -100,7 +114,8 @@ def battle_route(
             user1_ship_numbers=battle_request.user_ship_numbers,
             user2_ship_numbers=battle_request.opponent_ship_numbers,
             user1_formation=battle_request.user_formation,
-            user2_formation=battle_request.opponent_formation
+            user2_formation=battle_request.opponent_formation,
+            log_level=battle_request.log_level
         )
         execution_time = int((time.time() - start_time) * 1000)
         
@@ -124,6 +139,11 @@ def battle_route(
             )
             raise HTTPException(status_code=400, detail=message)
         
+        # Build the response before logging: logging commits the session when the log buffer
+        # is disabled (LOG_BUFFER_SIZE=0), which expires the battle object
+        # and only the compact log is stored in the database
+        response = BattleHistoryResponse.model_validate(result)
+        
         # Log successful battle
         log_game_event(
             db=db,
@@ -143,9 +163,10 @@ def battle_route(
             resource_affected=f"battle_id:{result.battle_id}"
         )
         
-        return result
+        return response
         
-    except HTTPException:
+    except (HTTPException, StaleDataError):
+        # Conflicts are answered with 409 by the application handler
         raise
     except Exception as e:
         execution_time = int((time.time() - start_time) * 1000)
@@ -168,6 +189,436 @@ def battle_route(
         raise HTTPException(status_code=500, detail=f"Battle failed: {str(e)}")
 
 
+def _run_battle_job(db: Session, user_id: int, battle_request: BattleRequest):
+    """
+    Execute a queued battle in a battle job worker and log its outcome.
+    Returns (BattleHistoryResponse, message) or (None, error_message).
+    """
+    start_time = time.time()
+    details = {
+        "user1_id": user_id,
+        "user2_id": battle_request.opponent_user_id,
+        "user1_ship_numbers": battle_request.user_ship_numbers,
+        "user2_ship_numbers": battle_request.opponent_ship_numbers,
+        "user1_formation": battle_request.user_formation,
+        "user2_formation": battle_request.opponent_formation,
+        "async": True
+    }
+    result, message = battle_between_users(
+        db=db,
+        user1_id=user_id,
+        user2_id=battle_request.opponent_user_id,
+        user1_ship_numbers=battle_request.user_ship_numbers,
+        user2_ship_numbers=battle_request.opponent_ship_numbers,
+        user1_formation=battle_request.user_formation,
+        user2_formation=battle_request.opponent_formation,
+        log_level=battle_request.log_level
+    )
+    execution_time = int((time.time() - start_time) * 1000)
+    
+    if not result:
+        log_error(
+            db=db,
+            action=GameAction.BATTLE_START,
+            error_message=message,
+            user_id=user_id,
+            details={**details, "success": False, "execution_time_ms": execution_time}
+        )
+        return None, message
+    
+    # Build the response before logging: logging commits the session when the log buffer
+    # is disabled (LOG_BUFFER_SIZE=0), which expires the battle object
+    response = BattleHistoryResponse.model_validate(result)
+    log_game_event(
+        db=db,
+        action=GameAction.BATTLE_END,
+        user_id=user_id,
+        details={**details, "battle_id": result.battle_id, "success": True, "execution_time_ms": execution_time},
+        resource_affected=f"battle_id:{result.battle_id}"
+    )
+    return response, message
+
+
+def _battle_job_response(job: BattleJob) -> BattleJobResponse:
+    return BattleJobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        message=job.message,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        battle=job.result
+    )
+
+
+@router.post("/jobs", response_model=BattleJobResponse, status_code=202)
+def submit_battle_job_route(
+    battle_request: BattleRequest,
+    current_user = Depends(get_current_user)
+):
+    """
+    Enqueue a battle and return its job id immediately (asynchronous mode of POST /battle/battle).
+    
+    Battles of the same user run in submission order. Poll GET /battle/jobs/{job_id}
+    for the status and the resulting battle. Answers 503 while the queue is full
+    or when asynchronous battles are disabled (BATTLE_JOB_WORKERS=0).
+    """
+    try:
+        job = submit_battle_job(current_user.user_id, _run_battle_job, current_user.user_id, battle_request)
+    except BattleJobsDisabled as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except queue.Full:
+        raise HTTPException(
+            status_code=503,
+            detail="Battle queue is full, try again later",
+            headers={"Retry-After": "1"}
+        )
+    return _battle_job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=BattleJobResponse)
+def battle_job_route(
+    job_id: str,
+    current_user = Depends(get_current_user)
+):
+    """
+    Get the status of a battle job and, once completed, the resulting battle.
+    Jobs are only visible to the user who submitted them.
+    """
+    job = get_battle_job(job_id)
+    if job is None or job.user_id != current_user.user_id:
+        raise HTTPException(status_code=404, detail="Battle job not found")
+    return _battle_job_response(job)
+
+
+@router.post("/batch", response_model=BattleBatchResponse)
+def battle_batch_route(
+    batch_request: BattleBatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Execute several battles of the current user in one request and one transaction.
+    
+    Battles run in order against the same fleets, so a ship destroyed in one battle
+    cannot fight in the next. Rejected battles are reported per item and do not
+    stop the batch. A single log entry is written for the whole batch.
+    """
+    start_time = time.time()
+    
+    if not batch_request.battles:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one battle")
+    if len(batch_request.battles) > MAX_BATCH_BATTLES:
+        raise HTTPException(status_code=400, detail=f"Batch cannot exceed {MAX_BATCH_BATTLES} battles")
+    
+    try:
+        results = battle_batch(
+            db=db,
+            user_id=current_user.user_id,
+            battle_requests=[battle.model_dump() for battle in batch_request.battles]
+        )
+        
+        # Build the response before logging: logging commits the session when the log buffer
+        # is disabled (LOG_BUFFER_SIZE=0), which expires the battle objects
+        items = [
+            BattleBatchItem(
+                index=index,
+                success=battle is not None,
+                message=message,
+                battle=BattleHistoryResponse.model_validate(battle) if battle is not None else None
+            )
+            for index, (battle, message) in enumerate(results)
+        ]
+        executed = sum(1 for item in items if item.success)
+        execution_time = int((time.time() - start_time) * 1000)
+        
+        log_game_event(
+            db=db,
+            action=GameAction.BATTLE_BATCH,
+            user_id=current_user.user_id,
+            details={
+                "battles_requested": len(items),
+                "battles_executed": executed,
+                "battle_ids": [item.battle.battle_id for item in items if item.success],
+                "errors": {item.index: item.message for item in items if not item.success},
+                "success": True,
+                "execution_time_ms": execution_time
+            }
+        )
+        
+        return BattleBatchResponse(results=items, executed=executed, failed=len(items) - executed)
+        
+    except (HTTPException, StaleDataError):
+        # Conflicts are answered with 409 by the application handler
+        raise
+    except Exception as e:
+        db.rollback()
+        execution_time = int((time.time() - start_time) * 1000)
+        log_error(
+            db=db,
+            action=GameAction.BATTLE_BATCH,
+            error_message=str(e),
+            user_id=current_user.user_id,
+            details={
+                "battles_requested": len(batch_request.battles),
+                "execution_time_ms": execution_time,
+                "exception_type": type(e).__name__
+            }
+        )
+        raise HTTPException(status_code=500, detail=f"Battle batch failed: {str(e)}")
+
+
+@router.post("/armada", response_model=BattleHistoryResponse)
+def armada_battle_route(
+    armada_request: ArmadaBattleRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Mass-fleet battle (100v100 and beyond) between the hangars of two users.
+    
+    Every owned or active ship fights unless ship numbers are given, up to
+    ARMADA_MAX_SHIPS_PER_SIDE ships per side. The battle log is always recorded
+    at the summary level (per-round totals and destroyed ships).
+    """
+    start_time = time.time()
+    details = {
+        "user1_id": current_user.user_id,
+        "user2_id": armada_request.opponent_user_id,
+        "user1_formation": armada_request.user_formation,
+        "user2_formation": armada_request.opponent_formation,
+        "mode": "armada"
+    }
+    
+    try:
+        result, message = armada_battle(
+            db=db,
+            user1_id=current_user.user_id,
+            user2_id=armada_request.opponent_user_id,
+            user1_ship_numbers=armada_request.user_ship_numbers,
+            user2_ship_numbers=armada_request.opponent_ship_numbers,
+            user1_formation=armada_request.user_formation,
+            user2_formation=armada_request.opponent_formation
+        )
+        execution_time = int((time.time() - start_time) * 1000)
+        
+        if not result:
+            log_error(
+                db=db,
+                action=GameAction.BATTLE_START,
+                error_message=message,
+                user_id=current_user.user_id,
+                details={**details, "success": False, "execution_time_ms": execution_time}
+            )
+            raise HTTPException(status_code=400, detail=message)
+        
+        # Build the response before logging: logging commits the session when the log buffer
+        # is disabled (LOG_BUFFER_SIZE=0), which expires the battle object
+        response = BattleHistoryResponse.model_validate(result)
+        
+        log_game_event(
+            db=db,
+            action=GameAction.BATTLE_END,
+            user_id=current_user.user_id,
+            details={
+                **details,
+                "battle_id": result.battle_id,
+                "ships": len(response.participants),
+                "success": True,
+                "execution_time_ms": execution_time
+            },
+            resource_affected=f"battle_id:{result.battle_id}"
+        )
+        
+        return response
+        
+    except (HTTPException, StaleDataError):
+        # Conflicts are answered with 409 by the application handler
+        raise
+    except Exception as e:
+        db.rollback()
+        execution_time = int((time.time() - start_time) * 1000)
+        log_error(
+            db=db,
+            action=GameAction.BATTLE_START,
+            error_message=str(e),
+            user_id=current_user.user_id,
+            details={**details, "execution_time_ms": execution_time, "exception_type": type(e).__name__}
+        )
+        raise HTTPException(status_code=500, detail=f"Armada battle failed: {str(e)}")
+
+
+@router.get("/history/{battle_id}/replay", response_model=BattleHistoryResponse)
+def replay_battle_route(
+    battle_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Replay a stored battle from its seed and fleet snapshot.
+    
+    Regenerates the round-by-round battle log on demand, reproducing the
+    original battle exactly as long as the combat engine version is unchanged.
+    """
+    battle_data, message = replay_battle_history(db, battle_id)
+    
+    if not battle_data:
+        status_code = 404 if message == "Battle not found" else 409
+        raise HTTPException(status_code=status_code, detail=message)
+    
+    return battle_data
+
+
+@router.get("/history/{battle_id}/events", response_model=BattleEventsResponse)
+def battle_events_route(
+    battle_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Get the compact shot-by-shot event stream of a stored battle.
+    
+    Intended for analysis and client-side rendering of the battle log.
+    """
+    battle_events, message = get_battle_events(db, battle_id)
+    
+    if not battle_events:
+        status_code = 404 if message == "Battle not found" else 409
+        raise HTTPException(status_code=status_code, detail=message)
+    
+    return battle_events
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _battle_event_stream(stream: dict):
+    """
+    Server-Sent Events of a battle, rendered round by round from its event stream:
+    "start" (fleets and header lines), one "round" per round (log lines and events)
+    and "end" (outcome, damage totals and post-battle lines).
+    """
+    snapshot, events = stream["fleet_snapshot"], stream["battle_events"]
+    start = {
+        "battle_id": stream["battle_id"],
+        "log_level": events.get("log_level", "full"),
+        "rounds": events["rounds"],
+        "fleet_snapshot": snapshot,
+        "lines": []
+    }
+    for chunk in iter_battle_rounds(snapshot, events):
+        if chunk["round"] == 0:
+            start["lines"] = chunk["lines"]
+            continue
+        if start:
+            yield _sse("start", start)
+            start = None
+        if chunk["round"] is not None:
+            yield _sse("round", chunk)
+            continue
+        yield _sse("end", {
+            "battle_id": stream["battle_id"],
+            "winner_user_id": stream["winner_user_id"],
+            "winner": snapshot["names"][events["winner"]],
+            "win_condition": events["win_condition"],
+            "rounds": events["rounds"],
+            "total_damage": events["total_damage"],
+            "lines": chunk["lines"] + stream["post_battle_log"],
+            "extra": stream["extra"]
+        })
+
+
+def _battle_stream_response(stream: dict) -> StreamingResponse:
+    # Everything the stream needs is loaded now: it is produced after the session is closed
+    return StreamingResponse(
+        _battle_event_stream(stream),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/stream")
+def battle_stream_route(
+    battle_request: BattleRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Execute a battle like POST /battle/battle and stream it as Server-Sent Events.
+    
+    Emits "start" with both fleets, one "round" event per round (log lines and shot
+    events) and "end" with the outcome and rewards, so clients can render the battle
+    progressively instead of waiting for the whole BattleHistoryResponse.
+    """
+    start_time = time.time()
+    details = {
+        "user1_id": current_user.user_id,
+        "user2_id": battle_request.opponent_user_id,
+        "user1_ship_numbers": battle_request.user_ship_numbers,
+        "user2_ship_numbers": battle_request.opponent_ship_numbers,
+        "user1_formation": battle_request.user_formation,
+        "user2_formation": battle_request.opponent_formation,
+        "stream": True
+    }
+    
+    result, message = battle_between_users(
+        db=db,
+        user1_id=current_user.user_id,
+        user2_id=battle_request.opponent_user_id,
+        user1_ship_numbers=battle_request.user_ship_numbers,
+        user2_ship_numbers=battle_request.opponent_ship_numbers,
+        user1_formation=battle_request.user_formation,
+        user2_formation=battle_request.opponent_formation,
+        log_level=battle_request.log_level
+    )
+    execution_time = int((time.time() - start_time) * 1000)
+    
+    if not result:
+        log_error(
+            db=db,
+            action=GameAction.BATTLE_START,
+            error_message=message,
+            user_id=current_user.user_id,
+            details={**details, "success": False, "execution_time_ms": execution_time}
+        )
+        raise HTTPException(status_code=400, detail=message)
+    
+    # Build the stream before logging: logging commits the session when the log buffer
+    # is disabled (LOG_BUFFER_SIZE=0), which expires the battle object
+    # and only the compact log is stored in the database
+    stream, message = build_battle_stream(result)
+    if not stream:
+        raise HTTPException(status_code=409, detail=message)
+    log_game_event(
+        db=db,
+        action=GameAction.BATTLE_END,
+        user_id=current_user.user_id,
+        details={**details, "battle_id": stream["battle_id"], "success": True, "execution_time_ms": execution_time},
+        resource_affected=f"battle_id:{stream['battle_id']}"
+    )
+    return _battle_stream_response(stream)
+
+
+@router.get("/history/{battle_id}/stream")
+def battle_history_stream_route(
+    battle_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Stream a stored battle round by round as Server-Sent Events (see POST /battle/stream).
+    """
+    stream, message = get_battle_stream(db, battle_id)
+    if not stream:
+        status_code = 404 if message == "Battle not found" else 409
+        raise HTTPException(status_code=status_code, detail=message)
+    return _battle_stream_response(stream)
+
+
 @router.post("/deactivate-ship/", response_model=ActivateShipResponse)
 def deactivate_ship_route(
     ship_number: int,
@@ -214,7 +665,8 @@ def deactivate_ship_route(
         
         return ship
         
-    except HTTPException:
+    except (HTTPException, StaleDataError):
+        # Conflicts are answered with 409 by the application handler
         raise
     except Exception as e:
         execution_time = int((time.time() - start_time) * 1000)
@@ -234,13 +686,13 @@ def deactivate_ship_route(
 
 
 @router.get("/ship-limits/", response_model=UserShipLimitsResponse)
-def get_ship_limits_route(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+async def get_ship_limits_route(
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     """Get information about user's ship limits and current usage."""
     try:
-        limits_info = get_user_ship_limits_info(db, current_user.user_id)
+        limits_info = await get_user_ship_limits_info_async(db, current_user.user_id)
         
         if not limits_info:
             raise HTTPException(status_code=404, detail="User not found")
@@ -250,8 +702,8 @@ def get_ship_limits_route(
     except HTTPException:
         raise
     except Exception as e:
-        log_error(
-            db=db,
+        await log_from_async(
+            log_error,
             action=GameAction.ACTIVATE_SHIP,
             error_message=str(e),
             user_id=current_user.user_id,
@@ -0,0 +1,49 @@
+"""
+Leaderboard API routes.
+
+This module contains FastAPI routes for the leaderboards by Elo, victories,
+level and damage dealt, served from in-memory rankings.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+from backend.app.database import get_db
+from backend.app.crud.leaderboard_crud import get_leaderboard_page, get_user_rank
+from backend.app.schemas.leaderboard_schemas import LeaderboardResponse, LeaderboardRankResponse
+from backend.app.utils.constants import LEADERBOARD_MAX_PAGE_SIZE
+
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+
+
+@router.get("/{category}", response_model=LeaderboardResponse)
+def leaderboard_route(
+    category: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=LEADERBOARD_MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of a leaderboard: elo, victories, level or damage (damage dealt).
+    
+    Every page costs the same, whatever its offset: entries are read by
+    position from an in-memory ranking kept up to date by battles and progression.
+    """
+    page, message = get_leaderboard_page(db, category, offset, limit)
+    
+    if page is None:
+        raise HTTPException(status_code=404, detail=message)
+    
+    return page
+
+
+@router.get("/{category}/users/{user_id}", response_model=LeaderboardRankResponse)
+def leaderboard_rank_route(category: str, user_id: int, db: Session = Depends(get_db)):
+    """
+    Get the rank of a user in a leaderboard.
+    """
+    rank, message = get_user_rank(db, category, user_id)
+    
+    if rank is None:
+        raise HTTPException(status_code=404, detail=message)
+    
+    return rank
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from backend.app.database import get_db
 from backend.app.crud.log_crud import create_log, get_log, get_logs, delete_log
 from backend.app.schemas.log_schemas import SystemLogCreate, SystemLogResponse, LogQueryRequest, LogQueryResponse
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 
 router = APIRouter(prefix="/logs", tags=["Logs"])
 
@@ -17,8 +18,12 @@ def list_logs_route(
     log_level: str = None,
     log_category: str = None,
     action: str = None,
+    start_date: datetime = None,
+    end_date: datetime = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page (keyset pagination, replaces offset)"),
+    count: Literal["exact", "estimate", "none"] = Query("exact", description="Total count: exact, planner estimate or none"),
     db: Session = Depends(get_db)
 ):
     # Create query parameters object
@@ -27,17 +32,25 @@ def list_logs_route(
         log_level=log_level,
         log_category=log_category,
         action=action,
+        start_date=start_date,
+        end_date=end_date,
         limit=limit,
-        offset=offset
+        offset=offset,
+        cursor=cursor,
+        count=count
     )
     
-    logs, total_count = get_logs(db, query_params)
+    try:
+        logs, total_count, next_cursor = get_logs(db, query_params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return LogQueryResponse(
         logs=logs,
         total_count=total_count,
-        page=offset // limit + 1 if limit else 1,
-        per_page=limit
+        page=offset // limit + 1 if limit and not cursor else 1,
+        per_page=limit,
+        next_cursor=next_cursor
     )
 
 @router.get("/{log_id}", response_model=SystemLogResponse)
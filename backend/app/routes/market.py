@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from backend.app.utils.auth_utils import get_current_user
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from backend.app.database import get_db
 from backend.app.crud.market_crud import buy_ship, sell_ship
 from backend.app.schemas.market_schemas import MarketBuyRequest, MarketBuyResponse, MarketSellRequest, MarketSellResponse
@@ -53,7 +54,8 @@ def buy_ship_route(
         
         return {"message": message, "ship_number": ship_number}
         
-    except HTTPException:
+    except (HTTPException, StaleDataError):
+        # Conflicts are answered with 409 by the application handler
         raise
     except Exception as e:
         execution_time = int((time.time() - start_time) * 1000)
@@ -114,7 +116,8 @@ def sell_ship_route(
         
         return {"message": message, "value_received": value}
         
-    except HTTPException:
+    except (HTTPException, StaleDataError):
+        # Conflicts are answered with 409 by the application handler
         raise
     except Exception as e:
         execution_time = int((time.time() - start_time) * 1000)
@@ -0,0 +1,37 @@
+"""
+Matchmaking API routes.
+
+This module contains FastAPI routes for finding opponents of similar
+Elo rating and level.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+from backend.app.database import get_db
+from backend.app.utils.auth_utils import get_current_user
+from backend.app.crud.matchmaking_crud import find_opponents
+from backend.app.schemas.matchmaking_schemas import MatchmakingResponse
+from backend.app.utils.constants import MATCHMAKING_MAX_OPPONENTS
+
+router = APIRouter(prefix="/matchmaking", tags=["Matchmaking"])
+
+
+@router.get("/opponents", response_model=MatchmakingResponse)
+def find_opponents_route(
+    k: int = Query(10, ge=1, le=MATCHMAKING_MAX_OPPONENTS, description="Number of opponents to return"),
+    active_only: bool = Query(True, description="Only opponents with at least one active ship"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Get the k opponents closest to the current user by Elo rating and level.
+    
+    Reads candidates from the Elo index around the user's rating, so latency
+    does not grow with the number of users. The current user is never included.
+    """
+    opponents, message = find_opponents(db, current_user.user_id, k=k, active_only=active_only)
+    
+    if opponents is None:
+        raise HTTPException(status_code=404, detail=message)
+    
+    return {"user_id": current_user.user_id, "opponents": opponents}
@@ -0,0 +1,51 @@
+"""
+Matchup statistics API routes.
+
+This module contains FastAPI routes for the battle statistics aggregated per
+formation pair and per ship template pair.
+"""
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.orm import Session
+from backend.app.database import get_db
+from backend.app.crud.matchup_crud import get_formation_matchup_stats, get_ship_matchup_stats
+from backend.app.schemas.matchup_schemas import FormationMatchupResponse, ShipMatchupResponse
+
+router = APIRouter(prefix="/stats", tags=["Statistics"])
+
+
+@router.get("/formations", response_model=FormationMatchupResponse)
+def formation_matchups_route(
+    formation: Optional[str] = Query(None, description="Only the matchups of this formation"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get win rates, survival rates and damage of every formation against every other.
+    
+    Served from counters updated by each battle; the battle history is never scanned.
+    """
+    matchups, message = get_formation_matchup_stats(db, formation)
+    
+    if matchups is None:
+        raise HTTPException(status_code=400, detail=message)
+    
+    return {"matchups": matchups}
+
+
+@router.get("/ships", response_model=ShipMatchupResponse)
+def ship_matchups_route(
+    ship_id: Optional[int] = Query(None, description="Only the matchups of this ship template"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get win rates, survival rates and damage of every ship template against every other.
+    
+    Served from counters updated by each battle; the battle history is never scanned.
+    """
+    matchups, message = get_ship_matchup_stats(db, ship_id)
+    
+    if matchups is None:
+        raise HTTPException(status_code=404, detail=message)
+    
+    return {"matchups": matchups}
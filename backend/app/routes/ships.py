@@ -1,7 +1,8 @@
 # app/routes/ships.py
 from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
-from backend.app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import get_db, get_async_db
 from backend.app.schemas.ship_schemas import ShipResponse, OwnedShipResponse
 from backend.app.crud import ship_crud
 from backend.app.utils import log_error, log_event, GameAction, LogCategory, LogLevel
@@ -77,9 +78,9 @@ def get_ship_route(ship_id: int, request: Request, db: Session = Depends(get_db)
         raise HTTPException(status_code=500, detail=f"Ship lookup failed: {str(e)}")
 
 @router.get("/user/{user_id}/ships", response_model=list[OwnedShipResponse])
-def get_user_ships_route(
+async def get_user_ships_route(
     user_id: int, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     status: str = None
 ):
     """Get owned ships for a specific user with optional status filtering
@@ -93,7 +94,7 @@ def get_user_ships_route(
     if status:
         status_filter = [s.strip() for s in status.split(',')]
     
-    ships = ship_crud.get_user_owned_ships(db=db, user_id=user_id, status_filter=status_filter)
+    ships = await ship_crud.get_user_owned_ships_async(db=db, user_id=user_id, status_filter=status_filter)
     return ships
 
 @router.get("/owned/{ship_number}", response_model=OwnedShipResponse)
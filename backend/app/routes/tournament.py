@@ -0,0 +1,147 @@
+"""
+Tournament API routes.
+
+This module contains FastAPI routes for server-side tournaments: a whole
+round robin, single elimination or Swiss tournament is played in one request.
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+from backend.app.database import get_db
+from backend.app.utils.auth_utils import get_current_user
+from backend.app.crud.tournament_crud import run_tournament, get_tournament, get_tournament_cooldown, set_tournament_opt_in
+from backend.app.schemas.tournament_schemas import TournamentRequest, TournamentResponse
+from backend.app.schemas.tournament_schemas import TournamentOptInRequest, TournamentOptInResponse
+from backend.app.utils import log_game_event, log_error, GameAction
+import time
+
+router = APIRouter(prefix="/tournaments", tags=["Tournaments"])
+
+
+@router.post("/", response_model=TournamentResponse)
+def run_tournament_route(
+    tournament_request: TournamentRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Play a complete tournament between the given users.
+    
+    The current user must be one of the players and every other player must
+    have opted in to tournaments (PUT /tournaments/opt-in). A user can start
+    one tournament every TOURNAMENT_COOLDOWN_SECONDS.
+    
+    Formats: round_robin (everyone meets everyone), single_elimination (bracket
+    seeded by Elo) and swiss (players with equal scores meet, no rematches).
+    Every player fights with their active ships; tournament battles update Elo,
+    victories, defeats and damage statistics but do not damage ships or award
+    credits and XP. Each round's battles are simulated in parallel and every
+    battle is stored in the battle history.
+    """
+    start_time = time.time()
+    details = {
+        "format": tournament_request.format,
+        "players": len(tournament_request.user_ids),
+        "swiss_rounds": tournament_request.swiss_rounds
+    }
+    
+    cooldown = get_tournament_cooldown(db, current_user.user_id)
+    if cooldown:
+        raise HTTPException(
+            status_code=429,
+            detail=f"You can start another tournament in {cooldown} seconds",
+            headers={"Retry-After": str(cooldown)}
+        )
+    
+    try:
+        tournament, message = run_tournament(
+            db=db,
+            creator_user_id=current_user.user_id,
+            user_ids=tournament_request.user_ids,
+            tournament_format=tournament_request.format,
+            name=tournament_request.name,
+            swiss_rounds=tournament_request.swiss_rounds
+        )
+        execution_time = int((time.time() - start_time) * 1000)
+        
+        if not tournament:
+            log_error(
+                db=db,
+                action=GameAction.TOURNAMENT,
+                error_message=message,
+                user_id=current_user.user_id,
+                details={**details, "success": False, "execution_time_ms": execution_time}
+            )
+            raise HTTPException(status_code=400, detail=message)
+        
+        # Build the response before logging: logging commits the session when the log buffer
+        # is disabled (LOG_BUFFER_SIZE=0), which expires the tournament object
+        response = TournamentResponse.model_validate(tournament)
+        
+        log_game_event(
+            db=db,
+            action=GameAction.TOURNAMENT,
+            user_id=current_user.user_id,
+            details={
+                **details,
+                "tournament_id": response.tournament_id,
+                "battles": response.extra.get("battles"),
+                "champion_user_id": response.standings[0].user_id,
+                "success": True,
+                "execution_time_ms": execution_time
+            },
+            resource_affected=f"tournament_id:{response.tournament_id}"
+        )
+        
+        return response
+        
+    except (HTTPException, StaleDataError):
+        # Conflicts are answered with 409 by the application handler
+        raise
+    except Exception as e:
+        db.rollback()
+        execution_time = int((time.time() - start_time) * 1000)
+        log_error(
+            db=db,
+            action=GameAction.TOURNAMENT,
+            error_message=str(e),
+            user_id=current_user.user_id,
+            details={**details, "execution_time_ms": execution_time, "exception_type": type(e).__name__}
+        )
+        raise HTTPException(status_code=500, detail=f"Tournament failed: {str(e)}")
+
+
+@router.put("/opt-in", response_model=TournamentOptInResponse)
+def set_tournament_opt_in_route(
+    opt_in_request: TournamentOptInRequest,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Allow or stop other users entering the current user in their tournaments.
+    """
+    user, message = set_tournament_opt_in(db, current_user.user_id, opt_in_request.opt_in)
+    
+    if not user:
+        raise HTTPException(status_code=404, detail=message)
+    
+    return TournamentOptInResponse(user_id=user.user_id, tournament_opt_in=user.tournament_opt_in)
+
+
+@router.get("/{tournament_id}", response_model=TournamentResponse)
+def get_tournament_route(
+    tournament_id: int,
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """
+    Get a tournament with the pairings and battle ids of every round and its final standings.
+    """
+    tournament, message = get_tournament(db, tournament_id)
+    
+    if not tournament:
+        raise HTTPException(status_code=404, detail=message)
+    
+    return tournament
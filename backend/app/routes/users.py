@@ -1,7 +1,8 @@
 # app/routes/users.py
 from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
-from backend.app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import get_db, get_async_db
 from database.models import User
 from backend.app.schemas.user_schemas import UserCreate, UserLogin, UserResponse, UpdateFormationRequest
 from backend.app.crud import user_crud
@@ -147,8 +148,8 @@ def list_users_route(skip: int = 0, limit: int = 100, db: Session = Depends(get_
     return users
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user_route(user_id: int, db: Session = Depends(get_db)):
-    db_user = user_crud.get_user(db=db, user_id=user_id)
+async def get_user_route(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_user = await user_crud.get_user_async(db=db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return db_user
@@ -156,13 +157,8 @@ def get_user_route(user_id: int, db: Session = Depends(get_db)):
 @router.put("/{user_id}/formation", response_model=UserResponse)
 def update_user_formation(user_id: int, formation_request: UpdateFormationRequest, db: Session = Depends(get_db)):
     """Update user's default formation."""
-    db_user = db.query(User).filter(User.user_id == user_id).first()
+    db_user = user_crud.update_user_formation(db, user_id, formation_request.default_formation)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Update the formation
-    db_user.default_formation = formation_request.default_formation
-    db.commit()
-    db.refresh(db_user)
-    
     return db_user
\ No newline at end of file
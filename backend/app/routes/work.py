@@ -7,11 +7,13 @@ including work performance, status checks, and history.
 
 from fastapi import APIRouter, HTTPException, Depends, Request
 from sqlalchemy.orm import Session
-from backend.app.database import get_db
-from backend.app.utils.auth_utils import get_current_user
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import get_db, get_async_db
+from backend.app.utils.auth_utils import get_current_user, get_current_user_async
 from backend.app.crud.work_crud import (
     perform_work,
-    get_user_work_status,
+    get_user_work_status_async,
     get_user_work_history,
     get_available_work_types_for_user
 )
@@ -84,7 +86,8 @@ def perform_work_route(
         
         return WorkPerformResponse(**result)
         
-    except HTTPException:
+    except (HTTPException, StaleDataError):
+        # Conflicts are answered with 409 by the application handler
         raise
     except Exception as e:
         execution_time = int((time.time() - start_time) * 1000)
@@ -102,9 +105,9 @@ def perform_work_route(
 
 
 @router.get("/status", response_model=WorkStatusResponse)
-def get_work_status_route(
-    db: Session = Depends(get_db),
-    current_user = Depends(get_current_user)
+async def get_work_status_route(
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user_async)
 ):
     """
     Get the current work status for the authenticated user.
@@ -113,7 +116,7 @@ def get_work_status_route(
     cooldown timers, and estimated income for their rank.
     """
     try:
-        status = get_user_work_status(db=db, user_id=current_user.user_id)
+        status = await get_user_work_status_async(db=db, user_id=current_user.user_id)
         
         if not status:
             raise HTTPException(status_code=404, detail="User work status not found")
@@ -15,12 +15,16 @@ class BattleRequest(BaseModel):
                                        If None, uses user's default_formation
         opponent_formation (Optional[str]): Formation strategy for opponent ("DEFENSIVE", "AGGRESSIVE", "TACTICAL")
                                            If None, uses opponent's default_formation
+        log_level (str): Battle log verbosity ("full", "summary", "none"). Default is "full".
+                         "summary" records per-round damage totals and destroyed ships,
+                         "none" only the outcome
     """
     opponent_user_id: int
     user_ship_numbers: Union[int, List[int]]
     opponent_ship_numbers: Union[int, List[int]]
     user_formation: Optional[str] = None
     opponent_formation: Optional[str] = None
+    log_level: str = "full"
 
 
 class BattleParticipant(BaseModel):
@@ -61,6 +65,8 @@ class BattleHistoryResponse(BaseModel):
         winner_user_id (Optional[int]): ID do usuário vencedor (ou None para empate).
         battle_log (List[str]): Log detalhado dos eventos da batalha.
         extra (Optional[Dict[str, Any]]): Informações adicionais (formações, danos, etc.).
+        seed (Optional[int]): Semente do gerador aleatório, permite reproduzir a batalha.
+        engine_version (Optional[str]): Versão do motor de combate que resolveu a batalha.
     """
     battle_id: int
     timestamp: datetime
@@ -68,5 +74,102 @@ class BattleHistoryResponse(BaseModel):
     winner_user_id: Optional[int] = None
     battle_log: List[str]
     extra: Optional[Dict[str, Any]] = None
+    seed: Optional[int] = None
+    engine_version: Optional[str] = None
     
     model_config = ConfigDict(from_attributes=True)
+
+
+class BattleEventsResponse(BaseModel):
+    """
+    Response model for the compact event stream of a battle.
+    
+    Attributes:
+        battle_id (int): Unique battle identifier
+        fleet_snapshot (Dict[str, Any]): Owner names, user IDs, formations and battle-ready ships of both fleets
+        battle_events (Dict[str, Any]): Columnar event stream with one entry per shot in the
+                                        "round", "attacker", "target", "kind", "damage" and "hp_after" lists.
+                                        attacker/target index the ships of fleet A followed by fleet B;
+                                        kind is 0 (evaded), 1 (hit) or 2 (hit and destroyed)
+    """
+    battle_id: int
+    fleet_snapshot: Dict[str, Any]
+    battle_events: Dict[str, Any]
+
+
+class ArmadaBattleRequest(BaseModel):
+    """
+    Request model for mass-fleet (armada) battles.
+    
+    Attributes:
+        opponent_user_id (int): ID of the opponent user
+        user_ship_numbers (Optional[List[int]]): Ship numbers for current user. If None, the whole hangar
+        opponent_ship_numbers (Optional[List[int]]): Ship numbers for opponent. If None, the whole hangar
+        user_formation (Optional[str]): Formation strategy for current user. If None, uses user's default_formation
+        opponent_formation (Optional[str]): Formation strategy for opponent. If None, uses opponent's default_formation
+    """
+    opponent_user_id: int
+    user_ship_numbers: Optional[List[int]] = None
+    opponent_ship_numbers: Optional[List[int]] = None
+    user_formation: Optional[str] = None
+    opponent_formation: Optional[str] = None
+
+
+class BattleBatchRequest(BaseModel):
+    """
+    Request model for executing several battles in one transaction.
+    
+    Attributes:
+        battles (List[BattleRequest]): Battles to run in order, all started by the current user
+    """
+    battles: List[BattleRequest]
+
+
+class BattleBatchItem(BaseModel):
+    """
+    Result of one battle of a batch.
+    
+    Attributes:
+        index (int): Position of the battle in the request
+        success (bool): Whether the battle was executed
+        message (str): Outcome or error message
+        battle (Optional[BattleHistoryResponse]): Battle result if executed
+    """
+    index: int
+    success: bool
+    message: str
+    battle: Optional[BattleHistoryResponse] = None
+
+
+class BattleBatchResponse(BaseModel):
+    """
+    Response model for a batch of battles.
+    
+    Attributes:
+        results (List[BattleBatchItem]): Per-battle results, in request order
+        executed (int): Number of battles executed
+        failed (int): Number of battles rejected
+    """
+    results: List[BattleBatchItem]
+    executed: int
+    failed: int
+
+
+class BattleJobResponse(BaseModel):
+    """
+    Status of an asynchronous battle job.
+    
+    Attributes:
+        job_id (str): Job identifier used for polling
+        status (str): "queued", "running", "completed" or "failed"
+        message (Optional[str]): Outcome or error message once finished
+        created_at (datetime): When the job was enqueued
+        finished_at (Optional[datetime]): When the job finished
+        battle (Optional[BattleHistoryResponse]): Battle result if completed
+    """
+    job_id: str
+    status: str
+    message: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    battle: Optional[BattleHistoryResponse] = None
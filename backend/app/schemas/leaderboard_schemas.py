@@ -0,0 +1,56 @@
+"""
+Pydantic schemas for leaderboard API endpoints.
+"""
+
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class LeaderboardEntry(BaseModel):
+    """
+    One leaderboard entry.
+    
+    Attributes:
+        rank (int): Position in the leaderboard, starting at 1 (ties ordered by user id)
+        user_id (int): ID of the user
+        nickname (Optional[str]): Nickname of the user
+        score (float): Value the leaderboard ranks by
+    """
+    rank: int
+    user_id: int
+    nickname: Optional[str] = None
+    score: float
+
+
+class LeaderboardResponse(BaseModel):
+    """
+    Response model for a leaderboard page.
+    
+    Attributes:
+        category (str): Leaderboard category ("elo", "victories", "level", "damage")
+        total (int): Number of ranked users
+        offset (int): Entries skipped before this page
+        entries (List[LeaderboardEntry]): Entries of the page, best first
+    """
+    category: str
+    total: int
+    offset: int
+    entries: List[LeaderboardEntry]
+
+
+class LeaderboardRankResponse(BaseModel):
+    """
+    Response model for the rank of a user.
+    
+    Attributes:
+        category (str): Leaderboard category
+        user_id (int): ID of the user
+        rank (int): Position of the user, starting at 1
+        score (float): Value the leaderboard ranks by
+        total (int): Number of ranked users
+    """
+    category: str
+    user_id: int
+    rank: int
+    score: float
+    total: int
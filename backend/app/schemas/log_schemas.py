@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 class SystemLogBase(BaseModel):
@@ -68,7 +68,9 @@ class LogQueryRequest(BaseModel):
         start_date (Optional[datetime]): Filter logs after this date.
         end_date (Optional[datetime]): Filter logs before this date.
         limit (int): Maximum number of logs to return. Default is 100.
-        offset (int): Number of logs to skip. Default is 0.
+        offset (int): Number of logs to skip. Default is 0. Ignored with a cursor.
+        cursor (Optional[str]): next_cursor of the previous page; the page starts right after it.
+        count (str): Total count: "exact", "estimate" (planner estimate) or "none". Default is "exact".
     """
     user_id: Optional[int] = None
     log_level: Optional[str] = None
@@ -78,6 +80,8 @@ class LogQueryRequest(BaseModel):
     end_date: Optional[datetime] = None
     limit: int = 100
     offset: int = 0
+    cursor: Optional[str] = None
+    count: Literal["exact", "estimate", "none"] = "exact"
 
 class LogQueryResponse(BaseModel):
     """
@@ -85,11 +89,13 @@ class LogQueryResponse(BaseModel):
 
     Attributes:
         logs (List[SystemLogResponse]): List of log entries.
-        total_count (int): Total number of logs matching the query.
+        total_count (Optional[int]): Number of logs matching the query (estimated with count=estimate, None with count=none).
         page (int): Current page number.
         per_page (int): Number of logs per page.
+        next_cursor (Optional[str]): Cursor of the next page, None on the last page.
     """
     logs: List[SystemLogResponse]
-    total_count: int
+    total_count: Optional[int]
     page: int
     per_page: int
+    next_cursor: Optional[str] = None
@@ -0,0 +1,55 @@
+"""
+Pydantic schemas for matchmaking API endpoints.
+"""
+
+from pydantic import BaseModel, field_serializer
+from typing import Any, List
+
+
+class MatchmakingOpponent(BaseModel):
+    """
+    An opponent suggested by matchmaking.
+    
+    Attributes:
+        user_id (int): ID of the opponent
+        nickname (str): Nickname of the opponent
+        elo_rank (float): Elo rating of the opponent
+        level (int): Level of the opponent
+        rank (Any): Military rank of the opponent
+        default_formation (str): Default formation of the opponent
+        victories (int): Number of victories
+        defeats (int): Number of defeats
+        active_ships (int): Number of active ships
+        elo_difference (float): Opponent Elo minus the requesting user's Elo
+        level_difference (int): Opponent level minus the requesting user's level
+    """
+    user_id: int
+    nickname: str
+    elo_rank: float
+    level: int
+    rank: Any
+    default_formation: str
+    victories: int
+    defeats: int
+    active_ships: int
+    elo_difference: float
+    level_difference: int
+    
+    @field_serializer('rank')
+    def serialize_rank(self, rank: Any) -> str:
+        """Convert UserRank enum to string value."""
+        if hasattr(rank, 'value'):
+            return rank.value
+        return str(rank)
+
+
+class MatchmakingResponse(BaseModel):
+    """
+    Response model for matchmaking.
+    
+    Attributes:
+        user_id (int): ID of the requesting user
+        opponents (List[MatchmakingOpponent]): Closest opponents first
+    """
+    user_id: int
+    opponents: List[MatchmakingOpponent]
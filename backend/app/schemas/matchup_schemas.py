@@ -0,0 +1,69 @@
+"""
+Pydantic schemas for matchup statistics API endpoints.
+"""
+
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+
+
+class MatchupCounters(BaseModel):
+    """
+    Counters and rates shared by every matchup.
+    
+    Attributes:
+        battles (int): Battles fought
+        wins (int): Battles won
+        ships (int): Ships fielded
+        ships_survived (int): Ships that survived
+        damage_dealt (float): Damage dealt
+        damage_taken (float): Damage taken
+        win_rate (float): wins / battles
+        survival_rate (float): ships_survived / ships
+        average_damage_dealt (float): Damage dealt per battle
+        average_damage_taken (float): Damage taken per battle
+        updated_at (datetime): Last battle counted
+    """
+    battles: int
+    wins: int
+    ships: int
+    ships_survived: int
+    damage_dealt: float
+    damage_taken: float
+    win_rate: float
+    survival_rate: float
+    average_damage_dealt: float
+    average_damage_taken: float
+    updated_at: datetime
+
+
+class FormationMatchup(MatchupCounters):
+    """
+    Stats of a formation against an opposing formation.
+    """
+    formation: str
+    opponent_formation: str
+
+
+class ShipMatchup(MatchupCounters):
+    """
+    Stats of a ship template against an opposing ship template.
+    """
+    ship_id: int
+    ship_name: str
+    opponent_ship_id: int
+    opponent_ship_name: str
+
+
+class FormationMatchupResponse(BaseModel):
+    """
+    Response model for formation matchup stats.
+    """
+    matchups: List[FormationMatchup]
+
+
+class ShipMatchupResponse(BaseModel):
+    """
+    Response model for ship template matchup stats.
+    """
+    matchups: List[ShipMatchup]
@@ -0,0 +1,125 @@
+"""
+Pydantic schemas for tournament-related API endpoints.
+
+This module contains request and response models for server-side tournaments
+(round robin, single elimination and Swiss).
+"""
+
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+
+class TournamentRequest(BaseModel):
+    """
+    Request model for running a tournament.
+    
+    Attributes:
+        user_ids (List[int]): IDs of the players; every player needs active ships
+        format (str): Tournament format ("round_robin", "single_elimination", "swiss"). Default is "round_robin"
+        name (Optional[str]): Tournament name. If None, named after the format and date
+        swiss_rounds (Optional[int]): Number of Swiss rounds. If None, log2 of the number of players
+    """
+    user_ids: List[int]
+    format: str = "round_robin"
+    name: Optional[str] = None
+    swiss_rounds: Optional[int] = None
+
+
+class TournamentOptInRequest(BaseModel):
+    """
+    Request model for accepting or refusing tournaments started by other users.
+    
+    Attributes:
+        opt_in (bool): Whether other users may enter the user in their tournaments
+    """
+    opt_in: bool
+
+
+class TournamentOptInResponse(BaseModel):
+    """
+    Response model for the tournament participation setting of a user.
+    
+    Attributes:
+        user_id (int): ID of the user
+        tournament_opt_in (bool): Whether other users may enter the user in their tournaments
+    """
+    user_id: int
+    tournament_opt_in: bool
+
+
+class TournamentStanding(BaseModel):
+    """
+    Final standing of a tournament player.
+    
+    Attributes:
+        position (int): Final position, 1 for the champion
+        user_id (int): ID of the player
+        nickname (str): Nickname of the player
+        played (int): Battles played
+        wins (int): Battles won
+        losses (int): Battles lost
+        byes (int): Rounds won by bye
+        points (int): Wins plus byes
+        buchholz (int): Sum of the points of the player's opponents (tie-break)
+        elo_before (float): Elo rating when the tournament started
+        elo_after (float): Elo rating after the tournament
+    """
+    position: int
+    user_id: int
+    nickname: str
+    played: int
+    wins: int
+    losses: int
+    byes: int
+    points: int
+    buchholz: int
+    elo_before: float
+    elo_after: float
+
+
+class TournamentPairing(BaseModel):
+    """
+    One pairing of a tournament round.
+    
+    Attributes:
+        user1_id (int): ID of the first player
+        user2_id (Optional[int]): ID of the second player, None for a bye
+        winner_user_id (int): ID of the player who advanced
+        battle_id (Optional[int]): ID of the battle in the battle history, None for a bye
+    """
+    user1_id: int
+    user2_id: Optional[int] = None
+    winner_user_id: int
+    battle_id: Optional[int] = None
+
+
+class TournamentResponse(BaseModel):
+    """
+    Response model for a tournament.
+    
+    Attributes:
+        tournament_id (int): ID of the tournament
+        name (str): Tournament name
+        format (str): Tournament format
+        status (str): Tournament status
+        created_by_user_id (int): ID of the user who started the tournament
+        participants (List[int]): Player IDs in seeding order
+        rounds (List[List[TournamentPairing]]): Pairings of every round
+        standings (List[TournamentStanding]): Final standings, champion first
+        extra (Optional[Dict[str, Any]]): Additional data (engine, battles, duration)
+        created_at (datetime): When the tournament was started
+        finished_at (Optional[datetime]): When the tournament finished
+    """
+    tournament_id: int
+    name: str
+    format: str
+    status: str
+    created_by_user_id: int
+    participants: List[int]
+    rounds: List[List[TournamentPairing]]
+    standings: List[TournamentStanding]
+    extra: Optional[Dict[str, Any]] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
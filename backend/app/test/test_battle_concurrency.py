@@ -0,0 +1,123 @@
+import threading
+import uuid
+import pytest
+from backend.app.database import create_session, init_database
+from backend.app.crud import battle_crud, work_crud
+from database.models import User, OwnedShips, BattleHistory
+
+# Utility function to create users with one active ship each, directly in the database
+def make_users(count):
+    init_database()
+    db = create_session()
+    try:
+        users = []
+        for _ in range(count):
+            suffix = uuid.uuid4().hex[:10]
+            user = User(nickname=f"stress_{suffix}", email=f"stress_{suffix}@example.com", password_hash="x")
+            db.add(user)
+            db.flush()
+            ship = OwnedShips(
+                user_id=user.user_id, ship_id=1, status="active", ship_name="Falcon",
+                base_attack=12, base_shield=8, base_evasion=0.05, base_fire_rate=1.8, base_hp=1000, base_value=1500,
+                actual_attack=12, actual_shield=8, actual_evasion=0.05, actual_fire_rate=1.8, actual_hp=1000, actual_value=1500
+            )
+            db.add(ship)
+            db.flush()
+            users.append((user.user_id, ship.ship_number))
+        db.commit()
+        return users
+    finally:
+        db.close()
+
+# Utility function to run battles in parallel threads, each simulation waiting for all of them
+# to be in flight (only the first simulation of each battle, retries run freely)
+def run_parallel_battles(monkeypatch, battles):
+    barrier = threading.Barrier(len(battles), timeout=10)
+    simulations = []
+    simulate = battle_crud.run_battle_simulation
+    local = threading.local()
+
+    def synchronized_simulation(*args, **kwargs):
+        simulations.append(threading.get_ident())
+        if not getattr(local, "synchronized", False):
+            local.synchronized = True
+            barrier.wait()
+        return simulate(*args, **kwargs)
+
+    monkeypatch.setattr(battle_crud, "run_battle_simulation", synchronized_simulation)
+    results = [None] * len(battles)
+
+    def battle(index, user1, user2):
+        db = create_session()
+        try:
+            history, message = battle_crud.battle_between_users(db, user1[0], user2[0], user1[1], user2[1])
+            results[index] = message if history is None else history.battle_id
+        except Exception as e:
+            results[index] = e
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=battle, args=(index, *users)) for index, users in enumerate(battles)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, simulations
+
+# Test that two battles sharing a user both land: the later commit is retried instead of lost
+def test_parallel_battles_same_user_no_lost_updates(monkeypatch):
+    shared, opponent1, opponent2 = make_users(3)
+    results, simulations = run_parallel_battles(monkeypatch, [(shared, opponent1), (shared, opponent2)])
+    assert all(isinstance(result, int) for result in results), results
+    # Both battles simulated concurrently from the same user version, so one had to retry
+    assert len(simulations) == 3
+    db = create_session()
+    try:
+        user = db.query(User).filter(User.user_id == shared[0]).one()
+        assert user.victories + user.defeats == 2
+        opponents = db.query(User).filter(User.user_id.in_([opponent1[0], opponent2[0]])).all()
+        assert sum(opponent.victories + opponent.defeats for opponent in opponents) == 2
+        assert user.damage_dealt == pytest.approx(sum(opponent.damage_taken for opponent in opponents))
+        assert db.query(BattleHistory).filter(BattleHistory.battle_id.in_(results)).count() == 2
+    finally:
+        db.close()
+
+# Test that battles between disjoint users run at the same time without conflicts
+def test_parallel_battles_disjoint_users_no_retries(monkeypatch):
+    users = make_users(4)
+    results, simulations = run_parallel_battles(monkeypatch, [(users[0], users[1]), (users[2], users[3])])
+    assert all(isinstance(result, int) for result in results), results
+    assert len(simulations) == 2
+
+# Test that work racing a battle of the same user is retried instead of failing on the version check
+def test_work_racing_battle_is_retried(monkeypatch):
+    (user_id, ship_number), (opponent_id, opponent_ship) = make_users(2)
+    income = work_crud.calculate_work_income_with_variance
+    incomes, currency_after_battle = [], []
+
+    def income_during_battle(base_income):
+        if not incomes:
+            # The battle commits between the work attempt loading the user and committing it
+            battle_db = create_session()
+            try:
+                history, message = battle_crud.battle_between_users(battle_db, user_id, opponent_id, ship_number, opponent_ship)
+                assert history is not None, message
+                currency_after_battle.append(battle_db.query(User).filter(User.user_id == user_id).one().currency_value)
+            finally:
+                battle_db.close()
+        incomes.append(income(base_income))
+        return incomes[-1]
+
+    monkeypatch.setattr(work_crud, "calculate_work_income_with_variance", income_during_battle)
+    db = create_session()
+    try:
+        result, message = work_crud.perform_work(db, user_id)
+        assert result is not None, message
+        assert len(incomes) == 2
+        db.expire_all()
+        user = db.query(User).filter(User.user_id == user_id).one()
+        # Neither the battle outcome nor the work income is lost
+        assert user.victories + user.defeats == 1
+        assert user.currency_value == result["new_currency_balance"] == currency_after_battle[0] + incomes[-1]
+    finally:
+        db.close()
@@ -0,0 +1,155 @@
+import json
+import random
+import pytest
+from backend.app.utils.battle_engine import CombatShip, ShipCombatState, FleetTargetIndex, simulate_battle, select_battle_engine, render_battle_log, NUMPY_AVAILABLE
+
+FORMATIONS = ["DEFENSIVE", "AGGRESSIVE", "TACTICAL"]
+
+# Utility function to build a fleet of battle-ready ship snapshots
+def make_fleet(size, attack=30, shield=20, hp=400, evasion=0.15, fire_rate=3):
+    return [
+        CombatShip(
+            ship_number=i + 1,
+            ship_name=f"Ship{i}",
+            attack=attack + i * 2,
+            shield=shield,
+            hp=hp + i * 10,
+            evasion=evasion,
+            fire_rate=fire_rate,
+            value=1000
+        )
+        for i in range(size)
+    ]
+
+# Utility function to run many battles and aggregate the outcome
+def outcome_stats(engine, formation1, formation2, runs=300):
+    rng = random.Random(1234)
+    wins1 = 0
+    damage1 = 0.0
+    survivors1 = 0
+    for _ in range(runs):
+        result = simulate_battle(
+            make_fleet(3), make_fleet(3, attack=34, hp=360, evasion=0.1),
+            formation1, formation2, rng=rng, engine=engine
+        )
+        wins1 += result.winner == 0
+        damage1 += result.total_damage[0]
+        survivors1 += result.survivors[0]
+    return wins1 / runs, damage1 / runs, survivors1 / runs
+
+# Test engine selection validation
+def test_select_battle_engine():
+    assert select_battle_engine("python") == "python"
+    with pytest.raises(ValueError):
+        select_battle_engine("fortran")
+
+# Test that the targeting index agrees with a linear scan as ships are damaged and destroyed
+def test_fleet_target_index():
+    rng = random.Random(9)
+    fleet = [ShipCombatState(ship, i, 0, "AGGRESSIVE") for i, ship in enumerate(make_fleet(30))]
+    index = FleetTargetIndex(fleet)
+    for _ in range(200):
+        alive = [ship for ship in fleet if ship.current_hp > 0]
+        if not alive:
+            break
+        assert index.lowest_hp() is min(alive, key=lambda s: s.current_hp)
+        assert index.highest_attack() is max(alive, key=lambda s: s.attack)
+        ship = rng.choice(alive)
+        ship.current_hp -= rng.uniform(20, 200)
+        index.update(ship)
+    assert index.lowest_hp() is None or index.lowest_hp().current_hp > 0
+
+# Test the structured result of the pure simulator
+def test_simulate_battle_result():
+    fleet_a = make_fleet(2)
+    fleet_b = make_fleet(3, attack=10)
+    result = simulate_battle(fleet_a, fleet_b, "TACTICAL", "DEFENSIVE", rng=random.Random(7), names=("A", "B"))
+    assert result.winner in (0, 1)
+    assert result.battle_type == "Fleet"
+    assert result.fleet_info == "(2v3)"
+    assert 1 <= result.rounds <= 20
+    assert len(result.final_hp[0]) == 2 and len(result.final_hp[1]) == 3
+    assert result.battle_log[0] == "Fleet Battle (2v3) started: A vs B"
+    assert "wins" in result.battle_log[-1]
+    damage_taken_b = sum(ship.hp - hp for ship, hp in zip(fleet_b, result.final_hp[1]))
+    assert damage_taken_b == pytest.approx(result.total_damage[0])
+    with pytest.raises(ValueError):
+        simulate_battle([], fleet_b)
+
+# Test the compact event stream and the log rendered from it
+@pytest.mark.parametrize("engine", ["python", pytest.param("numpy", marks=pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed"))])
+def test_battle_events(engine):
+    result = simulate_battle(make_fleet(3), make_fleet(2, attack=50), "AGGRESSIVE", "DEFENSIVE", rng=random.Random(3), engine=engine)
+    events = json.loads(json.dumps(result.events))
+    shots = len(events["round"])
+    assert all(len(events[column]) == shots for column in ("attacker", "target", "kind", "damage", "hp_after"))
+    assert events["kind"].count(2) == sum(result.ships_lost)
+    assert max(events["round"]) == result.rounds
+    log = render_battle_log(result.snapshot, events)
+    assert log == result.battle_log
+    assert sum(1 for line in log if " hits " in line or " evaded " in line) == shots
+    assert log.count("--- Round 1 ---") == 1
+
+# Test that both engines store the same packed event types (int kind codes, not bools)
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+def test_engines_same_event_types():
+    event_types = {}
+    for engine in ("python", "numpy"):
+        events = simulate_battle(make_fleet(3), make_fleet(3, attack=40), "TACTICAL", "AGGRESSIVE", rng=random.Random(5), engine=engine).events
+        event_types[engine] = {column: {type(value) for value in events[column]} for column in ("round", "attacker", "target", "kind")}
+        assert all(type(value) in (int, float) for column in ("damage", "hp_after") for value in events[column])
+    assert event_types["numpy"] == event_types["python"] == {column: {int} for column in ("round", "attacker", "target", "kind")}
+
+# Test that log levels change what is recorded but never the outcome
+@pytest.mark.parametrize("engine", ["python", pytest.param("numpy", marks=pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed"))])
+def test_battle_log_levels(engine):
+    results = {
+        level: simulate_battle(make_fleet(3), make_fleet(3, attack=40), "TACTICAL", "AGGRESSIVE", rng=random.Random(11), engine=engine, log_level=level)
+        for level in ("full", "summary", "none")
+    }
+    full, summary, none = results["full"], results["summary"], results["none"]
+    assert full.final_hp == summary.final_hp == none.final_hp
+    assert full.winner == summary.winner == none.winner
+    assert summary.events["kind"] == [2] * sum(full.ships_lost)
+    assert len(summary.events["round_damage"]) == full.rounds
+    assert sum(damage[0] for damage in summary.events["round_damage"]) == pytest.approx(full.total_damage[0], abs=0.1 * full.rounds)
+    assert none.events["round"] == []
+    assert none.battle_log == [full.battle_log[-1]]
+    assert len(summary.battle_log) < len(full.battle_log)
+    with pytest.raises(ValueError):
+        simulate_battle(make_fleet(1), make_fleet(1), log_level="verbose")
+
+# Test that both engines write consistent results back to the fleet
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+def test_numpy_engine_result():
+    fleet_b = make_fleet(2)
+    result = simulate_battle(make_fleet(2), fleet_b, "TACTICAL", "DEFENSIVE", engine="numpy")
+    assert result.engine == "numpy"
+    assert result.battle_log[3] == "--- Round 1 ---"
+    damage_taken_b = sum(ship.hp - hp for ship, hp in zip(fleet_b, result.final_hp[1]))
+    assert damage_taken_b == pytest.approx(result.total_damage[0])
+
+# Test that the numpy engine reproduces the outcome distribution of the python engine
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+@pytest.mark.parametrize("formation1,formation2", [(f1, f2) for f1 in FORMATIONS for f2 in FORMATIONS])
+def test_engines_same_outcome_distribution(formation1, formation2):
+    win_py, damage_py, survivors_py = outcome_stats("python", formation1, formation2)
+    win_np, damage_np, survivors_np = outcome_stats("numpy", formation1, formation2)
+    assert abs(win_py - win_np) < 0.12
+    assert damage_np == pytest.approx(damage_py, rel=0.05)
+    assert abs(survivors_py - survivors_np) < 0.35
+
+# Test that a pooled battle returns the same result as an in-process one
+def test_battle_process_pool(monkeypatch):
+    from backend.app.utils import battle_pool
+    monkeypatch.setattr(battle_pool, "BATTLE_PROCESS_POOL_SIZE", 1)
+    monkeypatch.setattr(battle_pool, "BATTLE_PROCESS_POOL_MIN_SHIPS", 2)
+    try:
+        pooled = battle_pool.run_battle_simulation(make_fleet(2), make_fleet(2), "TACTICAL", "DEFENSIVE", rng=random.Random(5))
+        stats = battle_pool.get_battle_pool_stats()
+    finally:
+        battle_pool.shutdown_battle_pool()
+    local = simulate_battle(make_fleet(2), make_fleet(2), "TACTICAL", "DEFENSIVE", rng=random.Random(5))
+    assert pooled.final_hp == local.final_hp
+    assert pooled.battle_log == local.battle_log
+    assert stats["started"] and stats["queue_depth"] == 0 and stats["completed"] == 1
@@ -0,0 +1,85 @@
+import random
+import uuid
+import numpy as np
+import pytest
+from backend.app.database import create_session, init_database
+from backend.app.crud.battle_crud import battle_between_users, calculate_elo_change
+from backend.app.crud.elo_crud import recompute_elo_ladder
+from backend.app.utils.elo_utils import apply_elo_chunk
+from database.models import User, OwnedShips
+
+# Utility function to create users with one active ship each, directly in the database
+def make_users(count):
+    init_database()
+    db = create_session()
+    try:
+        users = []
+        for _ in range(count):
+            suffix = uuid.uuid4().hex[:10]
+            user = User(nickname=f"elo_{suffix}", email=f"elo_{suffix}@example.com", password_hash="x")
+            db.add(user)
+            db.flush()
+            ship = OwnedShips(
+                user_id=user.user_id, ship_id=1, status="active", ship_name="Falcon",
+                base_attack=12, base_shield=8, base_evasion=0.05, base_fire_rate=1.8, base_hp=1000, base_value=1500,
+                actual_attack=12, actual_shield=8, actual_evasion=0.05, actual_fire_rate=1.8, actual_hp=1000, actual_value=1500
+            )
+            db.add(ship)
+            db.flush()
+            users.append((user.user_id, ship.ship_number))
+        db.commit()
+        return users
+    finally:
+        db.close()
+
+# Test that the wave-vectorized chunk update matches applying battles one by one
+def test_apply_elo_chunk_matches_sequential_updates():
+    rng = random.Random(7)
+    players = 20
+    battles = [tuple(rng.sample(range(players), 2)) for _ in range(500)]
+    expected = [1000.0 + 10 * player for player in range(players)]
+    for winner, loser in battles:
+        expected[winner], expected[loser] = calculate_elo_change(expected[winner], expected[loser])
+
+    ratings = np.array([1000.0 + 10 * player for player in range(players)])
+    winners, losers = (np.array(side) for side in zip(*battles))
+    # Two chunks, as when streaming
+    apply_elo_chunk(ratings, winners[:300], losers[:300], 32, 400)
+    apply_elo_chunk(ratings, winners[300:], losers[300:], 32, 400)
+    assert ratings.tolist() == pytest.approx(expected, abs=1e-9)
+
+# Test that replaying the history reproduces the incremental ratings and restores a corrupted one
+def test_recompute_elo_ladder():
+    users = make_users(3)
+    db = create_session()
+    try:
+        for user1, user2 in [(users[0], users[1]), (users[1], users[2]), (users[2], users[0]), (users[0], users[1])]:
+            battle, message = battle_between_users(db, user1[0], user2[0], user1[1], user2[1], log_level="none")
+            assert battle is not None, message
+            # Keep the ships alive for the next battle
+            db.query(OwnedShips).filter(OwnedShips.ship_number.in_([user1[1], user2[1]])).update(
+                {"status": "active", "actual_hp": 1000}, synchronize_session=False
+            )
+            db.commit()
+
+        user_ids = [user_id for user_id, _ in users]
+        report = recompute_elo_ladder(db, chunk_size=2)
+        assert report["battles"] >= 4
+        assert not report["applied"] and report["written"] == 0
+        changed = {change["user_id"] for change in recompute_elo_ladder(db, top=report["changed"])["largest_changes"]}
+        assert not changed & set(user_ids)
+
+        # A what-if run with another K factor moves the ratings without writing them
+        what_if = recompute_elo_ladder(db, base_change=16, top=10 ** 6)
+        assert set(user_ids) <= {change["user_id"] for change in what_if["largest_changes"]}
+
+        user = db.query(User).filter(User.user_id == user_ids[0]).one()
+        expected_elo = user.elo_rank
+        user.elo_rank = 5000
+        db.commit()
+        report = recompute_elo_ladder(db, apply=True, top=10 ** 6)
+        assert report["written"] == report["changed"] >= 1
+        db.expire_all()
+        assert db.query(User.elo_rank).filter(User.user_id == user_ids[0]).scalar() == pytest.approx(expected_elo)
+    finally:
+        db.close()
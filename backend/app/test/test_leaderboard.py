@@ -0,0 +1,56 @@
+import random
+import uuid
+from sqlalchemy import func
+from backend.app.database import create_session, init_database
+from backend.app.utils.leaderboard_registry import SortedRankList, get_leaderboard
+from database.models import User
+
+# Test the order-statistic list against a plain sorted list
+def test_sorted_rank_list_matches_sorted_list():
+    rng = random.Random(3)
+    keys = [(-rng.randint(0, 50), user_id) for user_id in range(300)]
+    ranking = SortedRankList(keys, load=8)
+    expected = sorted(keys)
+    for user_id in range(300, 1500):
+        if expected and rng.random() < 0.4:
+            key = expected.pop(rng.randrange(len(expected)))
+            ranking.remove(key)
+        else:
+            key = (-rng.randint(0, 50), user_id)
+            expected.append(key)
+            expected.sort()
+            ranking.add(key)
+        assert len(ranking) == len(expected)
+        start = rng.randrange(len(expected) + 1)
+        assert ranking.slice(start, start + 17) == expected[start:start + 17]
+        probe = rng.choice(expected)
+        assert ranking.index(probe) == expected.index(probe)
+
+# Test that committed user changes reach a loaded leaderboard and rolled back ones do not
+def test_leaderboard_follows_committed_changes():
+    init_database()
+    db = create_session()
+    try:
+        suffix = uuid.uuid4().hex[:10]
+        most_victories = db.query(func.max(User.victories)).scalar() or 0
+        user = User(nickname=f"board_{suffix}", email=f"board_{suffix}@example.com", password_hash="x", victories=most_victories + 1)
+        db.add(user)
+        db.commit()
+        leaderboard = get_leaderboard("victories", db)
+        assert leaderboard.rank_of(user.user_id)[0] == 1
+
+        user.victories = 0
+        db.flush()
+        db.rollback()
+        assert leaderboard.rank_of(user.user_id)[0] == 1
+
+        user.victories = 0
+        db.commit()
+        rank, score, total = leaderboard.rank_of(user.user_id)
+        assert (rank, score) == (total, 0)
+
+        db.delete(user)
+        db.commit()
+        assert leaderboard.rank_of(user.user_id) is None
+    finally:
+        db.close()
@@ -0,0 +1,59 @@
+import gzip
+import json
+import uuid
+from datetime import datetime
+from backend.app.database import create_session, init_database
+from backend.app.crud.log_crud import archive_logs, get_log, get_logs
+from backend.app.schemas.log_schemas import LogQueryRequest
+from database.log_partitions import list_log_partitions, partitions_for_range, drop_log_partition
+from database.models import SystemLogs
+
+# Test that closed months are rolled out of the hot table, read back by date range and archived after retention
+def test_logs_are_rolled_queried_by_range_and_archived(tmp_path):
+    init_database()
+    marker = uuid.uuid4().hex[:20]
+    db = create_session()
+    try:
+        for month in (1, 2, 3):
+            for day in (5, 20):
+                db.add(SystemLogs(
+                    timestamp=datetime(2000, month, day, 12), log_level="INFO", log_category="AUDIT",
+                    action=f"PARTITION_{marker}", details={"month": month, "day": day}
+                ))
+        db.commit()
+
+        # Only the logs before April 2000 are rolled: every other test logs in the current month
+        report = archive_logs(db, retention_days=40, archive_dir=str(tmp_path), now=datetime(2000, 4, 15))
+        assert report["rolled"] == {"system_logs_p200001": 2, "system_logs_p200002": 2, "system_logs_p200003": 2}
+        assert [(entry["partition"], entry["rows"]) for entry in report["archived"]] == [
+            ("system_logs_p200001", 2), ("system_logs_p200002", 2)
+        ]
+        assert [name for _, name in list_log_partitions(db.connection())] == ["system_logs_p200003"]
+        assert db.query(SystemLogs).filter(SystemLogs.action == f"PARTITION_{marker}").count() == 0
+
+        with gzip.open(tmp_path / "system_logs_p200002.ndjson.gz", "rt", encoding="utf-8") as archive:
+            archived = [json.loads(line) for line in archive]
+        assert [(row["details"]["month"], row["details"]["day"]) for row in archived] == [(2, 5), (2, 20)]
+        assert archived[0]["timestamp"] == "2000-02-05T12:00:00"
+
+        # A date range only reads the month tables it overlaps
+        assert [table.name for table in partitions_for_range(db.connection(), datetime(2000, 3, 10), datetime(2000, 3, 31))] == [
+            "system_logs", "system_logs_p200003"
+        ]
+        assert [table.name for table in partitions_for_range(db.connection(), datetime(2000, 4, 1))] == ["system_logs"]
+        logs, total, cursor = get_logs(db, LogQueryRequest(
+            action=marker, start_date=datetime(2000, 1, 1), end_date=datetime(2000, 12, 31), limit=1
+        ))
+        assert total == 2
+        assert [log.details["day"] for log in logs] == [20]
+        assert get_log(db, logs[0].log_id).details == {"month": 3, "day": 20}
+        logs, _, cursor = get_logs(db, LogQueryRequest(
+            action=marker, start_date=datetime(2000, 1, 1), end_date=datetime(2000, 12, 31), limit=1, cursor=cursor
+        ))
+        assert [log.details["day"] for log in logs] == [5] and cursor is None
+    finally:
+        db.rollback()
+        for _, name in list_log_partitions(db.connection()):
+            drop_log_partition(db.connection(), name)
+        db.commit()
+        db.close()
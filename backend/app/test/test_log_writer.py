@@ -0,0 +1,41 @@
+import uuid
+from backend.app.database import create_session, init_database
+from backend.app.utils.log_writer import submit_log_record, flush_logs, get_log_writer_stats
+from backend.app.utils.logging_utils import log_event, LogLevel, LogCategory, GameAction
+from database.models import SystemLogs, utc_now
+
+# Test that logged events are queued, then bulk-inserted with the time they were logged at
+def test_log_event_is_buffered_and_flushed():
+    init_database()
+    marker = uuid.uuid4().hex
+    logged_at = utc_now()
+    for index in range(5):
+        assert log_event(
+            db=None, level=LogLevel.INFO, category=LogCategory.SYSTEM, action=GameAction.API_ERROR,
+            details={"marker": marker, "index": index}
+        ) is None
+    assert flush_logs(timeout=10)
+
+    db = create_session()
+    try:
+        rows = db.query(SystemLogs).filter(SystemLogs.action == GameAction.API_ERROR.value).all()
+        rows = [row for row in rows if (row.details or {}).get("marker") == marker]
+        assert sorted(row.details["index"] for row in rows) == list(range(5))
+        assert all(abs((row.timestamp - logged_at.replace(tzinfo=None)).total_seconds()) < 5 for row in rows)
+    finally:
+        db.close()
+
+# Test that a record rejected by the database only loses itself, not its batch
+def test_rejected_record_is_counted_as_failed():
+    init_database()
+    # Write the records of earlier tests first so the counters only move with this test
+    assert flush_logs(timeout=10)
+    before = get_log_writer_stats()
+    valid = {"log_level": "INFO", "log_category": "SYSTEM", "action": "API_ERROR", "timestamp": utc_now()}
+    assert submit_log_record({**valid, "log_level": "VERBOSE"})
+    assert submit_log_record(valid)
+    assert flush_logs(timeout=10)
+    after = get_log_writer_stats()
+    assert after["failed"] - before["failed"] == 1
+    assert after["flushed"] - before["flushed"] == 1
+    assert after["queue_depth"] == 0
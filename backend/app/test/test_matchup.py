@@ -0,0 +1,34 @@
+import pytest
+from backend.app.database import create_session, init_database
+from backend.app.crud.matchup_crud import record_matchup_stats, get_formation_matchup_stats, get_ship_matchup_stats
+from backend.app.utils.matchup_utils import new_matchups, collect_battle_matchups
+
+# Test the counters collected from one battle, from the point of view of each side
+def test_collect_battle_matchups():
+    matchups = new_matchups()
+    collect_battle_matchups(matchups, ("DEFENSIVE", "TACTICAL"), ([1, 1, 2], [3]), ([10, 0, 5], [0]), (300.0, 90.0), 0)
+    assert matchups["formation"][("DEFENSIVE", "TACTICAL")] == [1, 1, 3, 2, 300.0, 90.0]
+    assert matchups["formation"][("TACTICAL", "DEFENSIVE")] == [1, 0, 1, 0, 90.0, 300.0]
+    assert matchups["ship"][(1, 3)] == [1, 1, 2, 1, pytest.approx(200.0), pytest.approx(60.0)]
+    assert matchups["ship"][(3, 2)] == [1, 0, 1, 0, 90.0, 300.0]
+
+# Test that recording matchups twice adds to the stored counters
+def test_record_matchup_stats_accumulates():
+    init_database()
+    db = create_session()
+    try:
+        def stored():
+            formation = {(row["formation"], row["opponent_formation"]): row for row in get_formation_matchup_stats(db)[0]}
+            ship = {(row["ship_id"], row["opponent_ship_id"]): row for row in get_ship_matchup_stats(db)[0]}
+            return formation[("AGGRESSIVE", "DEFENSIVE")]["battles"] if ("AGGRESSIVE", "DEFENSIVE") in formation else 0, \
+                ship[(1, 2)]["wins"] if (1, 2) in ship else 0
+
+        before = stored()
+        for _ in range(2):
+            matchups = new_matchups()
+            collect_battle_matchups(matchups, ("AGGRESSIVE", "DEFENSIVE"), ([1], [2]), ([5], [0]), (10.0, 4.0), 0)
+            record_matchup_stats(db, matchups)
+            db.commit()
+        assert stored() == (before[0] + 2, before[1] + 2)
+    finally:
+        db.close()
@@ -1,10 +1,13 @@
 import pytest
 from fastapi.testclient import TestClient
 from backend.app.main import app
+import json
 import random
 import string
+import time
 from sqlalchemy import text
 from backend.app.database import engine
+from backend.app.utils.constants import MATCHMAKING_LEVEL_WEIGHT
 
 client = TestClient(app)
 
@@ -16,6 +19,7 @@ def test_health_check():
     assert data["api"] == "running"
     assert data["status"] == "healthy"
     assert data["database"]["status"] == "healthy"
+    assert data["database"]["pool"]["checkouts"] >= 1
 
 # Test root endpoint
 def test_root_endpoint():
@@ -218,6 +222,21 @@ def test_activate_ships(ship_numbers):
     )
     assert activate2.status_code == 200
 
+# Test the async read routes (AsyncSession on the async driver)
+def test_async_read_routes(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    user = client.get(f"/api/v1/users/{user1_id}")
+    assert user.status_code == 200
+    assert user.json()["user_id"] == user1_id
+    assert client.get("/api/v1/users/99999999").status_code == 404
+    ships = client.get(f"/api/v1/ships/user/{user1_id}/ships", params={"status": "active"})
+    assert ships.status_code == 200
+    assert [ship["ship_number"] for ship in ships.json()] == [ship_number1]
+    limits = client.get("/api/v1/battle/ship-limits/", headers={"Authorization": f"Bearer {token1}"})
+    assert limits.status_code == 200
+    assert limits.json()["current_active_ships"] == 1
+    assert client.get("/api/v1/battle/ship-limits/", headers={"Authorization": "Bearer invalid"}).status_code == 401
+
 # Test battle between two users
 def test_battle_between_two_users(ship_numbers):
     (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
@@ -241,6 +260,62 @@ def test_battle_between_two_users(ship_numbers):
     assert "participants" in data
     assert "winner_user_id" in data
     assert "battle_log" in data
+    global last_battle
+    last_battle = data
+
+last_battle = None
+
+# Test replaying the previous battle from its seed
+def test_battle_replay(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    assert last_battle["seed"] is not None
+    replay = client.get(
+        f"/api/v1/battle/history/{last_battle['battle_id']}/replay",
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    assert replay.status_code == 200
+    data = replay.json()
+    assert data["winner_user_id"] == last_battle["winner_user_id"]
+    assert data["battle_log"] == last_battle["battle_log"]
+    events = client.get(
+        f"/api/v1/battle/history/{last_battle['battle_id']}/events",
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    assert events.status_code == 200
+    assert events.json()["battle_events"]["winner"] in (0, 1)
+    missing = client.get("/api/v1/battle/history/999999999/replay", headers={"Authorization": f"Bearer {token2}"})
+    assert missing.status_code == 404
+
+# Utility function to parse a Server-Sent Events response into (event, data) pairs
+def parse_sse(text):
+    return [
+        (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+        for block in text.strip().split("\n\n")
+    ]
+
+# Test streaming the previous battle round by round, and a new battle against an NPC
+def test_battle_stream(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    stream = client.get(
+        f"/api/v1/battle/history/{last_battle['battle_id']}/stream",
+        headers={"Authorization": f"Bearer {token2}"}
+    )
+    assert stream.status_code == 200
+    assert stream.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(stream.text)
+    assert events[0][0] == "start" and events[-1][0] == "end"
+    assert [data["round"] for event, data in events if event == "round"] == list(range(1, events[0][1]["rounds"] + 1))
+    # The streamed lines add up to the whole battle log
+    assert [line for _, data in events for line in data["lines"]] == last_battle["battle_log"]
+    assert events[-1][1]["winner_user_id"] == last_battle["winner_user_id"]
+    battle_request = {"opponent_user_id": 2, "user_ship_numbers": ship_number1, "opponent_ship_numbers": 2, "log_level": "summary"}
+    new_battle = client.post("/api/v1/battle/stream", json=battle_request, headers={"Authorization": f"Bearer {token1}"})
+    assert new_battle.status_code == 200
+    events = parse_sse(new_battle.text)
+    assert events[0][0] == "start" and events[-1][0] == "end"
+    assert all("round_damage" in data for event, data in events if event == "round")
+    missing = client.get("/api/v1/battle/history/999999999/stream", headers={"Authorization": f"Bearer {token2}"})
+    assert missing.status_code == 404
 
 # Test battle against NPC (User1 vs NPC_Astro)
 def test_battle_against_npc(ship_numbers):
@@ -287,6 +362,180 @@ def test_battle_against_npc(ship_numbers):
     npc_participant = next((p for p in participants if p["nickname"] == "NPC_Astro"), None)
     assert npc_participant is not None, "NPC_Astro not found in battle participants"
 
+
+# Test batch battles: valid and rejected battles are reported per item
+def test_battle_batch(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    batch_request = {
+        "battles": [
+            {"opponent_user_id": 2, "user_ship_numbers": ship_number1, "opponent_ship_numbers": 2, "log_level": "summary"},
+            {"opponent_user_id": user1_id, "user_ship_numbers": ship_number1, "opponent_ship_numbers": ship_number1}
+        ]
+    }
+    response = client.post("/api/v1/battle/batch", json=batch_request, headers={"Authorization": f"Bearer {token1}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["results"]) == 2
+    assert data["executed"] + data["failed"] == 2
+    assert data["results"][1]["success"] is False
+    assert data["results"][1]["message"] == "Same user battle not allowed"
+    empty = client.post("/api/v1/battle/batch", json={"battles": []}, headers={"Authorization": f"Bearer {token1}"})
+    assert empty.status_code == 400
+
+# Test an asynchronous battle job from submission to result
+def test_battle_job(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    battle_request = {"opponent_user_id": 2, "user_ship_numbers": ship_number1, "opponent_ship_numbers": 2, "log_level": "summary"}
+    submitted = client.post("/api/v1/battle/jobs", json=battle_request, headers={"Authorization": f"Bearer {token1}"})
+    assert submitted.status_code == 202
+    job_id = submitted.json()["job_id"]
+    for _ in range(100):
+        job = client.get(f"/api/v1/battle/jobs/{job_id}", headers={"Authorization": f"Bearer {token1}"}).json()
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+    assert job["status"] in ("completed", "failed")
+    if job["status"] == "completed":
+        assert job["battle"]["battle_id"]
+    # Jobs are private to the user who submitted them
+    other = client.get(f"/api/v1/battle/jobs/{job_id}", headers={"Authorization": f"Bearer {token2}"})
+    assert other.status_code == 404
+
+# Test that battle jobs are refused with 503 when no worker is configured
+def test_battle_job_disabled(ship_numbers, monkeypatch):
+    from backend.app.utils import battle_jobs
+    (user1_id, token1, ship_number1), _ = ship_numbers
+    monkeypatch.setattr(battle_jobs, "BATTLE_JOB_WORKERS", 0)
+    battle_request = {"opponent_user_id": 2, "user_ship_numbers": ship_number1, "opponent_ship_numbers": 2}
+    response = client.post("/api/v1/battle/jobs", json=battle_request, headers={"Authorization": f"Bearer {token1}"})
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Asynchronous battles are disabled"
+
+# Test a mass-fleet battle against the whole NPC hangar
+def test_armada_battle(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    armada_request = {"opponent_user_id": 2, "user_ship_numbers": [ship_number1]}
+    response = client.post("/api/v1/battle/armada", json=armada_request, headers={"Authorization": f"Bearer {token1}"})
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data["extra"]["battle_type"].startswith("Armada")
+    assert data["extra"]["log_level"] == "summary"
+    assert {participant["user_id"] for participant in data["participants"]} == {user1_id, 2}
+    # NPC ships are restored after every battle
+    assert all(participant["hp"] > 0 for participant in data["participants"] if participant["user_id"] == 2)
+    same_user = client.post("/api/v1/battle/armada", json={"opponent_user_id": user1_id}, headers={"Authorization": f"Bearer {token1}"})
+    assert same_user.status_code == 400
+
+# Test that an armada battle restores an NPC's hangar without activating its 'owned' ships
+def test_armada_battle_keeps_npc_ship_status(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    from backend.app.database import create_session
+    from database.models import User, OwnedShips
+    suffix = ''.join(random.choices(string.ascii_lowercase, k=8))
+    db = create_session()
+    try:
+        npc = User(nickname=f"NPC_armada_{suffix}", email=f"armada_{suffix}@npc.com", password_hash="x")
+        db.add(npc)
+        db.flush()
+        for status in ("active", "owned"):
+            db.add(OwnedShips(
+                user_id=npc.user_id, ship_id=1, status=status, ship_name="Falcon",
+                base_attack=12, base_shield=8, base_evasion=0.05, base_fire_rate=1.8, base_hp=1000, base_value=1500,
+                actual_attack=12, actual_shield=8, actual_evasion=0.05, actual_fire_rate=1.8, actual_hp=1000, actual_value=1500
+            ))
+        db.commit()
+        npc_id = npc.user_id
+    finally:
+        db.close()
+    armada_request = {"opponent_user_id": npc_id, "user_ship_numbers": [ship_number1]}
+    response = client.post("/api/v1/battle/armada", json=armada_request, headers={"Authorization": f"Bearer {token1}"})
+    assert response.status_code == 200
+    db = create_session()
+    try:
+        ships = db.query(OwnedShips).filter(OwnedShips.user_id == npc_id).order_by(OwnedShips.ship_number).all()
+        assert [ship.status for ship in ships] == ["active", "owned"]
+        assert all(ship.actual_hp == ship.base_hp for ship in ships)
+    finally:
+        db.close()
+
+# Test that matchmaking returns the closest opponents by Elo and level, never the user itself
+def test_matchmaking_opponents(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    response = client.get("/api/v1/matchmaking/opponents", params={"k": 5}, headers={"Authorization": f"Bearer {token1}"})
+    assert response.status_code == 200
+    opponents = response.json()["opponents"]
+    assert 0 < len(opponents) <= 5
+    assert user1_id not in [opponent["user_id"] for opponent in opponents]
+    assert all(opponent["active_ships"] > 0 for opponent in opponents)
+    distances = [abs(opponent["elo_difference"]) + MATCHMAKING_LEVEL_WEIGHT * abs(opponent["level_difference"]) for opponent in opponents]
+    assert distances == sorted(distances)
+    too_many = client.get("/api/v1/matchmaking/opponents", params={"k": 1000}, headers={"Authorization": f"Bearer {token1}"})
+    assert too_many.status_code == 422
+
+# Test leaderboard pages and rank-of-user lookups after the battles
+def test_leaderboard(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    response = client.get("/api/v1/leaderboard/elo", params={"limit": 10})
+    assert response.status_code == 200
+    data = response.json()
+    scores = [entry["score"] for entry in data["entries"]]
+    assert scores == sorted(scores, reverse=True)
+    assert [entry["rank"] for entry in data["entries"]] == list(range(1, len(scores) + 1))
+    rank = client.get(f"/api/v1/leaderboard/victories/users/{user1_id}")
+    assert rank.status_code == 200
+    victories = rank.json()
+    page = client.get("/api/v1/leaderboard/victories", params={"offset": victories["rank"] - 1, "limit": 1}).json()
+    assert page["entries"][0]["user_id"] == user1_id
+    assert page["entries"][0]["score"] == victories["score"]
+    assert client.get("/api/v1/leaderboard/gold").status_code == 404
+    assert client.get("/api/v1/leaderboard/elo/users/99999999").status_code == 404
+
+# Test the formation and ship template matchup stats after the battles
+def test_matchup_stats(ship_numbers):
+    response = client.get("/api/v1/stats/formations")
+    assert response.status_code == 200
+    matchups = response.json()["matchups"]
+    assert sum(matchup["battles"] for matchup in matchups) > 0
+    # Every battle is counted once from each side
+    wins = sum(matchup["wins"] for matchup in matchups)
+    assert 2 * wins == sum(matchup["battles"] for matchup in matchups)
+    aggressive = client.get("/api/v1/stats/formations", params={"formation": "AGGRESSIVE"}).json()["matchups"]
+    assert all(matchup["formation"] == "AGGRESSIVE" for matchup in aggressive)
+    assert client.get("/api/v1/stats/formations", params={"formation": "RANDOM"}).status_code == 400
+    ships = client.get("/api/v1/stats/ships").json()["matchups"]
+    assert ships and all(0 <= matchup["survival_rate"] <= 1 for matchup in ships)
+    assert client.get("/api/v1/stats/ships", params={"ship_id": 99999}).status_code == 404
+
+# Test a round robin tournament against NPCs through the API
+def test_tournament(ship_numbers):
+    (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
+    # Users who have not opted in cannot be entered, the creator has to play
+    refused = client.post("/api/v1/tournaments/", json={"user_ids": [user1_id, user2_id, 2]}, headers={"Authorization": f"Bearer {token1}"})
+    assert refused.status_code == 400
+    assert client.post("/api/v1/tournaments/", json={"user_ids": [2, 3, 4]}, headers={"Authorization": f"Bearer {token1}"}).status_code == 400
+    opt_in = client.put("/api/v1/tournaments/opt-in", json={"opt_in": True}, headers={"Authorization": f"Bearer {token2}"})
+    assert opt_in.status_code == 200 and opt_in.json()["tournament_opt_in"] is True
+
+    tournament_request = {"user_ids": [user1_id, 2, 3], "format": "round_robin", "name": "NPC Cup"}
+    response = client.post("/api/v1/tournaments/", json=tournament_request, headers={"Authorization": f"Bearer {token1}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["name"] == "NPC Cup"
+    assert len(data["rounds"]) == 3
+    assert sorted(standing["user_id"] for standing in data["standings"]) == sorted([user1_id, 2, 3])
+    battle_id = next(pairing["battle_id"] for pairing in data["rounds"][0] if pairing["battle_id"])
+    replay = client.get(f"/api/v1/battle/history/{battle_id}/replay", headers={"Authorization": f"Bearer {token1}"})
+    assert replay.status_code == 200
+    stored = client.get(f"/api/v1/tournaments/{data['tournament_id']}", headers={"Authorization": f"Bearer {token1}"})
+    assert stored.status_code == 200
+    assert stored.json()["standings"] == data["standings"]
+    # One tournament per cooldown period
+    again = client.post("/api/v1/tournaments/", json={"user_ids": [user1_id, user2_id]}, headers={"Authorization": f"Bearer {token1}"})
+    assert again.status_code == 429 and int(again.headers["Retry-After"]) > 0
+    invalid = client.post("/api/v1/tournaments/", json={"user_ids": [user2_id, user2_id]}, headers={"Authorization": f"Bearer {token2}"})
+    assert invalid.status_code == 400
+
 # Test repairing ships for both users before selling
 def test_repair_ships_before_selling(ship_numbers):
     (user1_id, token1, ship_number1), (user2_id, token2, ship_number2) = ship_numbers
@@ -414,6 +663,46 @@ def test_work_status_after_work(user_ids):
     assert data["time_until_available"] > 0  # Should have time remaining
     print(f"DEBUG: Work status after work - Can work: {data['can_work']}, Time until available: {data['time_until_available']:.2f} minutes")
 
+# Test that a write still losing its version check after the retries is answered with 409
+def test_write_conflict_returns_409(user_ids, monkeypatch):
+    from sqlalchemy.orm.exc import StaleDataError
+    from backend.app.crud import battle_crud, user_crud
+    (user1_id, _), _ = user_ids
+    attempts = []
+
+    def conflicting_update(db, user_id, default_formation):
+        attempts.append(user_id)
+        raise StaleDataError("users row updated concurrently")
+
+    monkeypatch.setattr(battle_crud, "BATTLE_CONFLICT_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(user_crud, "_update_user_formation", conflicting_update)
+    response = client.put(f"/api/v1/users/{user1_id}/formation", json={"default_formation": "DEFENSIVE"})
+    assert response.status_code == 409
+    assert len(attempts) == battle_crud.BATTLE_CONFLICT_RETRIES + 1
+
+# Test that battles and tournaments still conflicting after the retries are answered with 409, not 500
+def test_battle_conflict_returns_409(ship_numbers, monkeypatch):
+    from sqlalchemy.orm.exc import StaleDataError
+    from backend.app.crud import battle_crud, tournament_crud
+    (user1_id, token1, ship_number1), (user2_id, token2, _) = ship_numbers
+
+    def conflicting_battle(db, *args):
+        raise StaleDataError("users row updated concurrently")
+
+    monkeypatch.setattr(battle_crud, "BATTLE_CONFLICT_BACKOFF_SECONDS", 0)
+    for attempt in ("_battle_between_users", "_battle_batch", "_armada_battle"):
+        monkeypatch.setattr(battle_crud, attempt, conflicting_battle)
+    monkeypatch.setattr(tournament_crud, "_run_tournament", conflicting_battle)
+    battle_request = {"opponent_user_id": 2, "user_ship_numbers": ship_number1, "opponent_ship_numbers": 2}
+    headers = {"Authorization": f"Bearer {token1}"}
+    assert client.post("/api/v1/battle/battle", json=battle_request, headers=headers).status_code == 409
+    assert client.post("/api/v1/battle/batch", json={"battles": [battle_request]}, headers=headers).status_code == 409
+    armada_request = {"opponent_user_id": 2, "user_ship_numbers": [ship_number1]}
+    assert client.post("/api/v1/battle/armada", json=armada_request, headers=headers).status_code == 409
+    tournament_request = {"user_ids": [user2_id, 2, 3], "format": "round_robin"}
+    response = client.post("/api/v1/tournaments/", json=tournament_request, headers={"Authorization": f"Bearer {token2}"})
+    assert response.status_code == 409
+
 # Test log creation
 def test_create_log():
     global created_log_id
@@ -438,6 +727,33 @@ def test_log_retrieval_by_id():
     data_id = response_id.json()
     assert data_id["log_id"] == created_log_id
 
+# Test keyset pagination of the log list and its count modes
+def test_list_logs_keyset_pagination():
+    for index in range(5):
+        response = client.post("/api/v1/logs/", json={
+            "log_level": "DEBUG", "log_category": "AUDIT", "action": "KEYSET_PAGE", "details": {"index": index}
+        })
+        assert response.status_code == 200
+    seen = []
+    cursor = None
+    while True:
+        params = {"action": "KEYSET_PAGE", "log_category": "AUDIT", "limit": 2, "count": "none"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/logs/", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] is None
+        seen.extend(log["log_id"] for log in data["logs"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) >= 5 and seen == sorted(seen, reverse=True)
+
+    data = client.get("/api/v1/logs/", params={"action": "KEYSET_PAGE", "count": "estimate"}).json()
+    assert data["total_count"] == len(seen)
+    assert client.get("/api/v1/logs/", params={"cursor": "not-a-cursor"}).status_code == 400
+
 # Test delete log
 def test_delete_log():
     global created_log_id
@@ -445,4 +761,20 @@ def test_delete_log():
     assert response.status_code == 200
     # Confirm deletion
     response = client.get(f"/api/v1/logs/{created_log_id}")
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+# Test the rank bonus registry serves lookups from memory until invalidated
+def test_rank_bonus_registry():
+    from backend.app.database import create_session
+    from backend.app.utils.rank_bonus_registry import rank_bonus_registry
+    from database.models import UserRank
+    db = create_session()
+    try:
+        bonuses = rank_bonus_registry.load(db)
+        assert UserRank.RECRUIT in bonuses
+        # A fresh registry needs no session
+        assert rank_bonus_registry.get(UserRank.RECRUIT, None).max_active_ships >= 1
+        rank_bonus_registry.invalidate()
+        assert rank_bonus_registry.is_stale()
+        assert rank_bonus_registry.get(UserRank.RECRUIT, db) is not None
+    finally:
+        db.close()
@@ -0,0 +1,154 @@
+import itertools
+import time
+import uuid
+import pytest
+from backend.app.database import create_session, init_database
+from backend.app.crud.tournament_crud import run_tournament, get_tournament, get_tournament_cooldown
+from backend.app.utils.tournament_utils import round_robin_rounds, single_elimination_first_round, swiss_pairings
+from database.models import User, OwnedShips, BattleHistory
+
+# Utility function to create players (opted in to tournaments) with one active ship each, directly in the database
+def make_players(count, opt_in=True):
+    init_database()
+    db = create_session()
+    try:
+        players = []
+        for index in range(count):
+            suffix = uuid.uuid4().hex[:10]
+            user = User(nickname=f"cup_{suffix}", email=f"cup_{suffix}@example.com", password_hash="x", elo_rank=1000 + index,
+                        tournament_opt_in=opt_in)
+            db.add(user)
+            db.flush()
+            db.add(OwnedShips(
+                user_id=user.user_id, ship_id=1, status="active", ship_name="Falcon",
+                base_attack=12, base_shield=8, base_evasion=0.05, base_fire_rate=1.8, base_hp=1000, base_value=1500,
+                actual_attack=12, actual_shield=8, actual_evasion=0.05, actual_fire_rate=1.8, actual_hp=1000, actual_value=1500
+            ))
+            players.append(user.user_id)
+        db.commit()
+        return players
+    finally:
+        db.close()
+
+# Test that a round robin schedule pairs every player with every other player exactly once
+@pytest.mark.parametrize("count", [2, 5, 8])
+def test_round_robin_rounds(count):
+    rounds = round_robin_rounds(list(range(1, count + 1)))
+    meetings = []
+    for pairings in rounds:
+        players = [player for pairing in pairings for player in pairing if player is not None]
+        assert len(players) == len(set(players))
+        meetings += [frozenset(pairing) for pairing in pairings if pairing[1] is not None]
+    assert sorted(meetings, key=sorted) == sorted(map(frozenset, itertools.combinations(range(1, count + 1), 2)), key=sorted)
+
+# Test that the bracket gives byes to the top seeds and keeps them apart until the final
+def test_single_elimination_first_round():
+    assert single_elimination_first_round([1, 2, 3, 4, 5, 6]) == [(1, None), (4, 5), (2, None), (3, 6)]
+    assert single_elimination_first_round([1, 2]) == [(1, 2)]
+
+# Test that Swiss pairings avoid rematches and give the bye to the lowest ranked player
+def test_swiss_pairings():
+    assert swiss_pairings([1, 2, 3, 4, 5], {(1, 2)}, set()) == [(1, 3), (2, 4), (5, None)]
+    assert swiss_pairings([1, 2, 3], set(), {3}) == [(1, 3), (2, None)]
+
+# Test a full round robin: every pair fights once, Elo and records are updated and battles are stored
+def test_round_robin_tournament():
+    players = make_players(6)
+    db = create_session()
+    try:
+        tournament, message = run_tournament(db, players[0], players, "round_robin", name="Test Cup")
+        assert tournament is not None, message
+        assert len(tournament.rounds) == 5
+        assert tournament.extra["battles"] == 15
+        standings = tournament.standings
+        assert [standing["position"] for standing in standings] == list(range(1, 7))
+        assert sum(standing["wins"] for standing in standings) == 15
+        assert all(standing["played"] == 5 for standing in standings)
+        # Participants are seeded by Elo, best first
+        assert tournament.participants == players[::-1]
+
+        battle_ids = [pairing["battle_id"] for pairings in tournament.rounds for pairing in pairings]
+        battles = db.query(BattleHistory).filter(BattleHistory.battle_id.in_(battle_ids)).all()
+        assert len(battles) == 15
+        assert all(battle.extra["tournament_id"] == tournament.tournament_id for battle in battles)
+
+        users = db.query(User).filter(User.user_id.in_(players)).all()
+        for user in users:
+            standing = next(standing for standing in standings if standing["user_id"] == user.user_id)
+            assert (user.victories, user.defeats) == (standing["wins"], standing["losses"])
+            assert user.elo_rank == pytest.approx(standing["elo_after"])
+        # Tournament battles do not damage ships
+        ships = db.query(OwnedShips).filter(OwnedShips.user_id.in_(players)).all()
+        assert all(ship.status == "active" and ship.actual_hp == 1000 for ship in ships)
+
+        stored, _ = get_tournament(db, tournament.tournament_id)
+        assert stored.name == "Test Cup"
+    finally:
+        db.close()
+
+# Test that single elimination crowns one undefeated champion and Swiss has no rematches
+def test_elimination_and_swiss_tournaments():
+    players = make_players(5)
+    db = create_session()
+    try:
+        tournament, message = run_tournament(db, players[0], players, "single_elimination")
+        assert tournament is not None, message
+        assert [len(pairings) for pairings in tournament.rounds] == [4, 2, 1]
+        champion = tournament.standings[0]
+        assert champion["losses"] == 0 and champion["points"] == 3
+
+        tournament, message = run_tournament(db, players[0], players, "swiss", swiss_rounds=3)
+        assert tournament is not None, message
+        meetings = [
+            frozenset((pairing["user1_id"], pairing["user2_id"]))
+            for pairings in tournament.rounds for pairing in pairings if pairing["user2_id"] is not None
+        ]
+        assert len(tournament.rounds) == 3
+        assert len(meetings) == len(set(meetings)) == 6
+    finally:
+        db.close()
+
+# Test the validation of tournament requests
+def test_tournament_validation():
+    players = make_players(2)
+    db = create_session()
+    try:
+        assert run_tournament(db, players[0], players, "knockout")[0] is None
+        assert run_tournament(db, players[0], players[:1])[0] is None
+        assert run_tournament(db, players[0], [players[0], players[0]])[0] is None
+        assert run_tournament(db, players[0], players + [10 ** 9])[1] == "User not found"
+        assert get_tournament(db, 10 ** 9)[0] is None
+    finally:
+        db.close()
+
+# Test that only players who opted in can be entered in someone else's tournament
+def test_tournament_requires_creator_and_opt_in():
+    players = make_players(2)
+    outsider, = make_players(1, opt_in=False)
+    db = create_session()
+    try:
+        tournament, message = run_tournament(db, outsider, players)
+        assert tournament is None and message == "The tournament creator must be one of the players"
+        tournament, message = run_tournament(db, players[0], [players[0], outsider])
+        assert tournament is None and message.startswith("Players not accepting tournaments")
+        # The creator does not need to have opted in
+        tournament, message = run_tournament(db, outsider, [outsider, players[0]])
+        assert tournament is not None, message
+        assert get_tournament_cooldown(db, outsider) > 0
+        assert get_tournament_cooldown(db, players[1]) == 0
+    finally:
+        db.close()
+
+# Test that a 64-player round robin (2016 battles) completes in seconds
+def test_round_robin_64_players_performance():
+    players = make_players(64)
+    db = create_session()
+    try:
+        start = time.perf_counter()
+        tournament, message = run_tournament(db, players[0], players, "round_robin")
+        elapsed = time.perf_counter() - start
+        assert tournament is not None, message
+        assert tournament.extra["battles"] == 2016
+        assert elapsed < 30
+    finally:
+        db.close()
@@ -5,7 +5,9 @@ from jose import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from backend.app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from backend.app.database import get_db, get_async_db, create_session
 from backend.app.config import JWT_SECRET_KEY
 
 # OAuth2 scheme for FastAPI authentication
@@ -130,3 +132,35 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise credentials_exception
         
     return user
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    Async variant of get_current_user for async routes, loading the user with an AsyncSession.
+    Failed token verifications are logged as in get_current_user, off the event loop.
+    """
+    from database.models import User
+    
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    user_data = verify_token(token)
+    if not user_data or not user_data.get("user_id"):
+        await run_in_threadpool(_log_failed_token, token)
+        raise credentials_exception
+    
+    user = await db.get(User, user_data["user_id"])
+    if not user:
+        raise credentials_exception
+        
+    return user
+
+def _log_failed_token(token: str) -> None:
+    """Verify a rejected token again with a session of its own to log why it failed."""
+    db = create_session()
+    try:
+        verify_token(token, db_session=db)
+    finally:
+        db.close()
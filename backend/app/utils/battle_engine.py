@@ -0,0 +1,853 @@
+"""
+Combat resolution engines and pure battle simulator for the battle system.
+
+simulate_battle runs a complete battle over plain CombatShip value objects and
+returns a BattleResult. It never touches the database, so it can be used from
+scripts, workers and tests; battle_crud.battle_between_users wraps it with
+loading and persistence.
+
+Every random draw comes from a per-battle generator, so a battle is fully
+determined by its seed, its fleet snapshot and the engine version. Persisted
+battles store those three values and replay_battle regenerates the log on demand.
+
+The round loop of a battle can be resolved by two interchangeable engines:
+- "python": reference implementation, one interpreter iteration per shot
+- "numpy": vectorized implementation, fleets held as NumPy arrays and each
+  ship's volley resolved as a batch of array operations
+
+Both engines follow the same rules (formation targeting, evasion, shield
+reduction, damage variation, 20 round cap), work on ShipCombatState objects
+(compact __slots__ records instead of per-ship dicts), update their current_hp
+in place and return the total damage dealt by each side. Engine
+selection happens at runtime through select_battle_engine so the engines can
+be A/B tested in production.
+
+Engines do not format any text: every shot is recorded as a compact event
+(round, attacker, target, kind, damage, hp_after), where attacker and target
+are ship indices over fleet A followed by fleet B. pack_battle_events stores
+them column by column and render_battle_log turns them into the human-readable
+battle log only when it is requested. The battle log level limits what is
+recorded: "full" keeps every shot, "summary" only destroyed ships and per-round
+damage totals, "none" only the outcome. The level never changes the random
+draws, so a summarized battle can still be replayed in full from its seed.
+"""
+
+import heapq
+import logging
+import random
+import secrets
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+from typing import Iterator, List, Optional, Sequence, Tuple
+from backend.app.config import BATTLE_ENGINE, BATTLE_ENGINE_NUMPY_RATIO
+from backend.app.utils.constants import (
+    FORMATION_MODIFIERS,
+    SHIELD_DAMAGE_REDUCTION,
+    DAMAGE_VARIATION_RANGE,
+    MAX_BATTLE_ROUNDS
+)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - numpy is listed in requirements.txt
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ENGINE_PYTHON = "python"
+ENGINE_NUMPY = "numpy"
+BATTLE_ENGINES = (ENGINE_PYTHON, ENGINE_NUMPY)
+
+# Rules and random draw order version of each engine. Bump it whenever a change
+# would make a stored seed replay differently.
+ENGINE_VERSIONS = {
+    ENGINE_PYTHON: 1,
+    ENGINE_NUMPY: 1
+}
+
+# Battle event kinds
+EVENT_EVADE = 0   # Shot evaded by the target
+EVENT_HIT = 1     # Shot hit the target
+EVENT_KILL = 2    # Shot hit and destroyed the target
+
+# Battle log levels
+BATTLE_LOG_FULL = "full"         # Every shot
+BATTLE_LOG_SUMMARY = "summary"   # Destroyed ships and per-round damage totals
+BATTLE_LOG_NONE = "none"         # Outcome only
+BATTLE_LOG_LEVELS = (BATTLE_LOG_FULL, BATTLE_LOG_SUMMARY, BATTLE_LOG_NONE)
+
+# Columns of a packed battle event stream, one value per recorded shot
+EVENT_FIELDS = ("round", "attacker", "target", "kind", "damage", "hp_after")
+
+
+# --- Value Objects ---
+@dataclass(frozen=True)
+class CombatShip:
+    """
+    Battle-ready snapshot of a ship (rank bonuses already applied).
+
+    Attributes:
+        ship_number: Owned ship identifier
+        ship_name: Display name used in the battle log
+        attack: Damage per hit before shield reduction
+        shield: Defensive value, reduces incoming damage
+        hp: Hit points at battle start
+        evasion: Chance to avoid a shot (0.0-1.0, before formation modifier)
+        fire_rate: Shots fired per round (truncated to an integer)
+        value: Ship value, used for credit rewards
+    """
+    ship_number: int
+    ship_name: str
+    attack: float
+    shield: float
+    hp: float
+    evasion: float
+    fire_rate: float
+    value: int = 0
+
+
+@dataclass
+class BattleResult:
+    """
+    Outcome of a simulated battle between fleet A (index 0) and fleet B (index 1).
+
+    Attributes:
+        winner: Index of the winning fleet (0 or 1)
+        win_condition: How the battle was decided ("destruction", "damage", "survivors" or "chance")
+        rounds: Number of rounds fought
+        total_damage: Damage dealt by each fleet
+        final_hp: Remaining HP of every ship, in fleet order (<= 0 means destroyed)
+        events: Packed battle event stream (see pack_battle_events)
+        snapshot: Fleet snapshot the battle started from (see build_fleet_snapshot)
+        engine: Engine used to resolve the combat
+        battle_type: "1v1" or "Fleet"
+        fleet_info: Fleet sizes, e.g. "(3v2)"
+    """
+    winner: int
+    win_condition: str
+    rounds: int
+    total_damage: Tuple[float, float]
+    final_hp: Tuple[List[float], List[float]]
+    events: dict = field(default_factory=dict)
+    snapshot: dict = field(default_factory=dict)
+    engine: str = ENGINE_PYTHON
+    battle_type: str = "Fleet"
+    fleet_info: str = ""
+
+    @cached_property
+    def battle_log(self) -> List[str]:
+        """Human-readable log from battle start to the outcome line, rendered on first access."""
+        return render_battle_log(self.snapshot, self.events)
+
+    @property
+    def survivors(self) -> Tuple[int, int]:
+        """Number of surviving ships per fleet."""
+        return tuple(sum(1 for hp in fleet_hp if hp > 0) for fleet_hp in self.final_hp)
+
+    @property
+    def ships_lost(self) -> Tuple[int, int]:
+        """Number of destroyed ships per fleet."""
+        return tuple(sum(1 for hp in fleet_hp if hp <= 0) for fleet_hp in self.final_hp)
+
+
+class ShipCombatState:
+    """
+    Mutable per-ship state the engines work on.
+
+    Uses __slots__ so a fleet is a list of small fixed-layout records: no per-ship
+    dict, no references to ORM objects, and plain attribute reads in the shot loop.
+
+    Attributes:
+        index: Ship index over fleet A followed by fleet B (used in battle events)
+        side: Owner fleet (0 for fleet A, 1 for fleet B)
+        attack: Damage per hit before shield reduction
+        shield: Defensive value, reduces incoming damage
+        evasion: Chance to avoid a shot, including the fleet's formation modifier
+        shots: Shots fired per round (fire rate truncated to an integer)
+        current_hp: Remaining hit points
+    """
+    __slots__ = ("index", "side", "attack", "shield", "evasion", "shots", "current_hp")
+
+    def __init__(self, ship: CombatShip, index: int, side: int, formation: str):
+        self.index = index
+        self.side = side
+        self.attack = ship.attack
+        self.shield = ship.shield
+        self.evasion = ship.evasion * get_formation_evasion_modifier(formation)
+        self.shots = int(ship.fire_rate)
+        self.current_hp = ship.hp
+
+    def __repr__(self) -> str:
+        return f"<ShipCombatState(index={self.index}, side={self.side}, current_hp={self.current_hp})>"
+
+
+class FleetTargetIndex:
+    """
+    Targeting index of one fleet for the DEFENSIVE and TACTICAL formations.
+
+    Answers "lowest current HP" and "highest attack" among the fleet's surviving
+    ships in O(log n) amortized time instead of scanning the fleet for every
+    attacker. Both are heaps with lazy deletion: destroyed ships and outdated HP
+    entries are discarded when they reach the top. Ties resolve to the lowest
+    ship index, i.e. the first ship in fleet order, like min()/max() over the
+    fleet list.
+    """
+    __slots__ = ("_by_hp", "_by_attack")
+
+    def __init__(self, ships: List["ShipCombatState"]):
+        alive = [ship for ship in ships if ship.current_hp > 0]
+        self._by_hp = [(ship.current_hp, ship.index, ship) for ship in alive]
+        self._by_attack = [(-ship.attack, ship.index, ship) for ship in alive]
+        heapq.heapify(self._by_hp)
+        heapq.heapify(self._by_attack)
+
+    def lowest_hp(self) -> Optional["ShipCombatState"]:
+        """Surviving ship with the lowest current HP, or None if the fleet is destroyed."""
+        heap = self._by_hp
+        while heap:
+            hp, _, ship = heap[0]
+            if ship.current_hp > 0 and ship.current_hp == hp:
+                return ship
+            heapq.heappop(heap)
+        return None
+
+    def highest_attack(self) -> Optional["ShipCombatState"]:
+        """Surviving ship with the highest attack, or None if the fleet is destroyed."""
+        heap = self._by_attack
+        while heap:
+            ship = heap[0][2]
+            if ship.current_hp > 0:
+                return ship
+            heapq.heappop(heap)
+        return None
+
+    def update(self, ship: "ShipCombatState") -> None:
+        """Record a new current HP of a damaged ship (older entries become stale)."""
+        if ship.current_hp > 0:
+            heapq.heappush(self._by_hp, (ship.current_hp, ship.index, ship))
+
+
+# --- Formation System Helper Functions ---
+def get_formation_evasion_modifier(formation: str) -> float:
+    """
+    Get evasion modifier based on formation type.
+    DEFENSIVE: +20% evasion (impacts enemy's hit chance)
+    AGGRESSIVE: Normal evasion (no modifier)
+    TACTICAL: -10% evasion (penalty for focusing on high-attack targets)
+    """
+    return FORMATION_MODIFIERS.get(formation, 1.0)
+
+
+def select_target_by_formation(
+    formation: str,
+    enemy_ships: List["ShipCombatState"],
+    rng=random,
+    target_index: Optional[FleetTargetIndex] = None
+) -> "ShipCombatState":
+    """
+    Select target ship based on formation strategy.
+    DEFENSIVE: Target ship with lowest HP (finish weak enemies first)
+    AGGRESSIVE: Random target (spread damage), drawn from rng
+    TACTICAL: Target ship with highest attack (eliminate threats first)
+    With a target_index of the enemy fleet, DEFENSIVE and TACTICAL are answered
+    from the index instead of scanning enemy_ships.
+    """
+    if not enemy_ships:
+        return None
+
+    if target_index is not None and formation == "DEFENSIVE":
+        return target_index.lowest_hp()
+    elif target_index is not None and formation == "TACTICAL":
+        return target_index.highest_attack()
+    elif formation == "DEFENSIVE":
+        # Target ship with lowest current HP
+        return min(enemy_ships, key=lambda s: s.current_hp)
+    elif formation == "TACTICAL":
+        # Target ship with highest attack value
+        return max(enemy_ships, key=lambda s: s.attack)
+    else:  # AGGRESSIVE or default
+        # Random target
+        return rng.choice(enemy_ships)
+
+
+# --- Engine Selection ---
+def select_battle_engine(requested: Optional[str] = None) -> str:
+    """
+    Select the combat engine for a battle.
+
+    An explicitly requested engine always wins. Otherwise BATTLE_ENGINE_NUMPY_RATIO
+    routes that fraction of battles to the NumPy engine (A/B testing), and the
+    remaining battles use the configured BATTLE_ENGINE default.
+    Falls back to the Python engine when NumPy is not installed.
+
+    Args:
+        requested: Engine name ("python" or "numpy"), or None for the configured default
+
+    Returns:
+        Name of the engine to use
+
+    Raises:
+        ValueError: If the requested engine is unknown
+    """
+    if requested is not None and requested not in BATTLE_ENGINES:
+        raise ValueError(f"Unknown battle engine '{requested}'. Valid engines: {', '.join(BATTLE_ENGINES)}")
+
+    if requested is None:
+        if BATTLE_ENGINE_NUMPY_RATIO > 0 and random.random() < BATTLE_ENGINE_NUMPY_RATIO:
+            requested = ENGINE_NUMPY
+        else:
+            requested = BATTLE_ENGINE if BATTLE_ENGINE in BATTLE_ENGINES else ENGINE_PYTHON
+
+    if requested == ENGINE_NUMPY and not NUMPY_AVAILABLE:
+        logger.warning("NumPy battle engine requested but numpy is not installed; using python engine")
+        return ENGINE_PYTHON
+
+    return requested
+
+
+# --- Seeds, Snapshots and Replay ---
+def new_battle_seed() -> int:
+    """Generate a random 63-bit seed for a battle (fits a signed BIGINT column)."""
+    return secrets.randbits(63)
+
+
+def get_engine_version(engine: str) -> str:
+    """Return the versioned engine identifier stored with a battle, e.g. 'python:1'."""
+    return f"{engine}:{ENGINE_VERSIONS[engine]}"
+
+
+def build_fleet_snapshot(
+    fleet_a: Sequence[CombatShip],
+    fleet_b: Sequence[CombatShip],
+    formation_a: str,
+    formation_b: str,
+    names: Tuple[str, str],
+    user_ids: Tuple[int, int] = (None, None)
+) -> dict:
+    """
+    Build the JSON-serializable battle input stored with a battle for replay.
+    """
+    return {
+        "names": list(names),
+        "user_ids": list(user_ids),
+        "formations": [formation_a, formation_b],
+        "fleets": [[asdict(ship) for ship in fleet_a], [asdict(ship) for ship in fleet_b]]
+    }
+
+
+def replay_battle(seed: int, engine_version: str, snapshot: dict) -> BattleResult:
+    """
+    Re-run a stored battle from its seed, engine version and fleet snapshot.
+
+    Args:
+        seed: Seed the battle was simulated with
+        engine_version: Versioned engine identifier returned by get_engine_version
+        snapshot: Fleet snapshot returned by build_fleet_snapshot
+
+    Returns:
+        BattleResult identical to the original simulation
+
+    Raises:
+        ValueError: If the engine is unknown or its version changed since the battle
+    """
+    engine, _, version = (engine_version or "").partition(":")
+    if engine not in ENGINE_VERSIONS:
+        raise ValueError(f"Unknown battle engine '{engine}'")
+    if version != str(ENGINE_VERSIONS[engine]):
+        raise ValueError(
+            f"Battle was resolved with engine version {engine_version}, "
+            f"current version is {get_engine_version(engine)}; it cannot be replayed exactly"
+        )
+    if engine == ENGINE_NUMPY and not NUMPY_AVAILABLE:
+        raise ValueError("Battle was resolved with the numpy engine but numpy is not installed")
+
+    fleet_a, fleet_b = ([CombatShip(**ship) for ship in fleet] for fleet in snapshot["fleets"])
+    formation_a, formation_b = snapshot["formations"]
+    return simulate_battle(
+        fleet_a, fleet_b, formation_a, formation_b,
+        rng=random.Random(seed),
+        engine=engine,
+        names=tuple(snapshot["names"])
+    )
+
+
+# --- Battle Events ---
+def pack_battle_events(
+    events: List[tuple],
+    rounds: int,
+    winner: int,
+    win_condition: str,
+    total_damage: Tuple[float, float],
+    round_damage: Sequence[Tuple[float, float]] = (),
+    log_level: str = BATTLE_LOG_FULL
+) -> dict:
+    """
+    Pack shot events into a JSON-serializable columnar stream.
+
+    Each EVENT_FIELDS column holds one value per recorded shot. Damage and HP are
+    kept with the one decimal shown in the battle log; HP is clamped at zero. The
+    outcome needed to render the log (rounds, winner, win condition, damage
+    totals) and the damage dealt by each fleet in every round are stored
+    alongside the columns.
+
+    Args:
+        events: (round, attacker, target, kind, damage, hp_after) tuples from resolve_combat
+        rounds: Number of rounds fought
+        winner: Index of the winning fleet
+        win_condition: How the battle was decided
+        total_damage: Damage dealt by each fleet
+        round_damage: Cumulative damage of each fleet at the end of every round
+        log_level: Battle log level the events were recorded with
+
+    Returns:
+        Packed event stream dict
+    """
+    columns = list(zip(*events)) if events else [()] * len(EVENT_FIELDS)
+    rounds_column, attackers, targets, kinds, damage, hp_after = columns
+    previous = (0, 0)
+    per_round = []
+    for totals in round_damage:
+        per_round.append([round(totals[0] - previous[0], 1), round(totals[1] - previous[1], 1)])
+        previous = totals
+    return {
+        "log_level": log_level,
+        "rounds": rounds,
+        "winner": winner,
+        "win_condition": win_condition,
+        "total_damage": list(total_damage),
+        "round": list(rounds_column),
+        "attacker": list(attackers),
+        "target": list(targets),
+        "kind": list(kinds),
+        "damage": [round(value, 1) for value in damage],
+        "hp_after": [round(max(0, value), 1) for value in hp_after],
+        "round_damage": per_round if log_level != BATTLE_LOG_NONE else []
+    }
+
+
+def render_battle_log(snapshot: dict, events: dict) -> List[str]:
+    """
+    Render the human-readable battle log of a packed event stream.
+
+    Args:
+        snapshot: Fleet snapshot the battle started from (see build_fleet_snapshot)
+        events: Packed event stream (see pack_battle_events)
+
+    Returns:
+        Log lines from battle start to the outcome line. A "summary" stream renders
+        destroyed ships and round damage totals instead of shots, a "none" stream
+        only the outcome line
+    """
+    return [line for chunk in iter_battle_rounds(snapshot, events) for line in chunk["lines"]]
+
+
+def iter_battle_rounds(snapshot: dict, events: dict) -> Iterator[dict]:
+    """
+    Render a packed event stream one round at a time, for clients that display
+    a battle progressively.
+
+    Yields:
+        {"round": 0, "lines": header lines}, then for every round
+        {"round": n, "lines": log lines, "events": the event columns of the round,
+        "round_damage": damage of both fleets in the round (summary streams only)},
+        and finally {"round": None, "lines": [outcome line]}
+    """
+    log_level = events.get("log_level", BATTLE_LOG_FULL)
+    names = snapshot["names"]
+    fleet_a, fleet_b = snapshot["fleets"]
+    formation_a, formation_b = snapshot["formations"]
+    ships = fleet_a + fleet_b
+    size_a = len(fleet_a)
+    owners = [names[0]] * size_a + [names[1]] * len(fleet_b)
+    alive = [ship["hp"] > 0 for ship in ships]
+
+    battle_type = _battle_type(size_a, len(fleet_b))
+    fleet_info = f"({size_a}v{len(fleet_b)})"
+    rounds = 0
+    if log_level != BATTLE_LOG_NONE:
+        yield {"round": 0, "lines": [
+            f"{battle_type} Battle {fleet_info} started: {names[0]} vs {names[1]}",
+            f"{names[0]} formation: {formation_a} ({size_a} ships)",
+            f"{names[1]} formation: {formation_b} ({len(fleet_b)} ships)"
+        ]}
+        rounds = events["rounds"]
+
+    rows = list(zip(*(events[column] for column in EVENT_FIELDS)))
+    position = 0
+    for round_num in range(1, rounds + 1):
+        battle_log = [
+            f"--- Round {round_num} ---",
+            f"{names[0]}: {sum(alive[:size_a])} ships active, {names[1]}: {sum(alive[size_a:])} ships active"
+        ]
+        round_start = position
+
+        while position < len(rows) and rows[position][0] == round_num:
+            _, attacker, target, kind, damage, hp_after = rows[position]
+            position += 1
+            attacker_name = f"{ships[attacker]['ship_name']} ({owners[attacker]})"
+            target_name = f"{ships[target]['ship_name']} ({owners[target]})"
+
+            if kind == EVENT_EVADE:
+                battle_log.append(f"{target_name} evaded attack from {attacker_name}!")
+                continue
+
+            if log_level == BATTLE_LOG_SUMMARY:
+                battle_log.append(f"{target_name} destroyed by {attacker_name}!")
+            else:
+                battle_log.append(f"{attacker_name} hits {target_name} for {damage:.1f} damage! HP: {hp_after:.1f}")
+            if kind == EVENT_KILL:
+                if log_level != BATTLE_LOG_SUMMARY:
+                    battle_log.append(f"{ships[target]['ship_name']} destroyed!")
+                alive[target] = False
+
+        chunk = {
+            "round": round_num,
+            "lines": battle_log,
+            "events": {column: events[column][round_start:position] for column in EVENT_FIELDS}
+        }
+        if log_level == BATTLE_LOG_SUMMARY and round_num <= len(events["round_damage"]):
+            damage_a, damage_b = events["round_damage"][round_num - 1]
+            battle_log.append(f"Round damage: {names[0]} {damage_a:.1f}, {names[1]} {damage_b:.1f}")
+            chunk["round_damage"] = [damage_a, damage_b]
+        yield chunk
+
+    winner = events["winner"]
+    win_condition = events["win_condition"]
+    damage_winner, damage_loser = events["total_damage"][winner], events["total_damage"][1 - winner]
+    if win_condition == "destruction":
+        outcome = f"{names[winner]} wins! All enemy ships destroyed."
+    elif win_condition == "damage":
+        outcome = f"{names[winner]} wins by total damage! ({damage_winner:.1f} vs {damage_loser:.1f})"
+    elif win_condition == "survivors":
+        outcome = f"{names[winner]} wins by more surviving ships!"
+    else:
+        outcome = f"{names[winner]} wins by chance in a perfect tie!"
+    yield {"round": None, "lines": [outcome]}
+
+
+# --- Battle Simulator ---
+def simulate_battle(
+    fleet_a: Sequence[CombatShip],
+    fleet_b: Sequence[CombatShip],
+    formation_a: str = "AGGRESSIVE",
+    formation_b: str = "AGGRESSIVE",
+    rng: Optional[random.Random] = None,
+    engine: str = ENGINE_PYTHON,
+    names: Tuple[str, str] = ("Fleet A", "Fleet B"),
+    log_level: str = BATTLE_LOG_FULL
+) -> BattleResult:
+    """
+    Simulate a complete battle between two fleets without any database access.
+
+    Args:
+        fleet_a, fleet_b: Battle-ready ship snapshots of each fleet
+        formation_a, formation_b: Formation strategy ("DEFENSIVE", "AGGRESSIVE", "TACTICAL")
+        rng: Random source for every draw of the battle. A new unseeded generator is used if None
+        engine: Combat engine ("python" or "numpy")
+        names: Display names of the fleet owners, used when rendering the battle log
+        log_level: What the battle event stream records ("full", "summary" or "none")
+
+    Returns:
+        BattleResult with winner, damage totals, final HP per ship and the battle event stream
+
+    Raises:
+        ValueError: If a fleet is empty or the log level is unknown
+    """
+    if not fleet_a or not fleet_b:
+        raise ValueError("Both fleets need at least one ship")
+    if log_level not in BATTLE_LOG_LEVELS:
+        raise ValueError(f"Unknown battle log level '{log_level}'. Valid levels: {', '.join(BATTLE_LOG_LEVELS)}")
+
+    rng = rng or random.Random()
+
+    state_a = [ShipCombatState(ship, index, 0, formation_a) for index, ship in enumerate(fleet_a)]
+    state_b = [ShipCombatState(ship, index, 1, formation_b) for index, ship in enumerate(fleet_b, start=len(fleet_a))]
+
+    events = []
+    round_damage = []
+    damage_a, damage_b, rounds = resolve_combat(
+        state_a, state_b, formation_a, formation_b, events,
+        engine=engine, rng=rng, log_level=log_level, round_damage=round_damage
+    )
+
+    # Determine winner based on remaining ships or total damage
+    survivors_a = sum(1 for ship in state_a if ship.current_hp > 0)
+    survivors_b = sum(1 for ship in state_b if ship.current_hp > 0)
+
+    if survivors_a and not survivors_b:
+        winner, win_condition = 0, "destruction"
+    elif survivors_b and not survivors_a:
+        winner, win_condition = 1, "destruction"
+    elif damage_a > damage_b:
+        winner, win_condition = 0, "damage"
+    elif damage_b > damage_a:
+        winner, win_condition = 1, "damage"
+    elif survivors_a != survivors_b:
+        # Tie-breaker: fleet with more surviving ships wins
+        winner, win_condition = (0 if survivors_a > survivors_b else 1), "survivors"
+    else:
+        # Final tie-breaker: random
+        winner, win_condition = rng.choice([0, 1]), "chance"
+
+    return BattleResult(
+        winner=winner,
+        win_condition=win_condition,
+        rounds=rounds,
+        total_damage=(damage_a, damage_b),
+        final_hp=([ship.current_hp for ship in state_a], [ship.current_hp for ship in state_b]),
+        events=pack_battle_events(
+            events, rounds, winner, win_condition, (damage_a, damage_b), round_damage, log_level
+        ),
+        snapshot=build_fleet_snapshot(fleet_a, fleet_b, formation_a, formation_b, names),
+        engine=engine,
+        battle_type=_battle_type(len(fleet_a), len(fleet_b)),
+        fleet_info=f"({len(fleet_a)}v{len(fleet_b)})"
+    )
+
+
+def _battle_type(size_a: int, size_b: int) -> str:
+    """Return "1v1" for single ship battles, "Fleet" otherwise."""
+    return "1v1" if size_a == 1 and size_b == 1 else "Fleet"
+
+
+def resolve_combat(
+    fleet1: List[ShipCombatState],
+    fleet2: List[ShipCombatState],
+    formation1: str,
+    formation2: str,
+    events: list,
+    engine: str = ENGINE_PYTHON,
+    rng: Optional[random.Random] = None,
+    log_level: str = BATTLE_LOG_FULL,
+    round_damage: Optional[list] = None
+) -> Tuple[float, float, int]:
+    """
+    Resolve the round loop of a battle with the given engine.
+
+    Args:
+        fleet1, fleet2: Combat state of each ship (rank bonuses and formation evasion applied);
+                        current_hp is updated in place
+        formation1, formation2: Formation of each fleet (targeting strategy)
+        events: List the (round, attacker, target, kind, damage, hp_after) shot events are appended to
+        engine: Engine name returned by select_battle_engine
+        rng: Random source; the NumPy engine seeds its generator from it
+        log_level: "full" records every shot, "summary" only destroying shots, "none" nothing
+        round_damage: Optional list the cumulative damage of both fleets is appended to after every round
+
+    Returns:
+        Tuple of (damage dealt by fleet1, damage dealt by fleet2, rounds fought)
+    """
+    rng = rng or random.Random()
+    round_damage = round_damage if round_damage is not None else []
+    if engine == ENGINE_NUMPY:
+        return _resolve_combat_numpy(fleet1, fleet2, formation1, formation2, events, rng, log_level, round_damage)
+    return _resolve_combat_python(fleet1, fleet2, formation1, formation2, events, rng, log_level, round_damage)
+
+
+# --- Python Engine ---
+def _resolve_combat_python(fleet1, fleet2, formation1, formation2, events, rng, log_level, round_damage):
+    """Reference engine: resolves every shot as an individual Python iteration."""
+    total_damage = [0, 0]
+    rounds = 0
+    record_shots = log_level == BATTLE_LOG_FULL
+    record_kills = log_level != BATTLE_LOG_NONE
+    target_indexes = (FleetTargetIndex(fleet1), FleetTargetIndex(fleet2))
+
+    # Battle loop - maximum rounds to prevent infinite battles
+    for round_num in range(1, MAX_BATTLE_ROUNDS + 1):
+        # Check if any fleet is completely destroyed
+        active = (
+            [ship for ship in fleet1 if ship.current_hp > 0],
+            [ship for ship in fleet2 if ship.current_hp > 0]
+        )
+
+        if not active[0] or not active[1]:
+            break
+
+        rounds = round_num
+
+        # Fleet1 attacks first, then the surviving ships of fleet2 strike back
+        for side, formation in enumerate((formation1, formation2)):
+            attackers = active[side]
+            enemies = active[1 - side]
+            target_index = target_indexes[1 - side]
+
+            for attacking_ship in attackers:
+                if not enemies:  # Check if enemy fleet still exists
+                    break
+
+                # Select target based on formation strategy
+                target_ship = select_target_by_formation(formation, enemies, rng, target_index)
+                if not target_ship:
+                    continue
+
+                # Target evasion already includes its formation modifier (DEFENSIVE impacts enemy evasion)
+                target_evasion = target_ship.evasion
+
+                # Each ship attacks based on its fire rate
+                for _ in range(attacking_ship.shots):
+                    if target_ship.current_hp <= 0:
+                        break
+
+                    # Evasion check
+                    if rng.random() < target_evasion:
+                        if record_shots:
+                            events.append((round_num, attacking_ship.index, target_ship.index, EVENT_EVADE, 0.0, target_ship.current_hp))
+                        continue
+
+                    # Calculate damage
+                    base_damage = attacking_ship.attack - (target_ship.shield * SHIELD_DAMAGE_REDUCTION)
+                    damage = base_damage * rng.uniform(*DAMAGE_VARIATION_RANGE)
+                    damage = max(1, damage)
+
+                    # Apply damage
+                    target_ship.current_hp -= damage
+                    total_damage[side] += damage
+
+                    destroyed = target_ship.current_hp <= 0
+                    if record_shots or (destroyed and record_kills):
+                        events.append((
+                            round_num, attacking_ship.index, target_ship.index,
+                            EVENT_KILL if destroyed else EVENT_HIT, damage, target_ship.current_hp
+                        ))
+
+                    # Remove destroyed ship from active list
+                    if destroyed:
+                        enemies.remove(target_ship)
+                        break
+
+                if formation == "DEFENSIVE":
+                    target_index.update(target_ship)
+
+            # Stop the round as soon as the defending fleet is destroyed
+            if not enemies:
+                break
+
+        round_damage.append((total_damage[0], total_damage[1]))
+
+    return total_damage[0], total_damage[1], rounds
+
+
+# --- NumPy Engine ---
+def _fleet_arrays(fleet: List[ShipCombatState]) -> dict:
+    """Hold fleet stats as NumPy arrays indexed by position in the fleet list."""
+    return {
+        'attack': np.array([ship.attack for ship in fleet], dtype=np.float64),
+        'shield': np.array([ship.shield for ship in fleet], dtype=np.float64),
+        # Evasion already includes the fleet's own formation modifier
+        'evasion': np.array([ship.evasion for ship in fleet], dtype=np.float64),
+        'fire_rate': np.array([ship.shots for ship in fleet], dtype=np.int64),
+        'current_hp': np.array([ship.current_hp for ship in fleet], dtype=np.float64),
+        # Offset of the fleet's first ship in the shared event ship index
+        'first_index': fleet[0].index
+    }
+
+
+def _resolve_combat_numpy(fleet1, fleet2, formation1, formation2, events, rng, log_level, round_damage):
+    """
+    Vectorized engine: the random draws of a whole turn are generated at once and
+    every volley (all shots of one ship at its target) is resolved as array
+    operations. Damage is accumulated with cumsum and the volley is cut at the
+    shot that destroys the target, which reproduces the per-shot rules of the
+    Python engine.
+    """
+    generator = np.random.default_rng(rng.getrandbits(64))
+    fleets = (_fleet_arrays(fleet1), _fleet_arrays(fleet2))
+    formations = (formation1, formation2)
+    total_damage = [0.0, 0.0]
+    rounds = 0
+    record_shots = log_level == BATTLE_LOG_FULL
+    record_kills = log_level != BATTLE_LOG_NONE
+    low, high = DAMAGE_VARIATION_RANGE
+
+    for round_num in range(1, MAX_BATTLE_ROUNDS + 1):
+        alive1 = np.flatnonzero(fleets[0]['current_hp'] > 0)
+        alive2 = np.flatnonzero(fleets[1]['current_hp'] > 0)
+
+        if alive1.size == 0 or alive2.size == 0:
+            break
+
+        rounds = round_num
+
+        for side in (0, 1):
+            attackers = fleets[side]
+            defenders = fleets[1 - side]
+            formation = formations[side]
+            hp = defenders['current_hp']
+
+            # Ships alive at the start of this side's turn, in fleet order
+            attacker_idx = np.flatnonzero(attackers['current_hp'] > 0)
+            enemies = np.flatnonzero(hp > 0).tolist()
+
+            # Draw every random number of the turn at once
+            shots = attackers['fire_rate'][attacker_idx]
+            offsets = np.concatenate(([0], np.cumsum(shots))).tolist()
+            rolls = generator.random(offsets[-1])
+            multipliers = generator.uniform(low, high, offsets[-1])
+            picks = generator.random(attacker_idx.size).tolist()
+
+            # DEFENSIVE and TACTICAL keep the same target until it is destroyed:
+            # only the target loses HP during a volley and attack never changes
+            target = None
+
+            for position, attacker in enumerate(attacker_idx.tolist()):
+                if not enemies:
+                    break
+
+                if formation == "DEFENSIVE":
+                    if target is None:
+                        target = enemies[int(np.argmin(hp[enemies]))]
+                elif formation == "TACTICAL":
+                    if target is None:
+                        target = enemies[int(np.argmax(defenders['attack'][enemies]))]
+                else:
+                    target = enemies[int(picks[position] * len(enemies))]
+
+                first, last = offsets[position], offsets[position + 1]
+                if last == first:
+                    continue
+
+                hits = rolls[first:last] >= defenders['evasion'][target]
+                base_damage = attackers['attack'][attacker] - defenders['shield'][target] * SHIELD_DAMAGE_REDUCTION
+                damage = np.maximum(1, base_damage * multipliers[first:last]) * hits
+                hp_after = hp[target] - np.cumsum(damage)
+
+                # Cut the volley at the shot that destroys the target
+                killing_shots = np.flatnonzero(hp_after <= 0)
+                fired = int(killing_shots[0]) + 1 if killing_shots.size else last - first
+
+                hp[target] = hp_after[fired - 1]
+                volley_damage = damage[:fired].tolist()
+                total_damage[side] += sum(volley_damage)
+
+                attacker_index = attackers['first_index'] + attacker
+                target_index = defenders['first_index'] + target
+                if record_shots:
+                    # Python ints, as the python engine stores (not numpy bools)
+                    kinds = np.where(hits[:fired], EVENT_HIT, EVENT_EVADE).tolist()
+                    if killing_shots.size:
+                        kinds[-1] = EVENT_KILL
+                    events.extend(
+                        (round_num, attacker_index, target_index, kind, shot_damage, shot_hp)
+                        for kind, shot_damage, shot_hp in zip(kinds, volley_damage, hp_after[:fired].tolist())
+                    )
+                elif record_kills and killing_shots.size:
+                    events.append((round_num, attacker_index, target_index, EVENT_KILL, volley_damage[-1], float(hp[target])))
+
+                if killing_shots.size:
+                    enemies.remove(target)
+                    target = None
+
+            if not enemies:
+                break
+
+        round_damage.append((total_damage[0], total_damage[1]))
+
+    # Write the final HP back to the combat states
+    for fleet, arrays in zip((fleet1, fleet2), fleets):
+        for ship, current_hp in zip(fleet, arrays['current_hp'].tolist()):
+            ship.current_hp = current_hp
+
+    return total_damage[0], total_damage[1], rounds
@@ -0,0 +1,188 @@
+"""
+In-process queue for asynchronous battle jobs.
+
+POST /battle/jobs enqueues a battle and returns a job id immediately instead of
+holding the client connection for the whole simulation and commit. A fixed set of
+BATTLE_JOB_WORKERS background threads execute the jobs, each with its own database
+session. Jobs are sharded by user id, so the battles of one user always run on the
+same worker and in submission order.
+
+Every worker has a bounded queue of BATTLE_JOB_QUEUE_SIZE jobs: when it is full,
+submit_battle_job raises queue.Full and the API answers 503, which gives bursty
+clients backpressure. Finished jobs are kept for polling (GET /battle/jobs/{id})
+until BATTLE_JOB_RETENTION newer jobs have finished.
+
+The workers are started on first use and stopped with the application.
+BATTLE_JOB_WORKERS=0 disables asynchronous battles: submit_battle_job raises
+BattleJobsDisabled and the API answers 503.
+"""
+
+import logging
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import Any, Callable, List, Optional
+from backend.app.config import BATTLE_JOB_WORKERS, BATTLE_JOB_QUEUE_SIZE, BATTLE_JOB_RETENTION
+from backend.app.database import create_session
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+# Sentinel telling a worker thread to exit
+_STOP = object()
+
+
+class BattleJobsDisabled(RuntimeError):
+    """Raised when a job is submitted while no worker is configured (BATTLE_JOB_WORKERS=0)."""
+
+
+@dataclass
+class BattleJob:
+    """
+    A battle waiting for, or executed by, a background worker.
+
+    function(db, *args) runs in the worker with its own session and returns
+    (result, message); a None result marks the job as failed with that message.
+    """
+    job_id: str
+    user_id: int
+    function: Callable
+    args: tuple
+    status: str = JOB_QUEUED
+    message: Optional[str] = None
+    result: Any = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+_queues: List[queue.Queue] = []
+_threads: List[threading.Thread] = []
+_jobs: "OrderedDict[str, BattleJob]" = OrderedDict()
+_lock = threading.Lock()
+_completed = 0
+_failed = 0
+
+
+def _start_workers() -> None:
+    """Start the worker threads on first use. Must be called with _lock held."""
+    if _threads:
+        return
+    for index in range(BATTLE_JOB_WORKERS):
+        jobs = queue.Queue(maxsize=BATTLE_JOB_QUEUE_SIZE)
+        thread = threading.Thread(target=_worker, args=(jobs,), name=f"battle-job-worker-{index}", daemon=True)
+        _queues.append(jobs)
+        _threads.append(thread)
+        thread.start()
+    logger.info(f"Battle job queue started with {BATTLE_JOB_WORKERS} workers")
+
+
+def _worker(jobs: queue.Queue) -> None:
+    """Execute the jobs of one shard in order until told to stop."""
+    while True:
+        job = jobs.get()
+        if job is _STOP:
+            return
+        _run_job(job)
+
+
+def _run_job(job: BattleJob) -> None:
+    global _completed, _failed
+    job.status = JOB_RUNNING
+    job.started_at = datetime.now(UTC)
+    db = create_session()
+    try:
+        result, message = job.function(db, *job.args)
+        job.result, job.message = result, message
+        status = JOB_COMPLETED if result is not None else JOB_FAILED
+    except Exception as e:
+        db.rollback()
+        logger.exception(f"Battle job {job.job_id} failed")
+        job.message = f"Battle failed: {str(e)}"
+        status = JOB_FAILED
+    finally:
+        db.close()
+
+    with _lock:
+        job.finished_at = datetime.now(UTC)
+        job.status = status
+        if status == JOB_COMPLETED:
+            _completed += 1
+        else:
+            _failed += 1
+        _discard_old_jobs()
+
+
+def _discard_old_jobs() -> None:
+    """Forget the oldest finished jobs beyond BATTLE_JOB_RETENTION. Must be called with _lock held."""
+    finished = [job_id for job_id, job in _jobs.items() if job.finished_at is not None]
+    for job_id in finished[:max(0, len(finished) - BATTLE_JOB_RETENTION)]:
+        del _jobs[job_id]
+
+
+def submit_battle_job(user_id: int, function: Callable, *args) -> BattleJob:
+    """
+    Enqueue function(db, *args) on the worker of user_id.
+
+    Returns:
+        The queued BattleJob
+
+    Raises:
+        BattleJobsDisabled: if BATTLE_JOB_WORKERS is 0
+        queue.Full: if the worker queue of this user is full
+    """
+    if BATTLE_JOB_WORKERS < 1:
+        raise BattleJobsDisabled("Asynchronous battles are disabled")
+    job = BattleJob(job_id=uuid.uuid4().hex, user_id=user_id, function=function, args=args)
+    with _lock:
+        _start_workers()
+        _queues[user_id % len(_queues)].put_nowait(job)
+        _jobs[job.job_id] = job
+    return job
+
+
+def get_battle_job(job_id: str) -> Optional[BattleJob]:
+    """Get a queued, running or recently finished job by id."""
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def get_battle_job_stats() -> dict:
+    """
+    Get battle job queue metrics for monitoring.
+
+    Returns:
+        Dict with configured workers, queue capacity, started flag, queue depth, running,
+        completed and failed jobs
+    """
+    with _lock:
+        return {
+            "workers": BATTLE_JOB_WORKERS,
+            "queue_size": BATTLE_JOB_QUEUE_SIZE,
+            "started": bool(_threads),
+            "queue_depth": sum(jobs.qsize() for jobs in _queues),
+            "running": sum(1 for job in _jobs.values() if job.status == JOB_RUNNING),
+            "completed": _completed,
+            "failed": _failed
+        }
+
+
+def shutdown_battle_jobs() -> None:
+    """Stop the workers after the jobs already queued have finished."""
+    with _lock:
+        queues, threads = list(_queues), list(_threads)
+        _queues.clear()
+        _threads.clear()
+    for jobs in queues:
+        jobs.put(_STOP)
+    for thread in threads:
+        thread.join()
+    if threads:
+        logger.info("Battle job queue shut down")
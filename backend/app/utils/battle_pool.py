@@ -0,0 +1,126 @@
+"""
+Process pool for CPU-bound battle simulation.
+
+Battles are pure Python computation, so large fleet battles resolved inside the
+sync request handlers hold the GIL and slow down every other endpoint. When
+BATTLE_PROCESS_POOL_SIZE is set, battles with at least BATTLE_PROCESS_POOL_MIN_SHIPS
+ships are simulated in a ProcessPoolExecutor instead. Only the simulation moves:
+plain CombatShip snapshots go in, a BattleResult comes out, while loading and
+persistence stay in the request process.
+
+The pool is created on first use and shut down with the application. Its queue
+depth (battles submitted and not finished yet) is exposed through get_battle_pool_stats.
+"""
+
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+from backend.app.config import BATTLE_PROCESS_POOL_SIZE, BATTLE_PROCESS_POOL_MIN_SHIPS
+from backend.app.utils.battle_engine import BattleResult, CombatShip, simulate_battle
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_pending = 0
+_completed = 0
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Create the process pool on first use."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=BATTLE_PROCESS_POOL_SIZE)
+            logger.info(f"Battle process pool started with {BATTLE_PROCESS_POOL_SIZE} workers")
+        return _executor
+
+
+def run_battle_simulation(
+    fleet_a: Sequence[CombatShip],
+    fleet_b: Sequence[CombatShip],
+    *args,
+    **kwargs
+) -> BattleResult:
+    """
+    Run battle_engine.simulate_battle, in the process pool when it is enabled and
+    the battle is large enough, otherwise in the calling thread.
+
+    Takes the same arguments as simulate_battle; the rng must be picklable
+    (random.Random is). Blocks until the result is available.
+    """
+    if BATTLE_PROCESS_POOL_SIZE <= 0 or len(fleet_a) + len(fleet_b) < BATTLE_PROCESS_POOL_MIN_SHIPS:
+        return simulate_battle(fleet_a, fleet_b, *args, **kwargs)
+
+    global _pending, _completed
+    executor = _get_executor()
+    with _lock:
+        _pending += 1
+    try:
+        return executor.submit(simulate_battle, list(fleet_a), list(fleet_b), *args, **kwargs).result()
+    finally:
+        with _lock:
+            _pending -= 1
+            _completed += 1
+
+
+def run_battle_simulations(battles: Sequence[Tuple[Sequence[CombatShip], Sequence[CombatShip], dict]]) -> List[BattleResult]:
+    """
+    Run several independent battles, all submitted to the process pool at once when it
+    is enabled and the battles are large enough, so they are simulated in parallel.
+
+    Args:
+        battles: (fleet_a, fleet_b, kwargs) per battle, kwargs being the other
+                 simulate_battle arguments (formations, rng, engine, names, log_level)
+
+    Returns:
+        The BattleResult of every battle, in input order
+    """
+    if BATTLE_PROCESS_POOL_SIZE <= 0 or not battles or any(
+        len(fleet_a) + len(fleet_b) < BATTLE_PROCESS_POOL_MIN_SHIPS for fleet_a, fleet_b, _ in battles
+    ):
+        return [simulate_battle(fleet_a, fleet_b, **kwargs) for fleet_a, fleet_b, kwargs in battles]
+
+    global _pending, _completed
+    executor = _get_executor()
+    with _lock:
+        _pending += len(battles)
+    try:
+        futures = [
+            executor.submit(simulate_battle, list(fleet_a), list(fleet_b), **kwargs)
+            for fleet_a, fleet_b, kwargs in battles
+        ]
+        return [future.result() for future in futures]
+    finally:
+        with _lock:
+            _pending -= len(battles)
+            _completed += len(battles)
+
+
+def get_battle_pool_stats() -> dict:
+    """
+    Get process pool metrics for monitoring.
+
+    Returns:
+        Dict with enabled flag, configured workers, min ships, queue depth and completed battles
+    """
+    with _lock:
+        return {
+            "enabled": BATTLE_PROCESS_POOL_SIZE > 0,
+            "workers": BATTLE_PROCESS_POOL_SIZE,
+            "min_ships": BATTLE_PROCESS_POOL_MIN_SHIPS,
+            "started": _executor is not None,
+            "queue_depth": _pending,
+            "completed": _completed
+        }
+
+
+def shutdown_battle_pool() -> None:
+    """Shut down the process pool, waiting for running battles to finish."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+        logger.info("Battle process pool shut down")
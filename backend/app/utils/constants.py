@@ -26,6 +26,33 @@ FORMATION_MODIFIERS = {
 SHIELD_DAMAGE_REDUCTION = 0.5
 DAMAGE_VARIATION_RANGE = (0.85, 1.15)
 
+# Maximum number of rounds per battle (prevents infinite battles)
+MAX_BATTLE_ROUNDS = 20
+
+# Maximum number of battles per batch request
+MAX_BATCH_BATTLES = 50
+
+# Retries of a battle that lost an optimistic concurrency check to a concurrent battle
+BATTLE_CONFLICT_RETRIES = 3
+BATTLE_CONFLICT_BACKOFF_SECONDS = 0.05  # Upper bound of the randomized wait, grows per retry
+
+# Maximum number of ships per side in an armada (mass-fleet) battle
+ARMADA_MAX_SHIPS_PER_SIDE = 500
+
+# Maximum number of players in a server-side tournament
+TOURNAMENT_MAX_PLAYERS = 128
+# Seconds a user has to wait after starting a tournament before starting another one
+TOURNAMENT_COOLDOWN_SECONDS = 300
+
+# Matchmaking: maximum opponents per request, candidates read from the Elo index per side
+# (as a multiple of the requested opponents) and Elo points one level of difference weighs
+MATCHMAKING_MAX_OPPONENTS = 50
+MATCHMAKING_CANDIDATE_FACTOR = 4
+MATCHMAKING_LEVEL_WEIGHT = 25
+
+# Maximum leaderboard entries per page
+LEADERBOARD_MAX_PAGE_SIZE = 100
+
 # Credits awarded multiplier
 CREDITS_AWARDED_MULTIPLIER = 0.1
 
@@ -38,3 +65,5 @@ SELL_VALUE_MULTIPLIER = 0.4
 # Elo calculation constants
 ELO_BASE_CHANGE = 32  # Base change in Elo rating per match
 ELO_EXPECTED_SCORE_DIVISOR = 400  # Divisor for expected score calculation
+ELO_INITIAL_RATING = 1000  # Rating of new users (seeded users start from their base data rating)
+ELO_RECOMPUTE_CHUNK_SIZE = 10000  # Battles streamed per chunk when recomputing the ladder
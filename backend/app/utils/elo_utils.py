@@ -0,0 +1,66 @@
+"""
+Array-based Elo bookkeeping for recomputing the ladder from battle history.
+
+Ratings live in one float64 NumPy array indexed by a dense player index. A chunk
+of battles (winner and loser indexes in battle order) is split into waves: a
+battle goes into the wave after the last earlier battle of the same chunk that
+involves either of its players. Battles of one wave share no player, so a whole
+wave is updated with a few vectorized operations while every player still sees
+their battles in their original order, exactly as if the chunk was replayed one
+battle at a time with calculate_elo_change.
+"""
+
+from typing import Sequence
+import numpy as np
+
+
+def schedule_elo_waves(winners: Sequence[int], losers: Sequence[int]) -> np.ndarray:
+    """
+    Assign every battle of a chunk to the first wave after the previous battles of its players.
+
+    Args:
+        winners, losers: Player indexes of each battle, in battle order
+
+    Returns:
+        Wave number of each battle (int array)
+    """
+    next_wave = {}
+    waves = np.empty(len(winners), dtype=np.int64)
+    for battle, (winner, loser) in enumerate(zip(winners, losers)):
+        wave = max(next_wave.get(winner, 0), next_wave.get(loser, 0))
+        waves[battle] = wave
+        next_wave[winner] = next_wave[loser] = wave + 1
+    return waves
+
+
+def apply_elo_chunk(
+    ratings: np.ndarray,
+    winners: np.ndarray,
+    losers: np.ndarray,
+    base_change: float,
+    divisor: float
+) -> None:
+    """
+    Apply a chunk of battle results to ratings in place, in battle order per player.
+
+    Uses the calculate_elo_change formula with the given K factor (base_change)
+    and expected score divisor.
+
+    Args:
+        ratings: Ratings by player index (float64 array, updated in place)
+        winners, losers: Player indexes of each battle, in battle order (int arrays)
+        base_change: Maximum rating change per battle (ELO_BASE_CHANGE)
+        divisor: Rating difference for 10x expected odds (ELO_EXPECTED_SCORE_DIVISOR)
+    """
+    if len(winners) == 0:
+        return
+    waves = schedule_elo_waves(winners.tolist(), losers.tolist())
+    order = np.argsort(waves, kind="stable")
+    bounds = np.flatnonzero(np.diff(waves[order])) + 1
+    for wave in np.split(order, bounds):
+        wave_winners, wave_losers = winners[wave], losers[wave]
+        winner_elo, loser_elo = ratings[wave_winners], ratings[wave_losers]
+        expected_winner_score = 1 / (1 + 10 ** ((loser_elo - winner_elo) / divisor))
+        expected_loser_score = 1 / (1 + 10 ** ((winner_elo - loser_elo) / divisor))
+        ratings[wave_winners] = winner_elo + base_change * (1 - expected_winner_score)
+        ratings[wave_losers] = loser_elo + base_change * (0 - expected_loser_score)
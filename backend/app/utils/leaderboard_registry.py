@@ -0,0 +1,268 @@
+"""
+Process-wide in-memory leaderboards.
+
+Ranking users naively means an ORDER BY over the whole users table for every page
+and a COUNT for every "what is my rank". Instead, each leaderboard keeps the
+(score, user id) keys of every user in an order-statistic list (SortedRankList),
+loaded with one query and then updated incrementally: a session listener collects
+the users created, updated or deleted by every flush and applies their new scores
+once the transaction commits. Battles, tournaments, progression and registration
+therefore keep the boards current without any explicit call, and rolled back
+transactions never reach them.
+
+Pages are served by position (O(log n) to find the first entry) and the rank of a
+user is found with two bisections (O(log n)). Leaderboards are reloaded after
+LEADERBOARD_REFRESH_SECONDS, which bounds the drift caused by writes that bypass
+the ORM (bulk UPDATEs) or happen in other worker processes, or right away with
+invalidate_leaderboards.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from database.models import User
+from backend.app.config import LEADERBOARD_REFRESH_SECONDS
+
+# Leaderboard categories and the User column each one ranks by (highest first)
+LEADERBOARD_CATEGORIES = {
+    "elo": "elo_rank",
+    "victories": "victories",
+    "level": "level",
+    "damage": "damage_dealt"
+}
+
+
+class SortedRankList:
+    """
+    Sorted list of keys with O(log n) position lookups.
+
+    Keys are kept in blocks of at most 2 * load sorted keys; a Fenwick tree over the
+    block sizes gives the number of keys before any block in O(log blocks). Adding or
+    removing a key costs a bisection plus an insertion into one block.
+    """
+
+    def __init__(self, keys=(), load: int = 1000):
+        keys = sorted(keys)
+        self._load = load
+        self._blocks = [keys[start:start + load] for start in range(0, len(keys), load)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(keys)
+        self._rebuild_tree()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _rebuild_tree(self) -> None:
+        """Rebuild the Fenwick tree of block sizes (after a block is split or dropped)."""
+        tree = [0] * (len(self._blocks) + 1)
+        for position, block in enumerate(self._blocks, start=1):
+            tree[position] += len(block)
+            parent = position + (position & -position)
+            if parent < len(tree):
+                tree[parent] += tree[position]
+        self._tree = tree
+
+    def _add_to_tree(self, block: int, delta: int) -> None:
+        position = block + 1
+        while position < len(self._tree):
+            self._tree[position] += delta
+            position += position & -position
+
+    def _keys_before(self, block: int) -> int:
+        """Number of keys in the blocks before block."""
+        total = 0
+        while block > 0:
+            total += self._tree[block]
+            block -= block & -block
+        return total
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        """Block and offset of the key at position index (Fenwick tree descent)."""
+        block = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            if block + step < len(self._tree) and self._tree[block + step] <= index:
+                block += step
+                index -= self._tree[block]
+            step >>= 1
+        return block, index
+
+    def add(self, key) -> None:
+        """Insert a key."""
+        self._len += 1
+        if not self._blocks:
+            self._blocks, self._maxes = [[key]], [key]
+            self._rebuild_tree()
+            return
+        block = min(bisect_left(self._maxes, key), len(self._blocks) - 1)
+        keys = self._blocks[block]
+        insort(keys, key)
+        self._maxes[block] = keys[-1]
+        if len(keys) > 2 * self._load:
+            self._blocks.insert(block + 1, keys[self._load:])
+            del keys[self._load:]
+            self._maxes[block] = keys[-1]
+            self._maxes.insert(block + 1, self._blocks[block + 1][-1])
+            self._rebuild_tree()
+        else:
+            self._add_to_tree(block, 1)
+
+    def remove(self, key) -> None:
+        """Remove a key that is in the list."""
+        block = bisect_left(self._maxes, key)
+        keys = self._blocks[block]
+        del keys[bisect_left(keys, key)]
+        self._len -= 1
+        if keys:
+            self._maxes[block] = keys[-1]
+            self._add_to_tree(block, -1)
+        else:
+            del self._blocks[block]
+            del self._maxes[block]
+            self._rebuild_tree()
+
+    def index(self, key) -> int:
+        """Position of a key that is in the list."""
+        block = bisect_left(self._maxes, key)
+        return self._keys_before(block) + bisect_left(self._blocks[block], key)
+
+    def slice(self, start: int, stop: int) -> list:
+        """Keys from position start (included) to stop (excluded)."""
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+        block, offset = self._locate(start)
+        keys = []
+        while len(keys) < stop - start:
+            keys.extend(self._blocks[block][offset:offset + stop - start - len(keys)])
+            block, offset = block + 1, 0
+        return keys
+
+
+class Leaderboard:
+    """
+    Thread-safe ranking of every user by one User column, highest score first
+    (ties by user id). Ranks start at 1.
+    """
+
+    def __init__(self, category: str, column: str):
+        self.category = category
+        self.column = column
+        self._scores: Dict[int, float] = {}
+        self._ranking = SortedRankList()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        """Load the scores of every user in a single query and rebuild the ranking."""
+        scores = dict(db.execute(select(User.user_id, getattr(User, self.column))).all())
+        ranking = SortedRankList((-score, user_id) for user_id, score in scores.items())
+        with self._lock:
+            self._scores, self._ranking = scores, ranking
+            self._loaded_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        """Whether the leaderboard has to be (re)loaded before use."""
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at >= LEADERBOARD_REFRESH_SECONDS
+
+    def invalidate(self) -> None:
+        """Drop the ranking; the next lookup reloads it."""
+        with self._lock:
+            self._loaded_at = None
+
+    def update(self, user_id: int, score: Optional[float]) -> None:
+        """Set the score of a user, or remove the user when score is None."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            previous = self._scores.pop(user_id, None)
+            if previous is not None:
+                self._ranking.remove((-previous, user_id))
+            if score is not None:
+                self._scores[user_id] = score
+                self._ranking.add((-score, user_id))
+
+    def page(self, offset: int, limit: int) -> Tuple[List[Tuple[int, int, float]], int]:
+        """
+        Get a page of the ranking.
+
+        Returns:
+            Tuple of ((rank, user_id, score) entries, total users)
+        """
+        with self._lock:
+            keys = self._ranking.slice(offset, offset + limit)
+            total = len(self._ranking)
+        return [(offset + position + 1, user_id, -score) for position, (score, user_id) in enumerate(keys)], total
+
+    def rank_of(self, user_id: int) -> Optional[Tuple[int, float, int]]:
+        """
+        Get the rank of a user.
+
+        Returns:
+            Tuple of (rank, score, total users), or None if the user is not ranked
+        """
+        with self._lock:
+            score = self._scores.get(user_id)
+            if score is None:
+                return None
+            return self._ranking.index((-score, user_id)) + 1, score, len(self._ranking)
+
+
+# Leaderboards shared by the whole process
+leaderboards = {category: Leaderboard(category, column) for category, column in LEADERBOARD_CATEGORIES.items()}
+
+
+def get_leaderboard(category: str, db: Session) -> Leaderboard:
+    """Get the leaderboard of a category, (re)loading it with db if it is stale."""
+    leaderboard = leaderboards[category]
+    if leaderboard.is_stale():
+        leaderboard.load(db)
+    return leaderboard
+
+
+def invalidate_leaderboards() -> None:
+    """Force every leaderboard to reload on its next lookup (e.g. after bulk rating updates)."""
+    for leaderboard in leaderboards.values():
+        leaderboard.invalidate()
+
+
+# --- Incremental updates from committed sessions ---
+_PENDING_KEY = "leaderboard_updates"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_scores(session: Session, flush_context) -> None:
+    """Remember the scores of the users written by a flush until the transaction ends."""
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for instance in session.new | session.dirty:
+        if isinstance(instance, User):
+            values = inspect(instance).dict
+            pending[instance.user_id] = {column: values.get(column) for column in set(LEADERBOARD_CATEGORIES.values())}
+    for instance in session.deleted:
+        if isinstance(instance, User):
+            pending[instance.user_id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_user_scores(session: Session) -> None:
+    """Apply the scores collected during a committed transaction to the loaded leaderboards."""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for leaderboard in leaderboards.values():
+        for user_id, values in pending.items():
+            score = None if values is None else values[leaderboard.column]
+            if values is not None and score is None:
+                # Score not loaded on the instance: fall back to a reload
+                leaderboard.invalidate()
+                break
+            leaderboard.update(user_id, score)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_user_scores(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
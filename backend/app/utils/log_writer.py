@@ -0,0 +1,213 @@
+"""
+Buffered, bulk-inserting writer for SystemLogs records.
+
+Writing an audit log used to cost every request an extra INSERT and commit.
+log_event now hands its record to submit_log_record, which only appends it to
+an in-process queue of at most LOG_BUFFER_SIZE records. A background flusher
+thread, with its own database session, inserts the queued records in batches
+of up to LOG_BATCH_SIZE rows, at the latest LOG_FLUSH_INTERVAL_SECONDS after
+the first record of a batch was queued.
+
+When the buffer is full the LOG_BUFFER_POLICY applies: "drop" discards the
+new record immediately, "block" waits up to LOG_BUFFER_BLOCK_SECONDS for room
+before discarding it. Records keep the time they were logged at, not the
+time they were inserted. A batch the database rejects (e.g. a record with an
+unknown user id) is retried record by record so only the faulty records are
+lost. Dropped, flushed and failed records are counted (get_log_writer_stats).
+
+The flusher is started on first use; shutdown_log_writer writes every queued
+record before the application exits, and flush_logs does so on demand.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Optional
+from sqlalchemy import insert
+from database.models import SystemLogs
+from backend.app.config import LOG_BUFFER_SIZE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL_SECONDS
+from backend.app.config import LOG_BUFFER_POLICY, LOG_BUFFER_BLOCK_SECONDS
+from backend.app.database import create_session
+
+logger = logging.getLogger(__name__)
+
+LOG_POLICY_DROP = "drop"
+LOG_POLICY_BLOCK = "block"
+
+# Sentinel telling the flusher to write everything queued and exit
+_STOP = object()
+
+
+class _FlushRequest:
+    """Queue marker: set once every record queued before it has been written."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_records: "queue.Queue" = queue.Queue(maxsize=max(LOG_BUFFER_SIZE, 1))
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+_stats = {"queued": 0, "dropped": 0, "flushed": 0, "failed": 0, "batches": 0}
+_last_batch_ms = 0.0
+
+
+def _count(counter: str, amount: int = 1) -> None:
+    with _lock:
+        _stats[counter] += amount
+
+
+def _start_flusher() -> None:
+    """Start the flusher thread on first use."""
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_flusher, name="log-writer", daemon=True)
+            _thread.start()
+
+
+def submit_log_record(record: dict) -> bool:
+    """
+    Queue a SystemLogs record (dict of column values) for the flusher.
+
+    Returns:
+        True if the record was queued, False if it was dropped because the buffer is full
+    """
+    _start_flusher()
+    try:
+        if LOG_BUFFER_POLICY == LOG_POLICY_BLOCK:
+            _records.put(record, timeout=LOG_BUFFER_BLOCK_SECONDS)
+        else:
+            _records.put_nowait(record)
+    except queue.Full:
+        _count("dropped")
+        return False
+    _count("queued")
+    return True
+
+
+def _flusher() -> None:
+    """Collect queued records into batches and write them until told to stop."""
+    while True:
+        item = _records.get()
+        batch = []
+        markers = []
+        deadline = time.monotonic() + LOG_FLUSH_INTERVAL_SECONDS
+        # Fill the batch until it is full, the interval is over or a marker asks for a write
+        while True:
+            if item is _STOP or isinstance(item, _FlushRequest):
+                markers.append(item)
+                break
+            batch.append(item)
+            if len(batch) >= LOG_BATCH_SIZE:
+                break
+            try:
+                item = _records.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+
+        if batch:
+            _write_batch(batch)
+        for marker in markers:
+            if marker is _STOP:
+                _drain()
+                return
+            marker.done.set()
+
+
+def _drain() -> None:
+    """Write every record still queued (at shutdown)."""
+    batch = []
+    while True:
+        try:
+            item = _records.get_nowait()
+        except queue.Empty:
+            break
+        if isinstance(item, _FlushRequest):
+            item.done.set()
+        elif item is not _STOP:
+            batch.append(item)
+        if len(batch) >= LOG_BATCH_SIZE:
+            _write_batch(batch)
+            batch = []
+    if batch:
+        _write_batch(batch)
+
+
+def _write_batch(batch: list) -> None:
+    """Insert a batch of records in one statement; on failure, retry them one by one."""
+    global _last_batch_ms
+    started = time.perf_counter()
+    db = create_session()
+    try:
+        try:
+            db.execute(insert(SystemLogs), batch)
+            db.commit()
+            flushed = len(batch)
+        except Exception:
+            db.rollback()
+            logger.exception(f"Bulk insert of {len(batch)} log records failed, retrying them one by one")
+            flushed = 0
+            for record in batch:
+                try:
+                    db.execute(insert(SystemLogs), [record])
+                    db.commit()
+                    flushed += 1
+                except Exception:
+                    db.rollback()
+    finally:
+        db.close()
+    with _lock:
+        _stats["flushed"] += flushed
+        _stats["failed"] += len(batch) - flushed
+        _stats["batches"] += 1
+        _last_batch_ms = (time.perf_counter() - started) * 1000
+
+
+def flush_logs(timeout: float = None) -> bool:
+    """
+    Wait until every record queued so far has been written.
+
+    Returns:
+        True if the records were written within timeout (seconds, None waits indefinitely)
+    """
+    with _lock:
+        if _thread is None:
+            return True
+    request = _FlushRequest()
+    _records.put(request)
+    return request.done.wait(timeout)
+
+
+def get_log_writer_stats() -> dict:
+    """
+    Get log writer metrics for monitoring.
+
+    Returns:
+        Dict with the buffer settings, started flag, queue depth and the queued,
+        dropped, flushed and failed record and batch counters
+    """
+    with _lock:
+        return {
+            "enabled": LOG_BUFFER_SIZE > 0,
+            "buffer_size": LOG_BUFFER_SIZE,
+            "batch_size": LOG_BATCH_SIZE,
+            "policy": LOG_BUFFER_POLICY,
+            "started": _thread is not None,
+            "queue_depth": _records.qsize(),
+            **_stats,
+            "last_batch_ms": round(_last_batch_ms, 3)
+        }
+
+
+def shutdown_log_writer() -> None:
+    """Write every queued record and stop the flusher."""
+    global _thread
+    with _lock:
+        thread, _thread = _thread, None
+    if thread is None:
+        return
+    _records.put(_STOP)
+    thread.join()
+    logger.info("Log writer shut down")
@@ -1,16 +1,22 @@
 """
 Utility functions for logging system events and user actions.
 Provides convenient methods to log different types of events to the SystemLogs table.
+
+Records are written in batches by the background log writer (see log_writer),
+so logging adds no database round trip to the request.
 """
 
 from sqlalchemy.orm import Session
-from database import SystemLogs
+from starlette.concurrency import run_in_threadpool
+from database import SystemLogs, utc_now
 from datetime import datetime, UTC
 import json
 from typing import Optional, Dict, Any
 from enum import Enum
 from backend.app.crud.log_crud import create_log
 from backend.app.schemas.log_schemas import SystemLogCreate
+from backend.app.utils.log_writer import submit_log_record
+from backend.app.config import LOG_BUFFER_SIZE
 
 class LogLevel(Enum):
     DEBUG = "DEBUG"
@@ -41,6 +47,8 @@ class GameAction(Enum):
     # Battle actions
     BATTLE_START = "BATTLE_START"
     BATTLE_END = "BATTLE_END"
+    BATTLE_BATCH = "BATTLE_BATCH"
+    TOURNAMENT = "TOURNAMENT"
     
     # Currency actions
     CURRENCY_EARNED = "CURRENCY_EARNED"
@@ -70,12 +78,16 @@ def log_event(
     new_value: Optional[Dict[str, Any]] = None,
     error_message: Optional[str] = None,
     execution_time_ms: Optional[int] = None
-) -> SystemLogs:
+) -> Optional[SystemLogs]:
     """
-    Create a new log entry in the SystemLogs table using the CRUD layer.
+    Create a new log entry in the SystemLogs table.
+    
+    The record is queued for the background log writer and inserted with the
+    next batch; with LOG_BUFFER_SIZE = 0 it is written right away with db
+    using the CRUD layer.
     
     Args:
-        db: Database session
+        db: Database session (only used when the log buffer is disabled)
         level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         category: Log category (USER_ACTION, SYSTEM, GAME_EVENT, etc.)
         action: Specific action performed
@@ -91,7 +103,7 @@ def log_event(
         execution_time_ms: Execution time in milliseconds
     
     Returns:
-        The created SystemLogs entry
+        The created SystemLogs entry, or None when the record was queued
     """
     log_data = SystemLogCreate(
         log_level=level.value,
@@ -108,7 +120,11 @@ def log_event(
         error_message=error_message,
         execution_time_ms=execution_time_ms
     )
-    return create_log(db, log_data)
+    if LOG_BUFFER_SIZE <= 0:
+        return create_log(db, log_data)
+    # Keep the time the event happened, not the time its batch is inserted
+    submit_log_record({**log_data.model_dump(), "timestamp": utc_now()})
+    return None
 
 # Convenience functions for common log types
 
@@ -120,7 +136,7 @@ def log_user_action(
     ip_address: Optional[str] = None,
     session_id: Optional[str] = None,
     execution_time_ms: Optional[int] = None
-) -> SystemLogs:
+) -> Optional[SystemLogs]:
     """Log a user action."""
     return log_event(
         db=db,
@@ -142,7 +158,7 @@ def log_game_event(
     resource_affected: Optional[str] = None,
     old_value: Optional[Dict[str, Any]] = None,
     new_value: Optional[Dict[str, Any]] = None
-) -> SystemLogs:
+) -> Optional[SystemLogs]:
     """Log a game event."""
     return log_event(
         db=db,
@@ -162,7 +178,7 @@ def log_error(
     error_message: str,
     user_id: Optional[int] = None,
     details: Optional[Dict[str, Any]] = None
-) -> SystemLogs:
+) -> Optional[SystemLogs]:
     """Log an error event."""
     return log_event(
         db=db,
@@ -180,7 +196,7 @@ def log_security_event(
     user_id: Optional[int] = None,
     ip_address: Optional[str] = None,
     details: Optional[Dict[str, Any]] = None
-) -> SystemLogs:
+) -> Optional[SystemLogs]:
     """Log a security-related event."""
     return log_event(
         db=db,
@@ -192,12 +208,31 @@ def log_security_event(
         details=details
     )
 
+async def log_from_async(log_function, **kwargs) -> None:
+    """
+    Call a log_* function from async code (e.g. log_from_async(log_error, action=..., ...)).
+    
+    The call runs in the threadpool with a session of its own, so async routes
+    never block the event loop, whether the record is inserted right away (log
+    buffer disabled) or waits for room in a full buffer ("block" policy).
+    """
+    from backend.app.database import create_session
+    
+    def write_log():
+        db = create_session()
+        try:
+            log_function(db=db, **kwargs)
+        finally:
+            db.close()
+    
+    await run_in_threadpool(write_log)
+
 def log_performance_issue(
     db: Session,
     action: GameAction,
     execution_time_ms: int,
     details: Optional[Dict[str, Any]] = None
-) -> SystemLogs:
+) -> Optional[SystemLogs]:
     """Log a performance issue."""
     return log_event(
         db=db,
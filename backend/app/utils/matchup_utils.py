@@ -0,0 +1,63 @@
+"""
+Matchup counters collected from battle outcomes.
+
+Battles add their outcome to an in-memory matchups dict (see new_matchups) while
+they are resolved; the battle persistence path then writes the whole dict with
+one upsert per table (see matchup_crud.record_matchup_stats), so a batch or a
+tournament costs a handful of statements however many battles it played.
+"""
+
+from collections import Counter
+from typing import Dict, Sequence, Tuple
+
+# Counter columns of FormationMatchupStats and ShipMatchupStats, in this order
+MATCHUP_COUNTERS = ("battles", "wins", "ships", "ships_survived", "damage_dealt", "damage_taken")
+
+MATCHUP_FORMATION = "formation"
+MATCHUP_SHIP = "ship"
+
+
+def new_matchups() -> Dict[str, dict]:
+    """Empty matchups dict: matchup kind -> (subject, opponent) -> counters list."""
+    return {MATCHUP_FORMATION: {}, MATCHUP_SHIP: {}}
+
+
+def _add(counters: dict, key: tuple, values: Tuple) -> None:
+    current = counters.get(key)
+    counters[key] = list(values) if current is None else [total + value for total, value in zip(current, values)]
+
+
+def collect_battle_matchups(
+    matchups: Dict[str, dict],
+    formations: Sequence[str],
+    ship_ids: Sequence[Sequence[int]],
+    final_hp: Sequence[Sequence[float]],
+    total_damage: Sequence[float],
+    winner: int
+) -> None:
+    """
+    Add the outcome of one battle to matchups, from the point of view of each side.
+
+    Args:
+        matchups: Matchups dict from new_matchups (updated in place)
+        formations: Formation of each side
+        ship_ids: Ship template id of every ship of each side, in fleet order
+        final_hp: Remaining HP of every ship of each side (<= 0 means destroyed)
+        total_damage: Damage dealt by each side
+        winner: Index of the winning side (0 or 1)
+    """
+    for side, other in ((0, 1), (1, 0)):
+        won = int(winner == side)
+        size = len(ship_ids[side])
+        survived = Counter(ship_id for ship_id, hp in zip(ship_ids[side], final_hp[side]) if hp > 0)
+        _add(matchups[MATCHUP_FORMATION], (formations[side], formations[other]), (
+            1, won, size, sum(survived.values()), total_damage[side], total_damage[other]
+        ))
+        opponents = set(ship_ids[other])
+        for ship_id, count in Counter(ship_ids[side]).items():
+            # The damage of a fleet is shared equally between its ships
+            share = count / size
+            for opponent_ship_id in opponents:
+                _add(matchups[MATCHUP_SHIP], (ship_id, opponent_ship_id), (
+                    1, won, count, survived[ship_id], total_damage[side] * share, total_damage[other] * share
+                ))
@@ -2,9 +2,10 @@
 Utilities for user experience, level, and rank progression,
 and for applying rank bonuses to ships during battles.
 """
-from database.models import UserRank, RankBonus
+from database.models import UserRank
 from sqlalchemy.orm import Session
 from backend.app.utils.constants import BASE_XP, GROWTH_FACTOR
+from backend.app.utils.rank_bonus_registry import rank_bonus_registry
 
 def get_level_for_experience(experience: int) -> int:
     """
@@ -72,14 +73,24 @@ def check_rank_promotion(user, db: Session) -> UserRank:
     new_rank = get_rank_for_level(user.level)
     return new_rank
 
-def apply_rank_bonus_to_ship_stats(user, ship_stats: dict, db: Session) -> dict:
+def get_rank_bonuses(db: Session) -> dict:
+    """
+    Returns every rank bonus keyed by UserRank, from the process-wide rank bonus registry.
+    """
+    return rank_bonus_registry.all(db)
+
+def apply_rank_bonus_to_ship_stats(user, ship_stats: dict, db: Session, rank_bonuses: dict = None) -> dict:
     """
     Applies the user's rank bonus to all ship battle stats (does not modify DB).
     ship_stats: dict with keys 'attack', 'shield', 'hp', 'evasion', 'fire_rate', 'value', etc.
     db: SQLAlchemy Session for DB access.
+    rank_bonuses: optional dict from get_rank_bonuses; the rank bonus registry is used otherwise.
     Returns a new dict with bonuses applied. If a bonus is not defined for a stat, it is not changed.
     """
-    bonus_obj = db.query(RankBonus).filter_by(rank=user.rank).first()
+    if rank_bonuses is not None:
+        bonus_obj = rank_bonuses.get(user.rank)
+    else:
+        bonus_obj = rank_bonus_registry.get(user.rank, db)
     stats = ship_stats.copy()
     if bonus_obj:
         for key in ['attack', 'shield', 'hp', 'evasion', 'fire_rate', 'value']:
@@ -104,7 +115,7 @@ def get_max_active_ships_for_user(user, db: Session) -> int:
     Returns:
         Maximum number of active ships allowed for this user's rank
     """
-    bonus_obj = db.query(RankBonus).filter_by(rank=user.rank).first()
+    bonus_obj = rank_bonus_registry.get(user.rank, db)
     if bonus_obj:
         return bonus_obj.max_active_ships
     # Default fallback if rank bonus not found
@@ -0,0 +1,95 @@
+"""
+Process-wide registry of rank bonuses.
+
+The RankBonus table holds one small, almost static row per UserRank, but battles,
+ship activation and the work system read it on nearly every request. The registry
+loads the whole table in one query, keeps it keyed by UserRank and reloads it
+after RANK_BONUS_CACHE_TTL_SECONDS or when invalidate_rank_bonuses is called
+(e.g. after rank bonuses are edited).
+
+Cached entries are plain copies of the rows, so they can be shared between
+sessions and threads without being bound to the session that loaded them.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import RankBonus, UserRank
+from backend.app.config import RANK_BONUS_CACHE_TTL_SECONDS
+
+
+class RankBonusRegistry:
+    """
+    Thread-safe in-memory cache of RankBonus rows keyed by UserRank.
+    """
+
+    def __init__(self, ttl_seconds: int = RANK_BONUS_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._bonuses: Dict[UserRank, SimpleNamespace] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> Dict[UserRank, SimpleNamespace]:
+        """
+        Load every RankBonus row in a single query and replace the cached entries.
+
+        Returns:
+            Dict of rank bonus entries keyed by UserRank
+        """
+        columns = [column.key for column in RankBonus.__table__.columns]
+        bonuses = {
+            row.rank: SimpleNamespace(**{column: getattr(row, column) for column in columns})
+            for row in db.query(RankBonus).all()
+        }
+        with self._lock:
+            self._bonuses = bonuses
+            # An empty table (not seeded yet) is not cached
+            self._loaded_at = time.monotonic() if bonuses else None
+        return bonuses
+
+    def is_stale(self) -> bool:
+        """Whether the registry has to be (re)loaded before use."""
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at >= self.ttl_seconds
+
+    def all(self, db: Session) -> Dict[UserRank, SimpleNamespace]:
+        """Get all rank bonus entries, reloading them with db if the cache is stale."""
+        if self.is_stale():
+            return self.load(db)
+        return self._bonuses
+
+    def get(self, rank: UserRank, db: Session) -> Optional[SimpleNamespace]:
+        """Get the rank bonus entry of a rank, or None if the rank has no bonus row."""
+        return self.all(db).get(rank)
+
+    async def get_async(self, rank: UserRank, db: AsyncSession) -> Optional[SimpleNamespace]:
+        """Async variant of get: a stale registry is reloaded through the AsyncSession."""
+        bonuses = await db.run_sync(self.load) if self.is_stale() else self._bonuses
+        return bonuses.get(rank)
+
+    def invalidate(self) -> None:
+        """Drop the cached entries; the next lookup reloads them."""
+        with self._lock:
+            self._loaded_at = None
+
+
+# Registry shared by the whole process
+rank_bonus_registry = RankBonusRegistry()
+
+
+def get_rank_bonus(rank: UserRank, db: Session) -> Optional[SimpleNamespace]:
+    """Get the cached rank bonus entry of a rank (see RankBonusRegistry.get)."""
+    return rank_bonus_registry.get(rank, db)
+
+
+async def get_rank_bonus_async(rank: UserRank, db: AsyncSession) -> Optional[SimpleNamespace]:
+    """Get the cached rank bonus entry of a rank with an AsyncSession (see RankBonusRegistry.get_async)."""
+    return await rank_bonus_registry.get_async(rank, db)
+
+
+def invalidate_rank_bonuses() -> None:
+    """Force the rank bonus registry to reload on the next lookup."""
+    rank_bonus_registry.invalidate()
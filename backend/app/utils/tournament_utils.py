@@ -0,0 +1,173 @@
+"""
+Utility functions for the tournament system.
+
+This module contains the pure pairing and standings logic of the supported
+tournament formats (round robin, single elimination and Swiss). Players are
+plain user ids; byes are represented by None.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+FORMAT_ROUND_ROBIN = "round_robin"
+FORMAT_SINGLE_ELIMINATION = "single_elimination"
+FORMAT_SWISS = "swiss"
+TOURNAMENT_FORMATS = (FORMAT_ROUND_ROBIN, FORMAT_SINGLE_ELIMINATION, FORMAT_SWISS)
+
+# Search steps allowed per bye candidate when looking for a Swiss round without rematches
+SWISS_PAIRING_BUDGET = 10000
+
+Pairing = Tuple[int, Optional[int]]
+
+
+def round_robin_rounds(players: Sequence[int]) -> List[List[Pairing]]:
+    """
+    Schedule a round robin with the circle method: every player meets every other
+    player once and plays at most once per round.
+
+    Args:
+        players: User ids
+
+    Returns:
+        Rounds of pairings. With an odd number of players, one player per round
+        gets a bye (paired with None)
+    """
+    circle = list(players) + ([None] if len(players) % 2 else [])
+    half = len(circle) // 2
+    rounds = []
+    for _ in range(len(circle) - 1):
+        pairings = []
+        for first, second in zip(circle[:half], reversed(circle[half:])):
+            if first is None:
+                first, second = second, first
+            pairings.append((first, second))
+        rounds.append(pairings)
+        # Keep the first player fixed and rotate the others
+        circle = [circle[0], circle[-1]] + circle[1:-1]
+    return rounds
+
+
+def single_elimination_first_round(seeded_players: Sequence[int]) -> List[Pairing]:
+    """
+    Build the first round of a single elimination bracket.
+
+    The bracket is padded to the next power of two with byes, which go to the top
+    seeds. Seed 1 meets the lowest seed, seed 2 the second lowest and so on, and
+    the pairings are ordered so the top two seeds can only meet in the final.
+
+    Args:
+        seeded_players: User ids, best seed first
+
+    Returns:
+        First round pairings in bracket order
+    """
+    size = 1 << max(1, math.ceil(math.log2(len(seeded_players))))
+    seeds = list(seeded_players) + [None] * (size - len(seeded_players))
+    order = [0]
+    while len(order) < size:
+        # Standard bracket order: each seed is followed by its complement
+        order = [index for seed in order for index in (seed, 2 * len(order) - 1 - seed)]
+    return [(seeds[order[i]], seeds[order[i + 1]]) for i in range(0, size, 2)]
+
+
+def next_elimination_round(winners: Sequence[int]) -> List[Pairing]:
+    """Pair the winners of a bracket round in bracket order."""
+    return [(winners[i], winners[i + 1]) for i in range(0, len(winners), 2)]
+
+
+def swiss_round_count(player_count: int) -> int:
+    """Default number of Swiss rounds: enough to single out one undefeated player."""
+    return max(1, math.ceil(math.log2(player_count)))
+
+
+def swiss_pairings(
+    ranking: Sequence[int],
+    played: Set[Tuple[int, int]],
+    byes: Set[int]
+) -> List[Pairing]:
+    """
+    Pair one Swiss round.
+
+    Players are paired down the current ranking with the nearest player they have
+    not met yet (falling back to pairing down the ranking only when rematches cannot
+    be avoided). With an odd number of players, the lowest ranked player without a
+    bye who leaves a pairing without rematches gets one.
+
+    Args:
+        ranking: User ids ordered by current standing, best first
+        played: Pairs of user ids (smaller id first) that already met
+        byes: User ids that already received a bye
+
+    Returns:
+        Pairings of the round
+    """
+    # With an odd number of players, try the bye candidates from the bottom of the ranking
+    bye_candidates = [player for player in reversed(ranking) if player not in byes] or [ranking[-1]]
+    for bye_player in (bye_candidates if len(ranking) % 2 else [None]):
+        remaining = [player for player in ranking if player != bye_player]
+        pairings = _pair_without_rematches(remaining, played, [SWISS_PAIRING_BUDGET])
+        if pairings is not None:
+            break
+    else:
+        # No pairing avoids every rematch: pair down the ranking
+        bye_player = bye_candidates[0] if len(ranking) % 2 else None
+        remaining = [player for player in ranking if player != bye_player]
+        pairings = [(remaining[i], remaining[i + 1]) for i in range(0, len(remaining), 2)]
+
+    if bye_player is not None:
+        pairings.append((bye_player, None))
+    return pairings
+
+
+def _pair_without_rematches(
+    players: List[int],
+    played: Set[Tuple[int, int]],
+    budget: List[int]
+) -> Optional[List[Pairing]]:
+    """
+    Pair players down the ranking with the nearest player not met yet, backtracking
+    when a choice leaves the lower ranked players without a valid pairing.
+    Returns None if every pairing contains a rematch or the search budget runs out.
+    """
+    if not players:
+        return []
+    budget[0] -= 1
+    if budget[0] < 0:
+        return None
+    player, rest = players[0], players[1:]
+    for index, candidate in enumerate(rest):
+        if (min(player, candidate), max(player, candidate)) in played:
+            continue
+        pairings = _pair_without_rematches(rest[:index] + rest[index + 1:], played, budget)
+        if pairings is not None:
+            return [(player, candidate)] + pairings
+    return None
+
+
+def rank_standings(standings: Dict[int, dict], tournament_format: str) -> List[dict]:
+    """
+    Order tournament standings and assign positions.
+
+    Round robin and Swiss standings are ordered by points, then Buchholz score
+    (sum of the opponents' points), then wins; single elimination by the round
+    a player reached (points: wins and byes), then Elo before the tournament.
+
+    Args:
+        standings: Standing dicts by user id, with 'points', 'wins', 'opponents' and 'elo_before'
+        tournament_format: One of TOURNAMENT_FORMATS
+
+    Returns:
+        Standing dicts with 'buchholz' and 'position', best first
+    """
+    for standing in standings.values():
+        standing['buchholz'] = sum(
+            standings[opponent]['points'] for opponent in standing['opponents'] if opponent in standings
+        )
+    if tournament_format == FORMAT_SINGLE_ELIMINATION:
+        key = lambda standing: (-standing['points'], -standing['elo_before'])
+    else:
+        key = lambda standing: (-standing['points'], -standing['buchholz'], -standing['wins'], -standing['elo_before'])
+    ranked = sorted(standings.values(), key=key)
+    for position, standing in enumerate(ranked, start=1):
+        standing['position'] = position
+    return ranked
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Battle benchmark suite across fleet sizes and formation pairings.
+
+Runs battles with ships from database/base_data.py for every fleet size and
+every formation pairing, in two modes:
+- engine: the pure battle simulator (simulate_battle) on plain data
+- crud:   the full battle_between_users path against an in-memory SQLite
+          database (loading, rank bonuses, degradation, rewards, history)
+
+Reports per case battles/sec, p50/p99 latency, peak memory allocated per
+battle (tracemalloc, measured in a separate pass so it does not skew timings)
+and SQL statements per battle (crud mode), and writes the results as JSON
+so regressions can be tracked across releases.
+
+With --max-p50-ms the run fails (exit status 1) when the p50 latency of a
+crud case exceeds the budget, so it can guard the battle path in CI, e.g.
+--mode crud --sizes 20 --max-p50-ms 40 (statements that miss the SQLAlchemy
+compiled cache show up here first: a 20v20 battle takes about 25 ms).
+
+Usage:
+    python backend/benchmarks/bench_battles.py [--mode all] [--sizes 1,5,10,20,50,100]
+                                               [--battles 30] [--engine python]
+                                               [--output bench_battles.json]
+                                               [--max-p50-ms 40]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, UTC
+
+# Add repository root to path to import the backend package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# Benchmarks run against an in-memory SQLite database unless told otherwise
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("DATABASE_URL_BENCHMARK", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY_BENCHMARK", "benchmark")
+
+from sqlalchemy import event, update
+from backend.app.database import engine as db_engine, create_session, init_database
+from backend.app.crud.battle_crud import battle_between_users
+from backend.app.utils.battle_engine import CombatShip, simulate_battle, select_battle_engine, get_engine_version
+from database.base_data import get_ships_data, get_rank_bonuses_data
+from database.models import User, Ship, OwnedShips, RankBonus
+
+FORMATIONS = ["DEFENSIVE", "AGGRESSIVE", "TACTICAL"]
+DEFAULT_SIZES = "1,5,10,20,50,100"
+MEMORY_BATTLES = 3
+
+
+def pick_templates(size, seed):
+    """Pick a reproducible fleet of ship templates from base_data."""
+    rng = random.Random(seed)
+    return [rng.choice(get_ships_data()) for _ in range(size)]
+
+
+def make_fleet(size, seed):
+    return [
+        CombatShip(
+            ship_number=i + 1, ship_name=template["ship_name"], attack=template["attack"],
+            shield=template["shield"], hp=template["hp"], evasion=template["evasion"],
+            fire_rate=template["fire_rate"], value=template["value"]
+        )
+        for i, template in enumerate(pick_templates(size, seed))
+    ]
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list."""
+    index = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def peak_bytes(run_battle, battles, prepare=None):
+    """Mean peak of memory traced while running one battle."""
+    peaks = []
+    tracemalloc.start()
+    for _ in range(battles):
+        if prepare:
+            prepare()
+        tracemalloc.reset_peak()
+        start_size, _ = tracemalloc.get_traced_memory()
+        run_battle()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - start_size)
+    tracemalloc.stop()
+    return sum(peaks) / len(peaks)
+
+
+def measure(run_battle, battles, prepare=None, sql_counter=None):
+    """
+    Time battles one by one and summarize latency, throughput, memory and SQL statements.
+    prepare runs untimed before every battle.
+    """
+    latencies = []
+    statements = 0
+    for battle in range(battles + 1):
+        if prepare:
+            prepare()
+        if sql_counter:
+            sql_counter["enabled"] = True
+        start = time.perf_counter()
+        run_battle()
+        elapsed = time.perf_counter() - start
+        if sql_counter:
+            sql_counter["enabled"] = False
+            count = sql_counter.pop("count", 0)
+        # The first battle is a warm-up
+        if battle:
+            latencies.append(elapsed)
+            statements += count if sql_counter else 0
+    latencies.sort()
+    result = {
+        "battles": battles,
+        "battles_per_sec": round(battles / sum(latencies), 1),
+        "p50_ms": round(1000 * percentile(latencies, 50), 3),
+        "p99_ms": round(1000 * percentile(latencies, 99), 3),
+        "mean_ms": round(1000 * sum(latencies) / battles, 3),
+        "peak_kib": round(peak_bytes(run_battle, MEMORY_BATTLES, prepare) / 1024, 1),
+    }
+    if sql_counter:
+        result["sql_statements"] = round(statements / battles, 1)
+    return result
+
+
+def bench_engine(sizes, battles, engine):
+    """Benchmark the pure battle simulator."""
+    rng = random.Random(42)
+    for size in sizes:
+        fleet_a, fleet_b = make_fleet(size, seed=size), make_fleet(size, seed=-size)
+        for formation_a, formation_b in itertools.product(FORMATIONS, repeat=2):
+            run_battle = lambda: simulate_battle(fleet_a, fleet_b, formation_a, formation_b, rng=rng, engine=engine)
+            yield {"mode": "engine", "size": size, "formation_a": formation_a, "formation_b": formation_b,
+                   **measure(run_battle, battles)}
+
+
+def setup_database(max_size):
+    """Create the schema, seed ship templates and rank bonuses, and two users with max_size ships each."""
+    init_database()
+    db = create_session()
+    db.add_all(Ship(**ship) for ship in get_ships_data())
+    db.add_all(RankBonus(**bonus) for bonus in get_rank_bonuses_data())
+    db.flush()
+    templates = {ship.ship_name: ship.ship_id for ship in db.query(Ship).all()}
+    user_ids = []
+    for side in range(2):
+        user = User(nickname=f"bench_{side}", email=f"bench_{side}@example.com", password_hash="benchmark")
+        db.add(user)
+        db.flush()
+        db.add_all(
+            OwnedShips(
+                user_id=user.user_id, ship_id=templates[template["ship_name"]], status="active",
+                ship_name=template["ship_name"],
+                base_attack=template["attack"], base_shield=template["shield"], base_evasion=template["evasion"],
+                base_fire_rate=template["fire_rate"], base_hp=template["hp"], base_value=template["value"],
+                actual_attack=template["attack"], actual_shield=template["shield"], actual_evasion=template["evasion"],
+                actual_fire_rate=template["fire_rate"], actual_hp=template["hp"], actual_value=template["value"]
+            )
+            for template in pick_templates(max_size, seed=side)
+        )
+        user_ids.append(user.user_id)
+    db.commit()
+    ship_numbers = [
+        [number for (number,) in db.query(OwnedShips.ship_number).filter(OwnedShips.user_id == user_id).order_by(OwnedShips.ship_number)]
+        for user_id in user_ids
+    ]
+    return db, user_ids, ship_numbers
+
+
+def restore_fleets(db):
+    """Bring every ship back to full condition between battles."""
+    db.execute(update(OwnedShips).values(
+        status="active",
+        actual_attack=OwnedShips.base_attack, actual_shield=OwnedShips.base_shield,
+        actual_evasion=OwnedShips.base_evasion, actual_fire_rate=OwnedShips.base_fire_rate,
+        actual_hp=OwnedShips.base_hp, actual_value=OwnedShips.base_value
+    ))
+    db.commit()
+
+
+def bench_crud(sizes, battles, engine):
+    """Benchmark battle_between_users end to end against the in-memory database."""
+    db, (user_a, user_b), (ships_a, ships_b) = setup_database(max(sizes))
+    sql_counter = {"enabled": False}
+
+    @event.listens_for(db_engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        if sql_counter["enabled"]:
+            sql_counter["count"] = sql_counter.get("count", 0) + 1
+
+    try:
+        for size in sizes:
+            for formation_a, formation_b in itertools.product(FORMATIONS, repeat=2):
+                def run_battle():
+                    battle, message = battle_between_users(
+                        db, user_a, user_b, ships_a[:size], ships_b[:size],
+                        formation_a, formation_b, engine=engine
+                    )
+                    if battle is None:
+                        raise RuntimeError(message)
+                yield {"mode": "crud", "size": size, "formation_a": formation_a, "formation_b": formation_b,
+                       **measure(run_battle, battles, lambda: restore_fleets(db), sql_counter)}
+    finally:
+        event.remove(db_engine, "before_cursor_execute", count_statement)
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=["engine", "crud", "all"], default="all", help="Code path to benchmark")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated fleet sizes (ships per side)")
+    parser.add_argument("--battles", type=int, default=30, help="Timed battles per size and formation pairing")
+    parser.add_argument("--engine", default=None, help="Combat engine (python or numpy), default BATTLE_ENGINE")
+    parser.add_argument("--output", default="bench_battles.json", help="JSON file for the results")
+    parser.add_argument("--max-p50-ms", type=float, default=None, help="Fail if a crud case p50 latency exceeds this budget")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    engine = select_battle_engine(args.engine)
+    modes = ["engine", "crud"] if args.mode == "all" else [args.mode]
+
+    print(f"⚔️  Battle benchmark [{engine}] sizes {sizes}, {args.battles} battles per case")
+    print(f"{'mode':<7}{'size':>9}  {'formations':<22}{'battles/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>10}{'SQL':>7}")
+    results = []
+    for mode in modes:
+        cases = bench_engine(sizes, args.battles, engine) if mode == "engine" else bench_crud(sizes, args.battles, engine)
+        for case in cases:
+            results.append(case)
+            formations = f"{case['formation_a']}/{case['formation_b']}"
+            print(f"{mode:<7}{case['size']:>5}v{case['size']:<5}{formations:<22}{case['battles_per_sec']:>10}"
+                  f"{case['p50_ms']:>10}{case['p99_ms']:>10}{case['peak_kib']:>10}{case.get('sql_statements', '-'):>7}")
+
+    with open(args.output, "w") as output:
+        json.dump({
+            "benchmark": "battles",
+            "timestamp": datetime.now(UTC).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "engine": engine,
+            "engine_version": get_engine_version(engine),
+            "battles_per_case": args.battles,
+            "results": results
+        }, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.max_p50_ms is not None:
+        slow = [case for case in results if case["mode"] == "crud" and case["p50_ms"] > args.max_p50_ms]
+        for case in slow:
+            print(f"❌ crud {case['size']}v{case['size']} {case['formation_a']}/{case['formation_b']}: "
+                  f"p50 {case['p50_ms']} ms over the {args.max_p50_ms} ms budget")
+        if slow:
+            sys.exit(1)
+        print(f"✅ Every crud case within the {args.max_p50_ms} ms p50 budget")
+
+
+if __name__ == "__main__":
+    main()
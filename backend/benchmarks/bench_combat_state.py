@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-ship combat state as dicts vs ShipCombatState (__slots__).
+
+Measures, for a 20v20 battle:
+- memory allocated to build the combat state of both fleets (tracemalloc)
+- time of the engine's per-shot access pattern (read attack/shield/evasion,
+  write current_hp) on both representations
+- end-to-end simulate_battle time per battle
+
+Usage:
+    python backend/benchmarks/bench_combat_state.py [--battles 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Add repository root to path to import the backend package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+# The battle engine does not touch the database, but importing the backend needs its settings
+os.environ.setdefault("ENVIRONMENT", "benchmark")
+os.environ.setdefault("DATABASE_URL_BENCHMARK", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY_BENCHMARK", "benchmark")
+
+from backend.app.utils.battle_engine import CombatShip, ShipCombatState, simulate_battle
+from backend.app.utils.constants import SHIELD_DAMAGE_REDUCTION
+
+FLEET_SIZE = 20
+
+
+def make_fleet(size):
+    return [
+        CombatShip(
+            ship_number=i + 1, ship_name=f"Ship{i}", attack=30 + i, shield=20,
+            hp=400 + i * 10, evasion=0.15, fire_rate=3, value=1000
+        )
+        for i in range(size)
+    ]
+
+
+def dict_state(ship, index, side):
+    """Per-ship dict layout used by the engines before ShipCombatState."""
+    return {
+        'index': index,
+        'side': side,
+        'ship_name': ship.ship_name,
+        'attack': ship.attack,
+        'shield': ship.shield,
+        'evasion': ship.evasion,
+        'fire_rate': ship.fire_rate,
+        'current_hp': ship.hp
+    }
+
+
+def build_dicts(fleet_a, fleet_b):
+    return [dict_state(ship, i, 0) for i, ship in enumerate(fleet_a)] + \
+           [dict_state(ship, i + len(fleet_a), 1) for i, ship in enumerate(fleet_b)]
+
+
+def build_slots(fleet_a, fleet_b):
+    return [ShipCombatState(ship, i, 0, "AGGRESSIVE") for i, ship in enumerate(fleet_a)] + \
+           [ShipCombatState(ship, i + len(fleet_a), 1, "AGGRESSIVE") for i, ship in enumerate(fleet_b)]
+
+
+def allocated_bytes(build, fleet_a, fleet_b):
+    tracemalloc.start()
+    snapshot_before = tracemalloc.take_snapshot()
+    states = build(fleet_a, fleet_b)
+    snapshot_after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del states
+    return sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, "filename"))
+
+
+def shots_dicts(states, shots):
+    for i in range(shots):
+        attacker = states[i % len(states)]
+        target = states[(i * 7) % len(states)]
+        if target['evasion'] > 1:
+            continue
+        target['current_hp'] -= attacker['attack'] - target['shield'] * SHIELD_DAMAGE_REDUCTION
+
+
+def shots_slots(states, shots):
+    for i in range(shots):
+        attacker = states[i % len(states)]
+        target = states[(i * 7) % len(states)]
+        if target.evasion > 1:
+            continue
+        target.current_hp -= attacker.attack - target.shield * SHIELD_DAMAGE_REDUCTION
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--battles", type=int, default=200, help="Battles simulated for the end-to-end timing")
+    parser.add_argument("--shots", type=int, default=1_000_000, help="Shots in the access pattern timing")
+    args = parser.parse_args()
+
+    fleet_a, fleet_b = make_fleet(FLEET_SIZE), make_fleet(FLEET_SIZE)
+
+    print(f"⚔️  Combat state benchmark ({FLEET_SIZE}v{FLEET_SIZE})")
+    dict_bytes = allocated_bytes(build_dicts, fleet_a, fleet_b)
+    slots_bytes = allocated_bytes(build_slots, fleet_a, fleet_b)
+    print(f"State allocation per battle: dict {dict_bytes} B, slots {slots_bytes} B "
+          f"({100 * (1 - slots_bytes / dict_bytes):.0f}% less)")
+
+    dict_time = timed(shots_dicts, build_dicts(fleet_a, fleet_b), args.shots)
+    slots_time = timed(shots_slots, build_slots(fleet_a, fleet_b), args.shots)
+    print(f"Shot access pattern ({args.shots} shots): dict {dict_time:.3f}s, slots {slots_time:.3f}s "
+          f"({100 * (1 - slots_time / dict_time):.0f}% faster)")
+
+    rng = random.Random(42)
+    for engine in ("python", "numpy"):
+        elapsed = timed(lambda: [
+            simulate_battle(fleet_a, fleet_b, "TACTICAL", "DEFENSIVE", rng=rng, engine=engine, log_level="summary")
+            for _ in range(args.battles)
+        ])
+        print(f"simulate_battle [{engine}]: {1000 * elapsed / args.battles:.2f} ms/battle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Archive and drop the SystemLogs partitions older than the retention period.
+
+system_logs is partitioned by month (natively on PostgreSQL, as rolling month
+tables on SQLite). Every month partition that ended more than the retention
+period ago is written to <archive-dir>/system_logs_pYYYYMM.ndjson.gz, one JSON
+object per log, and then dropped from the database. Run it daily (e.g. from
+cron): it also creates the next month's partition on PostgreSQL (moving any
+rows stranded in the DEFAULT partition into month partitions) and rolls closed
+months out of the hot table on SQLite.
+
+Usage:
+    python backend/scripts/archive_logs.py [--retention-days 90] [--archive-dir log_archive]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add repository root to path to import the backend package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app.database import create_session
+from backend.app.crud.log_crud import archive_logs
+from backend.app.config import LOG_RETENTION_DAYS, LOG_ARCHIVE_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--retention-days", type=int, default=LOG_RETENTION_DAYS, help="Days logs are kept in the database")
+    parser.add_argument("--archive-dir", default=LOG_ARCHIVE_DIR, help="Directory of the compressed archives")
+    args = parser.parse_args()
+
+    print(f"🗄️  Archiving logs older than {args.retention_days} days to {args.archive_dir}")
+    db = create_session()
+    try:
+        report = archive_logs(db, retention_days=args.retention_days, archive_dir=args.archive_dir)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+    print(f"✅ {sum(report['rolled'].values())} logs rolled, {len(report['archived'])} partitions archived "
+          f"({sum(entry['rows'] for entry in report['archived'])} logs)")
+
+
+if __name__ == "__main__":
+    main()
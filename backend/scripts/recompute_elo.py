@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Recompute the Elo ladder by replaying the whole battle history.
+
+Replays every BattleHistory row in timestamp order from the initial ratings,
+streaming battles in chunks, and reports how the recomputed ratings differ
+from the live ones. Nothing is written unless --apply is given; then only the
+users whose rating changed are updated.
+
+What-if runs use other Elo parameters than the configured constants, e.g.:
+    python backend/scripts/recompute_elo.py --base-change 24 --divisor 300
+
+Usage:
+    python backend/scripts/recompute_elo.py [--base-change 32] [--divisor 400]
+                                            [--chunk-size 10000] [--top 10] [--apply]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add repository root to path to import the backend package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.app.database import create_session
+from backend.app.crud.elo_crud import recompute_elo_ladder
+from backend.app.utils.constants import ELO_BASE_CHANGE, ELO_EXPECTED_SCORE_DIVISOR, ELO_RECOMPUTE_CHUNK_SIZE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-change", type=float, default=ELO_BASE_CHANGE, help="Maximum rating change per battle (K factor)")
+    parser.add_argument("--divisor", type=float, default=ELO_EXPECTED_SCORE_DIVISOR, help="Expected score divisor")
+    parser.add_argument("--chunk-size", type=int, default=ELO_RECOMPUTE_CHUNK_SIZE, help="Battles streamed per chunk")
+    parser.add_argument("--top", type=int, default=10, help="Largest rating changes to report")
+    parser.add_argument("--apply", action="store_true", help="Write the recomputed ratings of the changed users")
+    args = parser.parse_args()
+
+    what_if = (args.base_change, args.divisor) != (ELO_BASE_CHANGE, ELO_EXPECTED_SCORE_DIVISOR)
+    print(f"🔄 Recomputing Elo ladder (K={args.base_change:g}, divisor={args.divisor:g})"
+          f"{' [what-if]' if what_if else ''}{' [apply]' if args.apply else ' [dry run]'}")
+    db = create_session()
+    try:
+        report = recompute_elo_ladder(
+            db, base_change=args.base_change, divisor=args.divisor,
+            chunk_size=args.chunk_size, apply=args.apply, top=args.top
+        )
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+    print(f"✅ {report['battles']} battles replayed, {report['changed']} of {report['users']} ratings changed, "
+          f"{report['written']} written, {report['conflicts']} conflicts")
+
+
+if __name__ == "__main__":
+    main()
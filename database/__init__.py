@@ -19,6 +19,10 @@ from .config import (
     Base,
     DATABASE_URL
 )
+from .engine import (
+    get_engine,
+    get_pool_stats
+)
 
 # Session management
 from .session import (
@@ -63,6 +67,8 @@ __all__ = [
     "engine",
     "Base", 
     "DATABASE_URL",
+    "get_engine",
+    "get_pool_stats",
     
     # Session management
     "SessionLocal",
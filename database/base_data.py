@@ -121,6 +121,7 @@ USERS_DATA: List[Dict[str, Any]] = [
         "level": int(level),
         "rank": get_rank_enum(rank_name),
         "default_formation": formation,
+        "tournament_opt_in": nickname.startswith("NPC_"),  # NPCs can be entered in any tournament
         "victories": 0,
         "defeats": 0,
         "damage_dealt": 0.0,
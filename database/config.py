@@ -5,10 +5,10 @@ This module contains all database configuration settings, including
 database URL construction and engine initialization.
 """
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base
 from dotenv import load_dotenv
 import os
+from .engine import get_engine
 
 # Load environment variables from .env
 env_file = os.getenv("ENV_FILE", ".env")
@@ -39,11 +39,8 @@ NPC_SOLARIS_EMAIL = os.getenv('NPC_SOLARIS_EMAIL')
 NPC_ANDROMEDA_EMAIL = os.getenv('NPC_ANDROMEDA_EMAIL')
 NPC_CENTAURI_EMAIL = os.getenv('NPC_CENTAURI_EMAIL')
 
-# Create database engine
-engine = create_engine(
-    DATABASE_URL,
-    echo=DB_ECHO
-)
+# Shared database engine (pool settings from DB_POOL_* variables, see database/engine.py)
+engine = get_engine(DATABASE_URL, echo=DB_ECHO)
 
 # Declarative base for SQLAlchemy models
 Base = declarative_base()
@@ -0,0 +1,275 @@
+"""
+Shared database engine factory and connection pool monitoring.
+
+database/ and backend/ both get their engine from get_engine, which creates one
+engine (and therefore one connection pool) per database URL and process.
+Pool parameters come from the environment, with defaults chosen per driver:
+
+    DB_POOL_SIZE       Connections kept open in the pool
+    DB_MAX_OVERFLOW    Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT    Seconds a checkout waits for a free connection before failing
+    DB_POOL_RECYCLE    Seconds after which a connection is replaced (-1 never)
+    DB_POOL_PRE_PING   Test connections on checkout ("true"/"false")
+
+PostgreSQL (psycopg2/psycopg) defaults recycle connections every 30 minutes and
+ping them on checkout, so connections dropped by the server or a proxy are
+replaced instead of failing a request. File SQLite databases use a smaller pool
+without pings; in-memory SQLite keeps SQLAlchemy's single-connection pools.
+
+get_async_engine is the asyncio counterpart for AsyncSession users: the same
+URL with an async driver (aiosqlite, asyncpg; psycopg 3 is async-capable as
+is) and the same pool settings. An async engine always has a pool of its own.
+
+get_pool_stats reports the live pool state (checked out, overflow) and the
+counters recorded by the pool events (checkouts, new connections,
+invalidations, time spent waiting for a connection, timeouts).
+"""
+
+import os
+import threading
+import time
+import weakref
+from typing import Dict, Tuple
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Pool defaults per database backend
+POOL_DEFAULTS = {
+    "postgresql": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 1800, "pool_pre_ping": True},
+    "sqlite": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": -1, "pool_pre_ping": False}
+}
+
+# Async driver used for each sync driver (drivers missing here are used as they are)
+ASYNC_DRIVERS = {
+    ("sqlite", "pysqlite"): "sqlite+aiosqlite",
+    ("postgresql", "psycopg2"): "postgresql+asyncpg"
+}
+
+# Environment variable and parser of each pool parameter
+POOL_ENVIRONMENT = {
+    "pool_size": ("DB_POOL_SIZE", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", int),
+    "pool_timeout": ("DB_POOL_TIMEOUT", float),
+    "pool_recycle": ("DB_POOL_RECYCLE", int),
+    "pool_pre_ping": ("DB_POOL_PRE_PING", lambda value: value.lower() == "true")
+}
+
+
+class PoolStats:
+    """
+    Thread-safe counters of one connection pool, updated by pool events.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connections_created = 0
+        self.invalidations = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connections_created": self.connections_created,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms_total": round(self.wait_seconds * 1000, 3),
+                "wait_ms_avg": round(self.wait_seconds * 1000 / self.waits, 3) if self.waits else 0.0,
+                "wait_ms_max": round(self.max_wait_seconds * 1000, 3)
+            }
+
+
+class _TimedPoolMixin:
+    """
+    Pool mixin recording how long every checkout waits for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.stats.count("timeouts")
+            raise
+        finally:
+            self.stats.record_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # Engine.dispose() replaces the pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """
+    QueuePool that records how long every checkout waits for a connection.
+    """
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """
+    Asyncio-compatible QueuePool that records how long every checkout waits for a connection.
+    """
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+
+
+def async_database_url(database_url: str) -> str:
+    """
+    Get the URL of a database with an asyncio driver, e.g. postgresql+psycopg2:// -> postgresql+asyncpg://.
+    """
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get((url.get_backend_name(), url.get_driver_name()))
+    if driver is None:
+        return database_url
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def pool_options(database_url: str, **overrides) -> dict:
+    """
+    Pool keyword arguments for create_engine: driver defaults, then environment, then overrides.
+    Returns no options for in-memory SQLite, which keeps SQLAlchemy's default pool.
+    """
+    url = make_url(database_url)
+    if _is_memory_sqlite(url):
+        return {}
+    options = dict(POOL_DEFAULTS.get(url.get_backend_name(), POOL_DEFAULTS["postgresql"]))
+    for option, (variable, parse) in POOL_ENVIRONMENT.items():
+        value = os.getenv(variable)
+        if value not in (None, ""):
+            options[option] = parse(value)
+    options.update(overrides)
+    is_async = url.get_dialect().is_async
+    return {"poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool, **options}
+
+
+def create_database_engine(database_url: str, echo: bool = False, **overrides) -> Engine:
+    """
+    Create an engine with the configured pool and its monitoring events.
+    Prefer get_engine, which shares one engine per URL within the process.
+
+    Args:
+        database_url: SQLAlchemy database URL
+        echo: Log every SQL statement
+        **overrides: Pool options taking precedence over the environment and driver defaults
+    """
+    engine = create_engine(database_url, echo=echo, **pool_options(database_url, **overrides))
+    _monitor_pool(engine)
+    return engine
+
+
+def create_async_database_engine(database_url: str, echo: bool = False, **overrides) -> AsyncEngine:
+    """
+    Create an asyncio engine (see create_database_engine) for the async driver of a database URL.
+    """
+    database_url = async_database_url(database_url)
+    engine = create_async_engine(database_url, echo=echo, **pool_options(database_url, **overrides))
+    _monitor_pool(engine.sync_engine)
+    return engine
+
+
+def _monitor_pool(engine: Engine) -> None:
+    """Register the pool events counting into the PoolStats of an engine."""
+    stats = _pool_stats[engine] = getattr(engine.pool, "stats", None) or PoolStats()
+
+    @event.listens_for(engine, "connect")
+    def _count_connection(dbapi_connection, connection_record):
+        stats.count("connections_created")
+
+    @event.listens_for(engine, "checkout")
+    def _count_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.count("checkouts")
+
+    @event.listens_for(engine, "invalidate")
+    def _count_invalidation(dbapi_connection, connection_record, exception):
+        stats.count("invalidations")
+
+
+# Counters of the pool of every engine created by create_database_engine
+_pool_stats: "weakref.WeakKeyDictionary[Engine, PoolStats]" = weakref.WeakKeyDictionary()
+
+# Engines shared by the whole process, by (URL, echo)
+_engines: Dict[Tuple[str, bool], Engine] = {}
+_async_engines: Dict[Tuple[str, bool], AsyncEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(database_url: str, echo: bool = False) -> Engine:
+    """
+    Get the process-wide engine of a database URL, creating it on first use.
+    """
+    key = (str(database_url), echo)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = create_database_engine(database_url, echo=echo)
+        return engine
+
+
+def get_async_engine(database_url: str, echo: bool = False) -> AsyncEngine:
+    """
+    Get the process-wide asyncio engine of a database URL, creating it on first use.
+    """
+    key = (str(database_url), echo)
+    with _engines_lock:
+        engine = _async_engines.get(key)
+        if engine is None:
+            engine = _async_engines[key] = create_async_database_engine(database_url, echo=echo)
+        return engine
+
+
+def get_pool_stats(engine) -> dict:
+    """
+    Get the live state and counters of an engine's connection pool.
+
+    Returns:
+        Dict with the driver, pool class and settings, connections checked out,
+        in the pool and in overflow, and the PoolStats counters
+    """
+    if isinstance(engine, AsyncEngine):
+        engine = engine.sync_engine
+    pool = engine.pool
+    stats = {
+        "driver": f"{engine.url.get_backend_name()}+{engine.url.get_driver_name()}",
+        "pool_class": type(pool).__name__
+    }
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "recycle": pool._recycle,
+            "pre_ping": pool._pre_ping,
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow())
+        })
+    if engine in _pool_stats:
+        stats.update(_pool_stats[engine].as_dict())
+    return stats
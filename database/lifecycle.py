@@ -8,6 +8,7 @@ and initial data seeding. Centralizes all database lifecycle concerns.
 from .config import engine, Base
 from .session import create_session
 from .models import User, Ship, OwnedShips, SystemLogs, ShipyardLog, RankBonus, UserRank, WorkLog
+from .log_partitions import ensure_log_partitions, drop_all_log_partitions
 from .base_data import get_ships_data, get_users_data, get_npc_users, get_rank_bonuses_data, get_owned_ships_assignments
 from sqlalchemy import func, text
 import logging
@@ -71,6 +72,8 @@ def initialize_database(with_seed: bool = False) -> None:
     try:
         logger.info("Initializing database...")
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            ensure_log_partitions(connection)
         logger.info("Database tables created successfully")
         
         # Log database initialization (we need a session after tables are created)
@@ -162,8 +165,12 @@ def reset_database() -> None:
         except:
             pass  # Tables might not exist yet
         
+        with engine.begin() as connection:
+            drop_all_log_partitions(connection)
         Base.metadata.drop_all(bind=engine)
         Base.metadata.create_all(bind=engine)
+        with engine.begin() as connection:
+            ensure_log_partitions(connection)
         
         # Log after recreation
         session = create_session()
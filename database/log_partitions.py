@@ -0,0 +1,243 @@
+"""
+Monthly time partitions of the system_logs table.
+
+Logs are partitioned by month on their timestamp, one partition per month
+named system_logs_pYYYYMM:
+
+PostgreSQL
+    system_logs is a native RANGE-partitioned table. ensure_log_partitions
+    converts the plain table created by create_all (copying any rows) and
+    creates the partitions of the current and next month; a DEFAULT partition
+    catches rows outside every monthly range. Rows stranded in DEFAULT (e.g.
+    when the job missed a month boundary) are moved into month partitions by
+    the next ensure_log_partitions, so retention covers them like any other
+    month. Queries on system_logs with a
+    timestamp range only scan the matching partitions (partition pruning).
+    The primary key of a partitioned table must contain the partition key,
+    so it is (log_id, timestamp); log_id still comes from its sequence.
+
+SQLite (rolling tables)
+    New logs are always written to system_logs, the hot table. roll_log_partitions
+    moves the rows of every closed month into a month table of the same
+    columns, so the hot table and its indexes only hold the current month.
+    partitions_for_range gives the tables a date range has to read: the hot
+    table and the month tables it overlaps.
+
+Either way a whole month leaves the database at once: drop_log_partition
+detaches (PostgreSQL) and drops a month partition once it has been archived
+(see log_crud.archive_logs).
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import Column, Index, MetaData, Table, and_, delete, func, insert, inspect, select, text
+from sqlalchemy.engine import Connection
+from .models import SystemLogs
+
+PARTITION_PREFIX = "system_logs_p"
+DEFAULT_PARTITION = "system_logs_pdefault"
+_PARTITION_NAME = re.compile(r"^system_logs_p(\d{4})(\d{2})$")
+
+# Table objects of the month partitions, created on demand
+_partition_metadata = MetaData()
+
+
+def naive_utc(moment: datetime) -> datetime:
+    """Naive UTC form of a timestamp, the form timestamps are stored in."""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def month_start(moment: datetime) -> datetime:
+    """First instant of the month of a timestamp (naive UTC)."""
+    return naive_utc(moment).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(month: datetime) -> datetime:
+    """First instant of the month after month."""
+    return month.replace(year=month.year + 1, month=1) if month.month == 12 else month.replace(month=month.month + 1)
+
+
+def partition_name(moment: datetime) -> str:
+    """Name of the partition holding the logs of a timestamp, e.g. system_logs_p202610."""
+    return f"{PARTITION_PREFIX}{month_start(moment):%Y%m}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Month of a partition name, or None if it is not a month partition."""
+    match = _PARTITION_NAME.match(name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def is_partitioned_natively(connection: Connection) -> bool:
+    """Whether the database partitions system_logs itself (PostgreSQL)."""
+    return connection.dialect.name == "postgresql"
+
+
+def partition_table(name: str) -> Table:
+    """
+    Table object of a month partition: the system_logs columns, without foreign
+    keys or checks (rows were validated when first written) and with only the
+    composite indexes used to read logs by date.
+    """
+    table = _partition_metadata.tables.get(name)
+    if table is None:
+        table = Table(
+            name, _partition_metadata,
+            *(
+                Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+                for column in SystemLogs.__table__.columns
+            ),
+            Index(f"idx_{name}_timestamp", "timestamp", "log_id"),
+            Index(f"idx_{name}_user_timestamp", "user_id", "timestamp", "log_id"),
+            Index(f"idx_{name}_level_timestamp", "log_level", "timestamp", "log_id"),
+            Index(f"idx_{name}_category_timestamp", "log_category", "timestamp", "log_id")
+        )
+    return table
+
+
+def list_log_partitions(connection: Connection) -> List[Tuple[datetime, str]]:
+    """
+    (month, name) of every existing month partition, oldest first. The DEFAULT
+    partition is not listed: it is never dropped, and ensure_log_partitions
+    moves its rows into month partitions.
+    """
+    partitions = []
+    for name in inspect(connection).get_table_names():
+        month = partition_month(name)
+        if month is not None:
+            partitions.append((month, name))
+    return sorted(partitions)
+
+
+def partitions_for_range(connection: Connection, start: datetime = None, end: datetime = None) -> List[Table]:
+    """
+    Tables to read for the logs between start and end (both optional, inclusive).
+
+    PostgreSQL prunes partitions itself, so this is only system_logs there. On
+    SQLite it is the hot table followed by the month tables overlapping the range.
+    """
+    tables = [SystemLogs.__table__]
+    if is_partitioned_natively(connection):
+        return tables
+    start = naive_utc(start) if start else None
+    end = naive_utc(end) if end else None
+    for month, name in list_log_partitions(connection):
+        if (end is None or month <= end) and (start is None or next_month(month) > start):
+            tables.append(partition_table(name))
+    return tables
+
+
+def _create_postgres_partition(connection: Connection, month: datetime, parent: str = "system_logs") -> None:
+    connection.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {parent} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d %H:%M:%S}') TO ('{next_month(month):%Y-%m-%d %H:%M:%S}')"
+    ))
+
+
+def _partition_existing_table(connection: Connection) -> None:
+    """Replace the plain system_logs table by a partitioned one with the same columns, rows and indexes."""
+    table = SystemLogs.__table__
+    connection.execute(text(
+        "CREATE TABLE system_logs_partitioned (LIKE system_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        "PARTITION BY RANGE (timestamp)"
+    ))
+    connection.execute(text("ALTER TABLE system_logs_partitioned ADD PRIMARY KEY (log_id, timestamp)"))
+    connection.execute(text("ALTER TABLE system_logs_partitioned ADD FOREIGN KEY (user_id) REFERENCES users (user_id)"))
+    months = connection.execute(text("SELECT DISTINCT date_trunc('month', timestamp) FROM system_logs")).scalars().all()
+    for month in months:
+        _create_postgres_partition(connection, month, parent="system_logs_partitioned")
+    connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF system_logs_partitioned DEFAULT"))
+    connection.execute(text("INSERT INTO system_logs_partitioned SELECT * FROM system_logs"))
+
+    # The log_id sequence must outlive the old table
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence('system_logs', 'log_id')")).scalar()
+    if sequence:
+        connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY system_logs_partitioned.log_id"))
+    connection.execute(text("DROP TABLE system_logs"))
+    connection.execute(text("ALTER TABLE system_logs_partitioned RENAME TO system_logs"))
+    connection.execute(text("ALTER TABLE system_logs RENAME CONSTRAINT system_logs_partitioned_pkey TO system_logs_pkey"))
+    # Indexes on the partitioned table are created on every partition
+    for index in table.indexes:
+        index.create(connection)
+
+
+def ensure_log_partitions(connection: Connection, now: datetime = None, months_ahead: int = 1) -> None:
+    """
+    PostgreSQL: partition system_logs if it is still a plain table and create the
+    partitions of the current month and the next months_ahead months. Idempotent;
+    a no-op on SQLite, whose month tables are created by roll_log_partitions.
+
+    Rows of any month up to the last of these that landed in the DEFAULT partition
+    are moved into their month partitions: a month partition cannot be created
+    while DEFAULT holds rows of its range, so DEFAULT is detached, the partitions
+    are created, the rows are moved and DEFAULT is attached again, all in the
+    caller's transaction.
+    """
+    if not is_partitioned_natively(connection):
+        return
+    relkind = connection.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass('system_logs')")).scalar()
+    if relkind == "r":
+        _partition_existing_table(connection)
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF system_logs DEFAULT"))
+
+    months = [month_start(now or datetime.now(timezone.utc))]
+    for _ in range(months_ahead):
+        months.append(next_month(months[-1]))
+    horizon = {"horizon": next_month(months[-1])}
+    stranded = connection.execute(text(
+        f"SELECT DISTINCT date_trunc('month', timestamp) FROM {DEFAULT_PARTITION} WHERE timestamp < :horizon"
+    ), horizon).scalars().all()
+    if stranded:
+        connection.execute(text(f"ALTER TABLE system_logs DETACH PARTITION {DEFAULT_PARTITION}"))
+    for month in sorted(set(months) | set(stranded)):
+        _create_postgres_partition(connection, month)
+    if stranded:
+        # DEFAULT is detached, so every moved row is routed to its new month partition
+        connection.execute(text(f"INSERT INTO system_logs SELECT * FROM {DEFAULT_PARTITION} WHERE timestamp < :horizon"), horizon)
+        connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp < :horizon"), horizon)
+        connection.execute(text(f"ALTER TABLE system_logs ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def roll_log_partitions(connection: Connection, now: datetime = None) -> dict:
+    """
+    SQLite: move the logs of every month before the current one from the hot
+    system_logs table into their month tables (a no-op on PostgreSQL).
+
+    Returns:
+        Dict of month table name -> rows moved
+    """
+    if is_partitioned_natively(connection):
+        return {}
+    hot = SystemLogs.__table__
+    current = month_start(now or datetime.now(timezone.utc))
+    oldest = connection.execute(select(func.min(hot.c.timestamp)).where(hot.c.timestamp < current)).scalar()
+    moved = {}
+    month = month_start(oldest) if oldest is not None else current
+    while month < current:
+        window = and_(hot.c.timestamp >= month, hot.c.timestamp < next_month(month))
+        table = partition_table(partition_name(month))
+        table.create(connection, checkfirst=True)
+        result = connection.execute(insert(table).from_select([column.name for column in hot.columns], select(hot).where(window)))
+        connection.execute(delete(hot).where(window))
+        if result.rowcount:
+            moved[table.name] = result.rowcount
+        month = next_month(month)
+    return moved
+
+
+def drop_log_partition(connection: Connection, name: str) -> None:
+    """Detach (PostgreSQL) and drop a month partition with all its logs."""
+    if partition_month(name) is None:
+        raise ValueError(f"{name} is not a log partition")
+    if is_partitioned_natively(connection):
+        connection.execute(text(f"ALTER TABLE system_logs DETACH PARTITION {name}"))
+    connection.execute(text(f"DROP TABLE {name}"))
+
+
+def drop_all_log_partitions(connection: Connection) -> None:
+    """Drop every month partition (database reset; system_logs itself is dropped by drop_all)."""
+    for _, name in list_log_partitions(connection):
+        drop_log_partition(connection, name)
@@ -13,7 +13,7 @@ indexes, and relationships for optimal database performance.
 """
 
 import enum
-from sqlalchemy import Column, Integer, Float, String, DateTime, JSON, ForeignKey, Index, CheckConstraint, Enum
+from sqlalchemy import Column, Integer, BigInteger, Float, String, DateTime, JSON, ForeignKey, Index, CheckConstraint, Enum, Boolean
 from .config import Base
 from datetime import datetime, UTC
 from typing import Dict, Any
@@ -124,6 +124,8 @@ class User(Base):
         level: Current player level
         rank: Current player rank (enum)
         default_formation: Default tactical formation ("DEFENSIVE", "AGGRESSIVE", "TACTICAL")
+        tournament_opt_in: Whether other users may enter this user in their tournaments
+        version_id: Row version for optimistic concurrency control (incremented on every update)
     """
 
     __tablename__ = 'users'
@@ -144,6 +146,12 @@ class User(Base):
     level = Column(Integer, default=1, nullable=False)
     rank = Column(Enum(UserRank), default=UserRank.RECRUIT, nullable=False)
     default_formation = Column(String(20), default="AGGRESSIVE", nullable=False)
+    tournament_opt_in = Column(Boolean, default=False, nullable=False)
+    
+    # Optimistic concurrency: every UPDATE checks and increments the version, so an
+    # update based on a stale read fails with StaleDataError instead of being lost
+    version_id = Column(Integer, nullable=False)
+    __mapper_args__ = {"version_id_col": version_id}
 
     # Database constraints to ensure valid values
     __table_args__ = (
@@ -185,6 +193,7 @@ class OwnedShips(Base):
         ship_name: Name of the ship (copied from template)
         base_*: Original stats when purchased
         actual_*: Current stats (may be modified by upgrades/damage)
+        version_id: Row version for optimistic concurrency control (incremented on every update)
     """
 
     __tablename__ = 'owned_ships'
@@ -211,6 +220,10 @@ class OwnedShips(Base):
     actual_hp = Column(Float, default=100, nullable=False)
     actual_value = Column(Integer, default=1000, nullable=False)
     
+    # Optimistic concurrency (see User.version_id)
+    version_id = Column(Integer, nullable=False)
+    __mapper_args__ = {"version_id_col": version_id}
+    
     # Database constraints and indexes
     __table_args__ = (
         CheckConstraint('base_attack >= 0', name='check_base_attack_positive'),
@@ -278,8 +291,12 @@ class BattleHistory(Base):
         timestamp: When the battle occurred
         winner_user_id: ID of the winning user (null for draws)
         participants: JSON data about all participants and their ships
-        battle_log: JSON array of battle events/actions
+        battle_log: JSON array of battle log lines not covered by battle_events
         extra: Additional flexible data (damage totals, rounds, etc.)
+        seed: Seed of the battle's random generator, used to replay the battle
+        engine_version: Combat engine and rules version that resolved the battle
+        fleet_snapshot: Battle-ready fleets, formations and names the battle started with
+        battle_events: Compact columnar stream of every shot (round, attacker, target, kind, damage, hp)
     """
     
     __tablename__ = 'battle_history'
@@ -290,6 +307,10 @@ class BattleHistory(Base):
     participants = Column(JSON, nullable=False)  # List of participants and their ships
     battle_log = Column(JSON, nullable=True)     # List of battle events/actions
     extra = Column(JSON, nullable=True)          # Additional flexible data
+    seed = Column(BigInteger, nullable=True)     # RNG seed for deterministic replay
+    engine_version = Column(String(20), nullable=True)
+    fleet_snapshot = Column(JSON, nullable=True) # Input fleets for deterministic replay
+    battle_events = Column(JSON, nullable=True)  # Packed combat events, rendered to text on demand
 
     # Indexes for efficient querying
     __table_args__ = (
@@ -349,17 +370,20 @@ class SystemLogs(Base):
         CheckConstraint("log_level IN ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')", name='check_log_level_valid'),
         CheckConstraint("log_category IN ('USER_ACTION', 'SYSTEM', 'GAME_EVENT', 'SECURITY', 'PERFORMANCE', 'AUDIT')", name='check_log_category_valid'),
         CheckConstraint('execution_time_ms >= 0', name='check_execution_time_positive'),
-        # Indexes for frequent queries
-        Index('idx_logs_timestamp', 'timestamp'),
+        # Indexes for frequent queries (the timestamp ones end with log_id, the keyset
+        # pagination order, so pages are read in index order without sorting)
+        Index('idx_logs_timestamp', 'timestamp', 'log_id'),
         Index('idx_logs_user_id', 'user_id'),
         Index('idx_logs_level', 'log_level'),
         Index('idx_logs_category', 'log_category'),
         Index('idx_logs_action', 'action'),
-        Index('idx_logs_user_timestamp', 'user_id', 'timestamp'),
-        Index('idx_logs_level_timestamp', 'log_level', 'timestamp'),
-        Index('idx_logs_category_timestamp', 'log_category', 'timestamp'),
+        Index('idx_logs_user_timestamp', 'user_id', 'timestamp', 'log_id'),
+        Index('idx_logs_level_timestamp', 'log_level', 'timestamp', 'log_id'),
+        Index('idx_logs_category_timestamp', 'log_category', 'timestamp', 'log_id'),
         # Composite index for audit queries
         Index('idx_logs_audit', 'user_id', 'log_category', 'action', 'timestamp'),
+        # Never reuse the ids of logs rolled into month tables (see log_partitions)
+        {'sqlite_autoincrement': True},
     )
 
     def __repr__(self) -> str:
@@ -453,4 +477,122 @@ class WorkLog(Base):
     )
 
     def __repr__(self) -> str:
-        return f"<WorkLog(id={self.id}, user_id={self.user_id}, work_type={self.work_type}, income_earned={self.income_earned}, rank_at_time={self.rank_at_time.name})>"
\ No newline at end of file
+        return f"<WorkLog(id={self.id}, user_id={self.user_id}, work_type={self.work_type}, income_earned={self.income_earned}, rank_at_time={self.rank_at_time.name})>"
+
+class Tournament(Base):
+    """
+    Tournament records.
+
+    Stores a tournament played server-side in one request: its format, the
+    participating users, the battles of every round and the final standings.
+    
+    Attributes:
+        tournament_id: Unique identifier for the tournament
+        name: Display name of the tournament
+        format: Tournament format (round_robin, single_elimination, swiss)
+        status: Tournament status (completed)
+        created_by_user_id: User who started the tournament (foreign key to users)
+        participants: JSON array of participating user ids, in seeding order
+        rounds: JSON array of rounds, each a list of pairings with their battle id and winner
+        standings: JSON array of final standings (position, points, wins, Elo before and after)
+        extra: Additional flexible data (engine, durations, etc.)
+        created_at: When the tournament was started
+        finished_at: When the last battle was resolved
+    """
+
+    __tablename__ = 'tournaments'
+
+    tournament_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    name = Column(String(100), nullable=False)
+    format = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default="completed")
+    created_by_user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    participants = Column(JSON, nullable=False)
+    rounds = Column(JSON, nullable=False)
+    standings = Column(JSON, nullable=False)
+    extra = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=utc_now, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Database constraints and indexes
+    __table_args__ = (
+        CheckConstraint("format IN ('round_robin', 'single_elimination', 'swiss')", name='check_tournament_format_valid'),
+        Index('idx_tournament_created_by', 'created_by_user_id'),
+        Index('idx_tournament_created_at', 'created_at'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<Tournament(tournament_id={self.tournament_id}, name={self.name}, format={self.format}, status={self.status})>"
+
+
+class FormationMatchupStats(Base):
+    """
+    Aggregate battle counters per formation pair.
+
+    Updated by every battle in the same transaction as its BattleHistory row, once
+    from the point of view of each side, so the win rate of DEFENSIVE against
+    TACTICAL is wins / battles of the (DEFENSIVE, TACTICAL) row without reading
+    the battle history.
+    
+    Attributes:
+        formation: Formation of the side the counters belong to
+        opponent_formation: Formation it fought against
+        battles: Battles fought
+        wins: Battles won
+        ships: Ships fielded in those battles
+        ships_survived: Ships that survived
+        damage_dealt: Damage dealt
+        damage_taken: Damage taken
+        updated_at: Last battle counted
+    """
+
+    __tablename__ = 'formation_matchup_stats'
+
+    formation = Column(String(20), primary_key=True)
+    opponent_formation = Column(String(20), primary_key=True)
+    battles = Column(Integer, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    ships = Column(Integer, default=0, nullable=False)
+    ships_survived = Column(Integer, default=0, nullable=False)
+    damage_dealt = Column(Float, default=0, nullable=False)
+    damage_taken = Column(Float, default=0, nullable=False)
+    updated_at = Column(DateTime, default=utc_now, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<FormationMatchupStats(formation={self.formation}, opponent_formation={self.opponent_formation}, battles={self.battles}, wins={self.wins})>"
+
+
+class ShipMatchupStats(Base):
+    """
+    Aggregate battle counters per ship template pair.
+
+    Every battle counts once for each pair of ship templates facing each other
+    (a template fielded by one side, a template fielded by the other). The
+    damage of a fleet is shared equally between its ships.
+    
+    Attributes:
+        ship_id: Ship template the counters belong to (foreign key to ships)
+        opponent_ship_id: Ship template of the opposing fleet (foreign key to ships)
+        battles: Battles in which the templates faced each other
+        wins: Battles won by the side fielding ship_id
+        ships: Ships of the template fielded in those battles
+        ships_survived: Ships of the template that survived
+        damage_dealt: Share of the fleet damage dealt by ships of the template
+        damage_taken: Share of the fleet damage taken by ships of the template
+        updated_at: Last battle counted
+    """
+
+    __tablename__ = 'ship_matchup_stats'
+
+    ship_id = Column(Integer, ForeignKey('ships.ship_id'), primary_key=True)
+    opponent_ship_id = Column(Integer, ForeignKey('ships.ship_id'), primary_key=True)
+    battles = Column(Integer, default=0, nullable=False)
+    wins = Column(Integer, default=0, nullable=False)
+    ships = Column(Integer, default=0, nullable=False)
+    ships_survived = Column(Integer, default=0, nullable=False)
+    damage_dealt = Column(Float, default=0, nullable=False)
+    damage_taken = Column(Float, default=0, nullable=False)
+    updated_at = Column(DateTime, default=utc_now, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ShipMatchupStats(ship_id={self.ship_id}, opponent_ship_id={self.opponent_ship_id}, battles={self.battles}, wins={self.wins})>"